@@ -0,0 +1,113 @@
+"""
+Radius + time-window query latency for crawlers.schedule_index at nationwide scale.
+
+    PYTHONPATH=. python benchmarks/nearby_query.py
+
+Synthetic cinemas are spread over South Korea with most of them in the Seoul
+metro area; every cinema gets 40 screenings a day for a week. The same queries
+run against the index and against a full scan of all rows.
+"""
+import datetime as dt
+import random
+import statistics
+import time
+
+from crawlers.schedule_index import ScheduleIndex, haversine_km, screening_start
+from models import Cinema
+
+CINEMAS = 600
+PER_DAY = 40
+DAYS = 7
+QUERIES = 2000
+MOVIES = 60
+CHAINS = ("CGV", "Megabox", "Lotte", "Dtryx", "Moviee", "TinyTicket", "KOFA")
+
+
+def synthetic_cinemas(rng: random.Random) -> list[Cinema]:
+    cinemas = []
+    for i in range(CINEMAS):
+        if rng.random() < 0.6:  # Seoul metro
+            lat, lon = rng.gauss(37.55, 0.12), rng.gauss(126.98, 0.15)
+        else:
+            lat, lon = rng.uniform(34.7, 38.2), rng.uniform(126.3, 129.4)
+        cinemas.append(
+            Cinema(cinema_code=f"{i:04d}", name=f"극장 {i}", chain=CHAINS[i % len(CHAINS)], latitude=lat, longitude=lon)
+        )
+    return cinemas
+
+
+def synthetic_rows(cinemas: list[Cinema], rng: random.Random):
+    for day in range(DAYS):
+        play_date = f"2026-10-{day + 20:02d}"
+        for cinema in cinemas:
+            for n in range(PER_DAY):
+                start = 9 * 60 + rng.randrange(0, 17 * 60)  # up to 26:00
+                yield {
+                    "provider": cinema.chain,
+                    "cinema_code": cinema.cinema_code,
+                    "cinema_name": cinema.name,
+                    "screen_name": f"{n % 8 + 1}관",
+                    "movie_title": f"상영 영화 {rng.randrange(MOVIES)}",
+                    "play_date": play_date,
+                    "start_dt": f"{start // 60:02d}:{start % 60:02d}",
+                }
+
+
+def full_scan(rows, by_key, lat, lon, radius_km, lo, hi, movie):
+    hits = []
+    for row in rows:
+        if movie is not None and row["movie_title"] != movie:
+            continue
+        start = screening_start(row["play_date"], row["start_dt"])
+        if not lo <= start <= hi:
+            continue
+        cinema = by_key[(row["provider"], row["cinema_code"])]
+        if haversine_km(lat, lon, cinema.latitude, cinema.longitude) <= radius_km:
+            hits.append(row)
+    return hits
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    return f"p50 {p50 * 1e6:8.1f}us  p99 {p99 * 1e6:8.1f}us"
+
+
+def main() -> None:
+    rng = random.Random(7)
+    cinemas = synthetic_cinemas(rng)
+    rows = list(synthetic_rows(cinemas, rng))
+
+    started = time.perf_counter()
+    index = ScheduleIndex.from_rows(rows, cinemas)
+    print(f"{len(cinemas)} cinemas, {len(index)} screenings, built in {time.perf_counter() - started:.2f}s")
+
+    queries = []
+    for _ in range(QUERIES):
+        anchor = rng.choice(cinemas)
+        lat, lon = anchor.latitude + rng.gauss(0, 0.02), anchor.longitude + rng.gauss(0, 0.02)
+        start = dt.datetime(2026, 10, 20 + rng.randrange(DAYS), rng.randrange(9, 22), rng.randrange(60))
+        movie = f"상영 영화 {rng.randrange(MOVIES)}" if rng.random() < 0.5 else None
+        queries.append((lat, lon, 3.0, start, start + dt.timedelta(hours=2), movie))
+
+    samples, results = [], 0
+    for lat, lon, radius_km, start, end, movie in queries:
+        t = time.perf_counter()
+        results += len(index.query(lat, lon, radius_km=radius_km, start=start, end=end, movie=movie))
+        samples.append(time.perf_counter() - t)
+    print(f"index      {percentiles(samples)}  ({results / QUERIES:.1f} hits/query)")
+
+    by_key = {(c.chain, c.cinema_code): c for c in cinemas}
+    scan_samples = []
+    for lat, lon, radius_km, start, end, movie in queries[:20]:
+        lo = start.date().toordinal() * 1440 + start.hour * 60 + start.minute
+        hi = end.date().toordinal() * 1440 + end.hour * 60 + end.minute
+        t = time.perf_counter()
+        full_scan(rows, by_key, lat, lon, radius_km, lo, hi, movie)
+        scan_samples.append(time.perf_counter() - t)
+    print(f"full scan  {percentiles(scan_samples)}  (20 queries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Freshness under a fixed request budget: crawlers.revisit vs round-robin.
+
+    PYTHONPATH=. python benchmarks/revisit_schedule.py
+
+Simulated two weeks of hourly invocations over 300 theaters: a fifth are
+multiplexes whose schedule changes every ~4 hours, the rest are small houses
+that publish weekly. Each theater costs 2 requests (the two compared play
+dates). A theater is stale while its stored schedule misses a change; the
+first simulated day (cold start, everything crawled once) is not counted.
+"""
+import datetime as dt
+import random
+
+from crawlers.state_store import StateStore
+from crawlers.revisit import RevisitScheduler
+from models import Cinema, Screening
+
+THEATERS = 300
+MULTIPLEX_SHARE = 0.2
+HOURS = 24 * 14
+BUDGETS = (40, 80, 120)  # requests per invocation
+MULTIPLEX_RATE = 1 / 4
+SMALL_HOUSE_RATE = 1 / 168
+COST = 2
+MAX_STALENESS_HOURS = 24
+START = dt.datetime(2026, 10, 19, 0, 0)
+
+
+class MemoryState(StateStore):
+    def __init__(self):
+        self.state = {}
+
+    def load(self):
+        return self.state
+
+    def save(self, state):
+        self.state = state
+
+
+def screenings(theater: Cinema, version: int, play_dates: list[str]) -> list[Screening]:
+    return [
+        Screening(
+            provider="Dtryx",
+            cinema_name=theater.name,
+            cinema_code=theater.cinema_code,
+            screen_name="1관",
+            movie_title=f"상영 영화 v{version}",
+            play_date=play_date,
+            start_dt="10:00",
+            end_dt="12:00",
+            crawl_ts="2026-10-19T00:00:00",
+        )
+        for play_date in play_dates
+    ]
+
+
+def simulate(pick) -> dict[str, float]:
+    rng = random.Random(11)
+    theaters = [
+        Cinema(cinema_code=f"{i:04d}", name=f"극장 {i}", chain="Dtryx", latitude=37.5, longitude=127.0)
+        for i in range(THEATERS)
+    ]
+    rates = [MULTIPLEX_RATE if rng.random() < MULTIPLEX_SHARE else SMALL_HOUSE_RATE for _ in theaters]
+    version = [0] * THEATERS
+    changed_at: list[dt.datetime | None] = [None] * THEATERS  # first change the stored copy misses
+    last_crawl = [START] * THEATERS
+    stale_hours = 0.0
+    requests = 0
+    worst_age = dt.timedelta(0)
+
+    for hour in range(HOURS):
+        now = START + dt.timedelta(hours=hour)
+        for i, rate in enumerate(rates):
+            if rng.random() < rate:
+                version[i] += 1
+                changed_at[i] = changed_at[i] or now
+        selected = pick(theaters, now, version)
+        for theater in selected:
+            i = int(theater.cinema_code)
+            changed_at[i], last_crawl[i] = None, now
+        if hour < 24:
+            continue
+        requests += len(selected) * COST
+        stale_hours += sum(1 for c in changed_at if c is not None)
+        worst_age = max(worst_age, max(now - last for last in last_crawl))
+
+    measured = HOURS - 24
+    return {
+        "stale share": stale_hours / (THEATERS * measured),
+        "requests per run": requests / measured,
+        "worst age h": worst_age.total_seconds() / 3600,
+    }
+
+
+def round_robin(budget: int):
+    per_run = budget // COST
+    cursor = 0
+
+    def pick(theaters, now, version):
+        nonlocal cursor
+        chosen = [theaters[(cursor + k) % len(theaters)] for k in range(per_run)]
+        cursor = (cursor + per_run) % len(theaters)
+        return chosen
+
+    return pick
+
+
+def change_rate(budget: int):
+    scheduler = RevisitScheduler(MemoryState(), budget=budget, max_staleness_hours=MAX_STALENESS_HOURS)
+
+    def pick(theaters, now, version):
+        today = now.date()
+        play_dates = [(today + dt.timedelta(days=d)).isoformat() for d in (1, 2)]
+        chosen = scheduler.plan({"Dtryx": (theaters, COST)}, now=now)["Dtryx"]
+        batch = [s for t in chosen for s in screenings(t, version[int(t.cinema_code)], play_dates)]
+        scheduler.observe("Dtryx", chosen, play_dates, [batch], now=now, today=today)
+        scheduler.finish(now=now, today=today)
+        return chosen
+
+    return pick
+
+
+def main() -> None:
+    print(f"{THEATERS} theaters, {HOURS} hourly runs, max staleness {MAX_STALENESS_HOURS}h")
+    for budget in BUDGETS:
+        for name, pick in (("round-robin", round_robin(budget)), ("change-rate", change_rate(budget))):
+            stats = simulate(pick)
+            print(
+                f"budget {budget:4d}  {name:12s} stale {stats['stale share']:6.1%} of theater-hours, "
+                f"{stats['requests per run']:6.1f} requests/run, worst age {stats['worst age h']:5.1f}h"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Peak RSS per chain for holding a 14-day crawl as list[Screening] vs ScreeningBatch.
+
+    PYTHONPATH=. python benchmarks/screening_batch_memory.py
+
+Each (chain, mode) runs in a fresh subprocess; rows are generated one at a time
+so only the container under test is held in memory. Row counts approximate a
+14-day crawl of the theaters in cinemas.json.
+"""
+import resource
+import subprocess
+import sys
+
+from benchmarks.synthetic import CHAIN_SHAPES, generate
+from models import ScreeningBatch
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(chain: str, mode: str) -> None:
+    baseline = peak_rss_mb()
+    if mode == "list":
+        held = list(generate(chain))
+    else:
+        held = ScreeningBatch.from_screenings(generate(chain))
+    print(f"{len(held)} {peak_rss_mb() - baseline:.2f}")
+
+
+def main() -> None:
+    print(f"{'chain':<12}{'rows':>8}{'list MB':>10}{'batch MB':>10}{'ratio':>8}")
+    for chain in CHAIN_SHAPES:
+        results = {}
+        for mode in ("list", "batch"):
+            out = subprocess.run(
+                [sys.executable, __file__, chain, mode],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            results[mode] = (int(out[0]), float(out[1]))
+        rows = results["list"][0]
+        list_mb, batch_mb = results["list"][1], results["batch"][1]
+        ratio = list_mb / batch_mb if batch_mb > 0 else float("inf")
+        print(f"{chain:<12}{rows:>8}{list_mb:>10.2f}{batch_mb:>10.2f}{ratio:>7.1f}x")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(sys.argv[1], sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,79 @@
+"""
+Rows/sec for building, validating and dumping Screening rows.
+
+    PYTHONPATH=. python benchmarks/screening_throughput.py [rows]
+
+Compares per-row validation and dumping with bulk validation
+(validate_screenings), unvalidated construction (model_construct) and
+one-pass dumping (dump_screenings).
+"""
+import gc
+import sys
+import time
+
+from models import Screening, dump_screenings, validate_screenings
+
+
+def make_rows(n: int) -> list[dict]:
+    rows = []
+    for i in range(n):
+        minute = i % 1620  # up to 26:59
+        rows.append(
+            {
+                "provider": "Megabox",
+                "cinema_name": f"코엑스{i % 40}",
+                "cinema_code": f"{i % 40:04d}",
+                "screen_name": f"{i % 12 + 1}관",
+                "movie_title": f"영화 제목 {i % 60}",
+                "movie_title_en": f"Movie Title {i % 60}",
+                "source_movie_code": str(20000 + i % 60),
+                "play_date": "2026-10-19",
+                "start_dt": f"{minute // 60:02d}:{minute % 60:02d}",
+                "end_dt": f"{(minute + 120) // 60 % 27:02d}:{minute % 60:02d}",
+                "crawl_ts": "2026-10-19T03:00:00",
+                "url": f"https://www.megabox.co.kr/bookingByPlaySchdlNo?playSchdlNo={i}",
+                "remain_seat_cnt": i % 200,
+                "total_seat_cnt": 200,
+            }
+        )
+    return rows
+
+
+def timed(label: str, n: int, fn, repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+        del result
+    print(f"{label:<46} {best:8.3f}s {n / best:12,.0f} rows/s")
+
+
+def main(n: int) -> None:
+    rows = make_rows(n)
+    validated = [Screening(**r) for r in rows]
+    print(f"{n:,} rows (best of 3)")
+
+    timed("construct: Screening(**row)", n, lambda: [Screening(**r) for r in rows])
+    timed("construct: validate_screenings(rows)", n, lambda: validate_screenings(rows))
+    timed("construct: Screening.model_construct(**row)", n, lambda: [Screening.model_construct(**r) for r in rows])
+
+    timed("dump: model_dump per row", n, lambda: [s.model_dump(exclude_none=True) for s in validated])
+    timed("dump: dump_screenings", n, lambda: dump_screenings(validated))
+
+    timed(
+        "end-to-end: per-row validate + dump",
+        n,
+        lambda: [Screening(**r).model_dump(exclude_none=True) for r in rows],
+    )
+    timed("end-to-end: bulk validate + bulk dump", n, lambda: dump_screenings(validate_screenings(rows)))
+    timed(
+        "end-to-end: model_construct + bulk dump",
+        n,
+        lambda: dump_screenings([Screening.model_construct(**r) for r in rows]),
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
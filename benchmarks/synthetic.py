@@ -0,0 +1,42 @@
+"""
+Synthetic crawl output shared by the benchmarks.
+"""
+from models import Screening
+
+# chain -> (theaters, screenings per theater per day)
+CHAIN_SHAPES = {
+    "CGV": (8, 70),
+    "Megabox": (6, 60),
+    "Lotte": (4, 55),
+    "Dtryx": (4, 12),
+    "Moviee": (1, 10),
+    "TinyTicket": (1, 6),
+    "KOFA": (1, 5),
+}
+DAYS = 14
+
+
+def generate(chain: str):
+    theaters, per_day = CHAIN_SHAPES[chain]
+    crawl_ts = "2026-10-19T03:00:00.123456"
+    for day in range(DAYS):
+        play_date = f"2026-10-{day + 1:02d}"
+        for theater in range(theaters):
+            for n in range(per_day):
+                start = 9 * 60 + n * 17 % (18 * 60)
+                yield Screening(
+                    provider=chain,
+                    cinema_name=f"{chain} 극장 {theater}",
+                    cinema_code=f"{theater:04d}",
+                    screen_name=f"{n % 10 + 1}관",
+                    movie_title=f"상영 영화 제목 {n % 25}",
+                    movie_title_en=f"Feature Film Title {n % 25}",
+                    source_movie_code=str(24000 + n % 25),
+                    play_date=play_date,
+                    start_dt=f"{start // 60:02d}:{start % 60:02d}",
+                    end_dt=f"{(start + 125) // 60:02d}:{(start + 125) % 60:02d}",
+                    crawl_ts=crawl_ts,
+                    url=f"https://booking.example.com/ticket?theater={theater}&seq={day}{n}",
+                    remain_seat_cnt=n % 150,
+                    total_seat_cnt=150,
+                )
@@ -0,0 +1,41 @@
+"""
+Request bytes and JSON encode/decode time: row upsert payload vs the
+dictionary-encoded payload sent to `upsert_screenings_compact`.
+
+    PYTHONPATH=. python benchmarks/upsert_payload_size.py
+"""
+import json
+import time
+
+from benchmarks.synthetic import generate
+from models import ScreeningBatch
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    print(f"{'chain':<10}{'payload':<9}{'bytes':>12}{'encode ms':>11}{'decode ms':>11}")
+    for chain in ("CGV", "Megabox"):
+        batch = ScreeningBatch.from_screenings(generate(chain))
+        for label, payload in (
+            ("rows", batch.to_payload()),
+            ("compact", batch.to_compact_payloads()),
+        ):
+            body = json.dumps(payload, ensure_ascii=False)
+            encode = best_of(lambda: json.dumps(payload, ensure_ascii=False))
+            decode = best_of(lambda: json.loads(body))
+            print(
+                f"{chain:<10}{label:<9}{len(body.encode('utf-8')):>12,}"
+                f"{encode * 1000:>11.1f}{decode * 1000:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+On-disk cache for static assets requested by Playwright pages.
+
+Every new browser context re-downloads the same JS/CSS bundles and fonts,
+through the proxy, on every theater of every run. `AssetCache.handle` is
+called from a `page.route("**/*", ...)` handler:
+
+- immutable assets (content-hashed file names, `/_next/static/`, or
+  `Cache-Control: immutable` / a max-age of a week or more) are served from
+  disk without touching the network
+- other scripts, stylesheets and fonts that carry an ETag or Last-Modified are
+  revalidated with a conditional request and served from disk on 304
+- everything else, including API/XHR/fetch calls and documents, is not
+  handled here and goes to the network
+
+Entries are keyed by URL (their validators are stored with them), and the
+directory is kept under `max_bytes` by evicting the least recently used.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+ASSET_TYPES = {"script", "stylesheet", "font"}
+# A hex content hash in the file name, e.g. main.3f9a1c2b.js or chunk-5e1d0c9a7b.css
+_HASHED_NAME = re.compile(r"[.\-_~][0-9a-f]{8,}(?:\.[a-z0-9]+)?\.(?:m?js|css|woff2?|ttf|otf)$", re.I)
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+IMMUTABLE_MAX_AGE = 7 * 24 * 3600
+# Response headers not replayed from the cache (the stored body is already decoded).
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie", "date"}
+
+
+def new_asset_stats() -> dict[str, int]:
+    return {"hits": 0, "revalidated": 0, "misses": 0, "passthrough": 0, "bytes_fetched": 0, "bytes_from_cache": 0}
+
+
+def track_network_bytes(page, stats: dict[str, int], served: Optional[set] = None) -> None:
+    """
+    Add the response bytes of every finished request `AssetCache.handle` did
+    not serve. `served` is the set passed to `handle`; its misses are already
+    counted there, and without a cache every request is counted here.
+    """
+
+    async def on_finished(request) -> None:
+        if served is not None and request in served:
+            served.discard(request)
+            return
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats["bytes_fetched"] += max(sizes.get("responseBodySize", 0), 0) + max(sizes.get("responseHeadersSize", 0), 0)
+
+    page.on("requestfinished", on_finished)
+
+
+def is_immutable(url: str, headers: Optional[dict] = None) -> bool:
+    parsed = urlparse(url)
+    if "/_next/static/" in parsed.path or _HASHED_NAME.search(parsed.path):
+        return True
+    cache_control = (headers or {}).get("cache-control", "").lower()
+    if "immutable" in cache_control:
+        return True
+    max_age = _MAX_AGE.search(cache_control)
+    return bool(max_age and int(max_age.group(1)) >= IMMUTABLE_MAX_AGE and "no-cache" not in cache_control)
+
+
+class AssetCache:
+    _shared: dict[str, "AssetCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root: str | Path, max_bytes: int = 200 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        # key -> (size, last used); rebuilt from disk so warm Lambda containers keep their cache.
+        self._index: dict[str, tuple[int, float]] = {}
+        for meta_path in self.root.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            if body_path.exists():
+                stat = body_path.stat()
+                self._index[meta_path.stem] = (stat.st_size, stat.st_mtime)
+        self._size = sum(size for size, _ in self._index.values())
+
+    @classmethod
+    def from_env(cls) -> Optional["AssetCache"]:
+        """Process-wide cache under BROWSER_ASSET_CACHE_DIR, or None when unset."""
+        root = os.getenv("BROWSER_ASSET_CACHE_DIR")
+        if not root:
+            return None
+        with cls._shared_lock:
+            if root not in cls._shared:
+                max_mb = float(os.getenv("BROWSER_ASSET_CACHE_MAX_MB", "200"))
+                cls._shared[root] = cls(root, int(max_mb * 1024 * 1024))
+            return cls._shared[root]
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, url: str) -> Optional[tuple[dict[str, Any], bytes]]:
+        key = self.key(url)
+        if key not in self._index:
+            return None
+        try:
+            meta = json.loads((self.root / f"{key}.json").read_text(encoding="utf-8"))
+            body = (self.root / f"{key}.body").read_bytes()
+        except (OSError, ValueError):
+            self._drop(key)
+            return None
+        if meta.get("url") != url:
+            return None
+        now = time.time()
+        os.utime(self.root / f"{key}.body", (now, now))
+        self._index[key] = (len(body), now)
+        return meta, body
+
+    def put(self, url: str, status: int, headers: dict[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes // 4:
+            return
+        key = self.key(url)
+        meta = {
+            "url": url,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "immutable": is_immutable(url, headers),
+            "stored_at": time.time(),
+        }
+        for suffix, data in ((".body", body), (".json", json.dumps(meta).encode("utf-8"))):
+            tmp = self.root / f"{key}{suffix}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.root / f"{key}{suffix}")
+        self._size -= self._index.get(key, (0, 0))[0]
+        self._index[key] = (len(body), time.time())
+        self._size += len(body)
+        self._evict()
+
+    def _drop(self, key: str) -> None:
+        size, _ = self._index.pop(key, (0, 0))
+        self._size -= size
+        for suffix in (".body", ".json"):
+            (self.root / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        if self._size <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            self._drop(key)
+            if self._size <= self.max_bytes:
+                break
+
+    async def handle(self, route, stats: dict[str, int], served: Optional[set] = None) -> bool:
+        """
+        Serve or fill a static-asset request. Returns False (request untouched)
+        for anything that is not a GET for a script, stylesheet or font.
+        Requests it fulfills are added to `served` for `track_network_bytes`.
+        """
+        request = route.request
+        if request.method != "GET" or request.resource_type not in ASSET_TYPES:
+            stats["passthrough"] += 1
+            return False
+        if served is not None:
+            served.add(request)
+        try:
+            return await self._serve(route, request, stats)
+        except BaseException:
+            if served is not None:
+                served.discard(request)
+            raise
+
+    async def _serve(self, route, request, stats: dict[str, int]) -> bool:
+        url = request.url
+        cached = self.get(url)
+        if cached is not None and cached[0]["immutable"]:
+            meta, body = cached
+            stats["hits"] += 1
+            stats["bytes_from_cache"] += len(body)
+            await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return True
+
+        headers = dict(request.headers)
+        if cached is not None:
+            meta = cached[0]
+            if meta.get("etag"):
+                headers["if-none-match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["if-modified-since"] = meta["last_modified"]
+        response = await route.fetch(headers=headers)
+        if response.status == 304 and cached is not None:
+            meta, body = cached
+            stats["revalidated"] += 1
+            stats["bytes_from_cache"] += len(body)
+            await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return True
+
+        body = await response.body()
+        stats["misses"] += 1
+        stats["bytes_fetched"] += len(body)
+        response_headers = {k.lower(): v for k, v in response.headers.items()}
+        cache_control = response_headers.get("cache-control", "").lower()
+        if response.status == 200 and "no-store" not in cache_control and (
+            is_immutable(url, response_headers) or "etag" in response_headers or "last-modified" in response_headers
+        ):
+            self.put(url, response.status, response_headers, body)
+        await route.fulfill(response=response, body=body)
+        return True
@@ -1,17 +1,29 @@
 import abc
-import json
 import logging
-from pathlib import Path
 from typing import Iterable, List, get_args
 import datetime as dt
-from models import Screening, Chain, Cinema
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from models import Screening, ScreeningBatch, Chain, Cinema, SeatCount, hhmm_to_minutes
+from crawlers.cinema_registry import CinemaRegistry
+from crawlers.work_queue import WorkUnit
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+KST = ZoneInfo("Asia/Seoul")
+
 
 class BaseCrawler(abc.ABC):
     chain: Chain
+    # False when `run` ignores start_date/max_days and always returns its full range.
+    date_addressable: bool = True
+    # Cheap GET that answers whenever the chain's site is usable; see crawlers.probes.
+    probe_url: str | None = None
+    # Texts of the chain's access-block page.
+    block_markers: tuple[str, ...] = ()
 
     def __init__(self, supabase=None, batch_size: int = 10):
         if not hasattr(self, "chain") or self.chain not in get_args(Chain):
@@ -20,34 +32,57 @@ class BaseCrawler(abc.ABC):
         self.supabase = supabase
         self.batch_size = batch_size
         self.theaters: List[Cinema] = self.load_theaters()
+        # (unit, error) per theater/date whose crawl failed; drained by the handler.
+        self.failures: list[tuple[WorkUnit, str]] = []
+        self._window: tuple[dt.date, int] = (dt.date.today(), 1)
 
     def load_theaters(self) -> list[Cinema]:
         """
-        Load theaters from local JSON or fallback to Supabase.
-        Filters by `self.chain`.
+        Theaters of `self.chain` from the shared CinemaRegistry
+        (local JSON, or Supabase when the file is missing).
         """
         try:
-            root_dir = Path(__file__).parent.parent
-            json_path = root_dir / "cinemas.json"
-            if json_path.exists():
-                with open(json_path, encoding="utf-8") as fp:
-                    data = [Cinema(**c) for c in json.load(fp) if c["chain"] == self.chain]
-                logger.info("Loaded %d %s theaters from %s", len(data), self.chain, json_path)
-                return data
-            elif self.supabase:
-                raw = self.supabase.fetch_cinemas(chain=self.chain)
-                data = [Cinema(**c) for c in raw]
-                logger.info("Loaded %d %s theaters from Supabase", len(data), self.chain)
-                return data
+            return CinemaRegistry.shared(self.supabase).for_chain(self.chain)
         except Exception as exc:
             logger.error("Error loading theaters: %s", exc)
         return []
 
+    def record_failure(self, cinema_code: str, error: object, date: dt.date | None = None) -> None:
+        """Note a failed theater crawl for one date, or for the whole run window when `date` is None."""
+        start, days = (date, 1) if date is not None else self._window
+        self.failures.append((WorkUnit(self.chain, cinema_code, start.isoformat(), days), str(error)))
+
+    def take_failures(self) -> list[tuple[WorkUnit, str]]:
+        failures, self.failures = self.failures, []
+        return failures
+
+    @classmethod
+    def is_block_page(cls, text: str) -> bool:
+        normalized = (text or "").replace(" ", "")
+        return any(marker.replace(" ", "") in normalized for marker in cls.block_markers)
+
+    @classmethod
+    async def probe(cls, client: httpx.AsyncClient) -> str | None:
+        """
+        One lightweight request before the real crawl. Returns why the chain
+        looks unusable (outage, block page, rejected credentials), or None.
+        """
+        if cls.probe_url is None:
+            return None
+        resp = await client.get(cls.probe_url)
+        if resp.status_code >= 400:
+            return f"HTTP {resp.status_code}"
+        if cls.is_block_page(resp.text):
+            return "access-block page"
+        return None
+
     async def save_to_db(self, screenings: List) -> None:
         if not screenings:
             return
+        from crawlers.sinks import SupabaseSink
+
         try:
-            self.supabase.insert_screenings(screenings)
+            SupabaseSink(self.supabase).write(screenings)
             print(f"✅ Supabase insert successful for {self.chain}")
         except Exception as exc:
             print(f"❌ Supabase save error for {self.chain}: {exc}")
@@ -73,6 +108,66 @@ class BaseCrawler(abc.ABC):
 
         return collected
 
+    async def run_batch(
+            self,
+            start_date: dt.date | None = None,
+            max_days: int | None = None
+    ) -> ScreeningBatch:
+        """
+        Same crawl as `run`, collected into a columnar ScreeningBatch.
+        Date-iterating crawlers stream rows straight into the batch; crawlers that
+        override `run` (CGV, KOFA, TinyTicket) are converted after the fact.
+        """
+        start = start_date or dt.date.today()
+        self._window = (start, max_days or 1)
+        if type(self).run is not BaseCrawler.run:
+            return ScreeningBatch.from_screenings(await self.run(start_date, max_days))
+
+        batch = ScreeningBatch()
+        day_offset = 0
+        while max_days is None or day_offset < max_days:
+            target_date = start + dt.timedelta(days=day_offset)
+            async for screening in self.iter(target_date):
+                batch.append(screening)
+            day_offset += 1
+        return batch
+
+    @property
+    def supports_seats(self) -> bool:
+        """
+        Whether the crawler defines `async def iter_seats(self, date) ->
+        AsyncIterator[SeatCount]`: seat counts only, from the chain's cheapest
+        schedule endpoint.
+        """
+        return hasattr(self, "iter_seats")
+
+    async def run_seats(self, within_hours: float, now: dt.datetime | None = None) -> list[SeatCount]:
+        """
+        Seat counts for screenings starting within the next `within_hours`.
+        `now` is local (KST) wall-clock time; yesterday's play date is included
+        while its 24:00-26:59 screenings can still be upcoming.
+        """
+        if not self.supports_seats:
+            raise NotImplementedError(f"{self.chain} has no seats-only refresh")
+        now = now or dt.datetime.now(KST)
+        window_start = now.hour * 60 + now.minute
+        window_end = window_start + int(within_hours * 60)
+        today = now.date()
+
+        seats: list[SeatCount] = []
+        for offset in range(-1, window_end // 1440 + 1):
+            date = today + dt.timedelta(days=offset)
+            if offset == -1 and window_start >= 3 * 60:
+                continue
+            play_date = date.isoformat()
+            async for seat in self.iter_seats(date):
+                if seat.play_date != play_date:
+                    continue
+                start = hhmm_to_minutes(seat.start_dt) + offset * 1440
+                if window_start <= start <= window_end:
+                    seats.append(seat)
+        return seats
+
     @abc.abstractmethod
     async def iter(self, date: dt.date) -> Iterable[Screening]:
         """A-sync generator yielding Screening objects"""
\ No newline at end of file
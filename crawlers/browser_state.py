@@ -0,0 +1,145 @@
+"""
+Persisted Playwright storage state (cookies + localStorage) for browser crawlers.
+
+A context that starts with the cookies of an earlier successful visit skips
+the site's first-visit and bot-check flows. States are keyed per proxy exit,
+since bot-check clearances are usually tied to the client IP, and stored as
+
+    {"saved_at": iso, "state": {"cookies": [...], "origins": [...]}}
+
+in a local directory or an S3-style bucket. `load` only returns states that
+pass `healthy`: younger than `max_age`, well-formed, and still holding an
+unexpired cookie for the site. Callers `discard` a state that was in use when
+the site served its block page, so the next context starts cold.
+"""
+import abc
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# Hours a saved storage state is reused before contexts start cold again.
+BROWSER_STATE_MAX_AGE_HOURS = float(os.getenv("BROWSER_STATE_MAX_AGE_HOURS", "12"))
+
+
+def state_key(site: str, proxy: Optional[dict]) -> str:
+    exit_id = f"{proxy.get('username') or ''}@{proxy['server']}" if proxy else "direct"
+    return f"{site}/{hashlib.blake2b(exit_id.encode('utf-8'), digest_size=8).hexdigest()}.json"
+
+
+def healthy(record: Any, domain: str, max_age: dt.timedelta, now: Optional[dt.datetime] = None) -> bool:
+    now = now or dt.datetime.utcnow()
+    try:
+        if now - dt.datetime.fromisoformat(record["saved_at"]) > max_age:
+            return False
+        state = record["state"]
+        cookies, origins = state["cookies"], state.get("origins", [])
+        if not isinstance(cookies, list) or not isinstance(origins, list):
+            return False
+        # Playwright marks session cookies with expires == -1.
+        epoch = time.time()
+        return any(
+            domain in cookie.get("domain", "") and (cookie.get("expires", -1) < 0 or cookie["expires"] > epoch)
+            for cookie in cookies
+        )
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+class BrowserStateStore(abc.ABC):
+    def __init__(self, max_age_hours: float = BROWSER_STATE_MAX_AGE_HOURS):
+        self.max_age = dt.timedelta(hours=max_age_hours)
+
+    @abc.abstractmethod
+    def _read(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abc.abstractmethod
+    def _write(self, key: str, body: bytes) -> None:
+        ...
+
+    @abc.abstractmethod
+    def discard(self, key: str) -> None:
+        ...
+
+    def load(self, key: str, domain: str) -> Optional[dict]:
+        """A healthy storage state for `key`, or None (an unhealthy one is discarded)."""
+        body = self._read(key)
+        if body is None:
+            return None
+        try:
+            record = json.loads(body)
+        except ValueError:
+            record = None
+        if not healthy(record, domain, self.max_age):
+            self.discard(key)
+            return None
+        return record["state"]
+
+    def save(self, key: str, state: dict) -> None:
+        record = {"saved_at": dt.datetime.utcnow().isoformat(), "state": state}
+        self._write(key, json.dumps(record, ensure_ascii=False).encode("utf-8"))
+
+
+class LocalBrowserStateStore(BrowserStateStore):
+    def __init__(self, root: str | Path, **kwargs):
+        super().__init__(**kwargs)
+        self.root = Path(root)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        target = self.root / key
+        return target.read_bytes() if target.exists() else None
+
+    def _write(self, key: str, body: bytes) -> None:
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, target)
+
+    def discard(self, key: str) -> None:
+        (self.root / key).unlink(missing_ok=True)
+
+
+class ObjectBrowserStateStore(BrowserStateStore):
+    """S3-style bucket; `client` is a boto3 S3 client or e.g. snapshots.LocalObjectClient."""
+
+    def __init__(self, bucket: str, prefix: str = "", client=None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3")
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except Exception as exc:
+            if type(exc).__name__ in {"NoSuchKey", "FileNotFoundError"} or "NoSuchKey" in str(exc):
+                return None
+            raise
+
+    def _write(self, key: str, body: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket, Key=self.prefix + key, Body=body, ContentType="application/json"
+        )
+
+    def discard(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+
+def get_browser_state_store(
+    *, directory: str | None = None, bucket: str | None = None, prefix: str = ""
+) -> BrowserStateStore | None:
+    """Local directory wins over a bucket; None when neither is configured."""
+    if directory:
+        return LocalBrowserStateStore(directory)
+    if bucket:
+        return ObjectBrowserStateStore(bucket, prefix)
+    return None
@@ -2,16 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import datetime as dt
+import json
 import os
+import statistics
+import time
+from collections import deque
 from pathlib import Path
 from typing import Iterable
 from urllib.parse import urlparse
 
 import httpx
-import random
 from playwright.async_api import async_playwright, Browser, TimeoutError as PlaywrightTimeoutError
 
+from crawlers.asset_cache import AssetCache, new_asset_stats, track_network_bytes
 from crawlers.base import BaseCrawler
+from crawlers.browser_state import get_browser_state_store, state_key
+from crawlers.proxy_pool import ProxyPool
+from crawlers.spans import SpanRecorder
 from models import Screening, Chain, Cinema
 from crawlers.supabase_client import SupabaseClient
 
@@ -22,11 +29,15 @@ class CGVAccessBlockedError(RuntimeError):
 
 class CGVCrawler(BaseCrawler):
     chain: Chain = "CGV"
+    # The booking page lists every date a theater has; `run` always crawls all of them.
+    date_addressable = False
     block_markers = (
         "비정상적으로 CGV에 접속한 것이 확인되어 이용이 제한되었어요",
         "RAY_ID",
         "CLIENT_IP",
     )
+    probe_url = "https://cgv.co.kr/cnm/movieBook/cinema"
+    probe_proxies = 3
     modal_selector_candidates = (
         ".cgv-bot-modal.active",
         ".cgv-bot-modal",
@@ -37,6 +48,20 @@ class CGVCrawler(BaseCrawler):
         super().__init__(supabase=supabase, batch_size=batch_size)
         if not self.theaters:
             raise ValueError("No CGV theaters found")
+        # Cookies/localStorage of earlier successful visits, per proxy exit.
+        try:
+            self.state_store = get_browser_state_store(
+                directory=os.getenv("CGV_STATE_DIR"),
+                bucket=os.getenv("CGV_STATE_BUCKET"),
+                prefix=os.getenv("CGV_STATE_PREFIX", "browser-state"),
+            )
+        except Exception as e:
+            print(f"WARN: Could not open browser state store, starting contexts cold: {e}")
+            self.state_store = None
+        # (started warm, seconds from navigation to the first searchMovScnInfo response)
+        self.first_schedule_times: list[tuple[bool, float]] = []
+        # (seconds from navigation to the theater modal, asset/network byte counts) per theater
+        self.page_loads: list[tuple[float | None, dict[str, int]]] = []
 
     @staticmethod
     def _env_bool(name: str, default: bool = False) -> bool:
@@ -45,42 +70,61 @@ class CGVCrawler(BaseCrawler):
             return default
         return raw.lower() in {"1", "true", "yes", "on"}
 
-    async def _fetch_proxy(self) -> dict | None:
-        api_key = os.getenv("WEBSHARE_API_KEY")
-        if not api_key:
-            return None
-        try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(
-                    "https://proxy.webshare.io/api/v2/proxy/list/",
-                    params={"mode": "direct", "page_size": 100},
-                    headers={"Authorization": f"Token {api_key}"},
-                )
-                resp.raise_for_status()
-            proxies = [p for p in resp.json()["results"] if p.get("valid")]
-            if not proxies:
-                raise ValueError("No valid proxies in list")
-            p = random.choice(proxies)
-            return {
-                "server": f"http://{p['proxy_address']}:{p['port']}",
-                "username": p["username"],
-                "password": p["password"],
-            }
-        except Exception as e:
-            print(f"⚠ Could not fetch proxy list: {e}. Proceeding without proxy.")
-            return None
+    @classmethod
+    async def probe(cls, client: httpx.AsyncClient) -> str | None:
+        """
+        Probe through the proxy pool like the crawl itself (blocks are per IP),
+        rotating past up to `probe_proxies` blocked or failing proxies.
+        """
+        pool = ProxyPool.from_env()
+        if pool is None or not await pool.proxies():
+            return await super().probe(client)
+        error = "no usable proxy"
+        for _ in range(cls.probe_proxies):
+            proxy = await pool.acquire()
+            if proxy is None:
+                break
+            host = proxy["server"].removeprefix("http://")
+            auth = f"{proxy['username']}:{proxy['password']}@" if proxy.get("username") else ""
+            started = time.perf_counter()
+            try:
+                async with httpx.AsyncClient(
+                    proxy=f"http://{auth}{host}", timeout=client.timeout, headers=client.headers
+                ) as proxied:
+                    error = await super().probe(proxied)
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                pool.release(proxy)
+            if error is None:
+                pool.report_success(proxy, time.perf_counter() - started)
+                return None
+            if error == "access-block page":
+                pool.report_block(proxy)
+            else:
+                pool.report_failure(proxy)
+        return error
 
     async def run(
         self, start_date: dt.date | None = None, max_days: int | None = None
     ) -> list[Screening]:
         screenings = []
         crawl_ts = dt.datetime.utcnow()
+        # Per-phase timing spans of crawl_theater for this run (see crawlers.spans).
+        self.spans = SpanRecorder.from_env(self.chain)
         headless = os.getenv("CGV_HEADLESS", "1").lower() not in {"0", "false", "no"}
-        proxy = await self._fetch_proxy()
-        if proxy:
-            print("  Using Webshare proxy for CGV crawl.")
+        pool = ProxyPool.from_env()
+        if pool is not None and not await pool.proxies():
+            pool = None
+        # Parallel browser contexts, each on its own proxy.
+        concurrency = max(1, int(os.getenv("CGV_CONCURRENCY", "1")))
+        if pool is not None:
+            concurrency = min(concurrency, len(await pool.proxies()))
+            print(f"  Using {pool.source.name} proxy pool ({len(await pool.proxies())} proxies) for CGV crawl.")
         else:
+            concurrency = 1
             print("  No proxy configured — proceeding without proxy.")
+        max_rotations = int(os.getenv("CGV_MAX_PROXY_ROTATIONS", "5"))
 
         async with async_playwright() as p:
             browser = await p.chromium.launch(
@@ -116,29 +160,96 @@ class CGVCrawler(BaseCrawler):
                 ],
             )
 
-            for i in range(0, len(self.theaters), self.batch_size):
-                batch = self.theaters[i : i + self.batch_size]
-                for theater_index, theater in enumerate(batch):
-                    try:
-                        theater_screenings = await self.crawl_theater(
-                            browser, theater, theater_index, len(batch), crawl_ts, proxy
-                        )
-                    except CGVAccessBlockedError as exc:
-                        print(f"❌ {exc}")
-                        print("❌ Stopping CGV crawl early due to access block.")
-                        return screenings
-                    screenings.extend(theater_screenings)
-                    await asyncio.sleep(0)
+            pending = deque(self.theaters)
+            total = len(self.theaters)
+            rotations = 0
+            stopped = False
+            last_block: CGVAccessBlockedError | None = None
+
+            async def crawl_pending():
+                """One browser context's loop; on a block, rotate to the next-best proxy and retry."""
+                nonlocal rotations, stopped, last_block
+                proxy = await pool.acquire() if pool is not None else None
+                if pool is not None and proxy is None:
+                    return
+                try:
+                    while pending and not stopped:
+                        theater = pending.popleft()
+                        theater_index = total - len(pending) - 1
+                        started = time.perf_counter()
+                        failures_before = len(self.failures)
+                        try:
+                            theater_screenings = await self.crawl_theater(
+                                browser, theater, theater_index, total, crawl_ts, proxy
+                            )
+                        except CGVAccessBlockedError as exc:
+                            pending.appendleft(theater)
+                            last_block = exc
+                            print(f"❌ {exc}")
+                            if pool is not None:
+                                pool.report_block(proxy)
+                            if pool is None or rotations >= max_rotations:
+                                stopped = True
+                                return
+                            pool.release(proxy)
+                            proxy = await pool.acquire()
+                            if proxy is None:
+                                # Every other proxy is cooling down or held by another context.
+                                return
+                            rotations += 1
+                            print(f"  Rotating to another proxy ({rotations}/{max_rotations}) and resuming.")
+                            continue
+                        if pool is not None:
+                            failed = any(
+                                unit.cinema_code == theater.cinema_code for unit, _ in self.failures[failures_before:]
+                            )
+                            if failed:
+                                pool.report_failure(proxy)
+                            else:
+                                pool.report_success(proxy, time.perf_counter() - started)
+                        screenings.extend(theater_screenings)
+                        await asyncio.sleep(0)
+                finally:
+                    if pool is not None:
+                        pool.release(proxy)
+
+            await asyncio.gather(*(crawl_pending() for _ in range(concurrency)))
+            if pending:
+                print("❌ Stopping CGV crawl early due to access block.")
+                for skipped in pending:
+                    self.record_failure(skipped.cinema_code, last_block or "no usable proxy left")
+            if pool is not None:
+                print(f"  Proxy health: {pool.health()}")
+            self._print_timing_summary()
+            self.spans.print_summary()
+            self.spans.close()
 
         return screenings
 
+    def _print_timing_summary(self) -> None:
+        ready = [secs for secs, _ in self.page_loads if secs is not None]
+        if self.page_loads:
+            fetched = sum(stats["bytes_fetched"] for _, stats in self.page_loads)
+            from_cache = sum(stats["bytes_from_cache"] for _, stats in self.page_loads)
+            print(
+                f"  Pages: median ready {statistics.median(ready) if ready else 0:.2f}s, "
+                f"{fetched / 1024:.0f} KB fetched, {from_cache / 1024:.0f} KB from asset cache "
+                f"over {len(self.page_loads)} theater(s)"
+            )
+        for warm in (True, False):
+            times = [secs for started_warm, secs in self.first_schedule_times if started_warm is warm]
+            if times:
+                print(
+                    f"  First searchMovScnInfo with {'warm' if warm else 'cold'} state: "
+                    f"median {statistics.median(times):.2f}s over {len(times)} theater(s)"
+                )
+
     async def _is_access_blocked(self, page) -> bool:
         try:
             text = await page.inner_text("body")
         except Exception:
             return False
-        normalized = (text or "").replace(" ", "")
-        return any(marker.replace(" ", "") in normalized for marker in self.block_markers)
+        return self.is_block_page(text)
 
     async def _wait_for_theater_modal(self, page) -> str:
         for selector in self.modal_selector_candidates:
@@ -205,12 +316,28 @@ class CGVCrawler(BaseCrawler):
         )
         if proxy:
             context_kwargs["proxy"] = proxy
-        context = await browser.new_context(**context_kwargs)
-        # Inject basic stealth to hide navigator.webdriver
-        await context.add_init_script(
-            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        )
-        page = await context.new_page()
+        state_name = state_key("cgv", proxy)
+        storage_state = None
+        if self.state_store is not None:
+            try:
+                storage_state = self.state_store.load(state_name, "cgv.co.kr")
+            except Exception as e:
+                print(f"  WARN: Could not load browser state: {e}")
+        if storage_state is not None:
+            context_kwargs["storage_state"] = storage_state
+        warm = storage_state is not None
+        timing = {"navigation": None, "page_ready": None, "first_schedule": None}
+        # searchMovScnInfo responses captured for this theater and their body bytes.
+        capture = {"responses": 0, "bytes": 0}
+        theater_span = {"span": "theater", "theater": theater.cinema_code, "warm": warm, "retries": 0}
+        theater_started = time.perf_counter()
+        with self.spans.span("context", theater=theater.cinema_code, warm=warm):
+            context = await browser.new_context(**context_kwargs)
+            # Inject basic stealth to hide navigator.webdriver
+            await context.add_init_script(
+                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            )
+            page = await context.new_page()
         bandwidth_saver = self._env_bool("CGV_BANDWIDTH_SAVER", default=False)
         blocked_counts = {"font": 0, "tracker": 0, "image": 0}
         tracker_hosts = {
@@ -220,27 +347,38 @@ class CGVCrawler(BaseCrawler):
             "ad.cgv.co.kr",
             "www.google.co.kr",
         }
+        asset_cache = AssetCache.from_env()
+        asset_stats = new_asset_stats()
+        # Requests fulfilled by the asset cache; track_network_bytes skips them.
+        cache_served = set()
         route_handler = None
-        if bandwidth_saver:
-            async def _route_with_bandwidth_saver(route):
+        if bandwidth_saver or asset_cache is not None:
+            async def _route_requests(route):
                 req = route.request
                 host = urlparse(req.url).netloc
                 rtype = req.resource_type
 
-                if host in tracker_hosts:
-                    blocked_counts["tracker"] += 1
-                    await route.abort()
-                    return
-                if rtype == "font":
-                    blocked_counts["font"] += 1
-                    await route.abort()
-                    return
-                if rtype == "image":
-                    blocked_counts["image"] += 1
-                    await route.abort()
-                    return
+                if bandwidth_saver:
+                    if host in tracker_hosts:
+                        blocked_counts["tracker"] += 1
+                        await route.abort()
+                        return
+                    if rtype == "font":
+                        blocked_counts["font"] += 1
+                        await route.abort()
+                        return
+                    if rtype == "image":
+                        blocked_counts["image"] += 1
+                        await route.abort()
+                        return
+                if asset_cache is not None:
+                    try:
+                        if await asset_cache.handle(route, asset_stats, cache_served):
+                            return
+                    except Exception as e:
+                        print(f"  WARN: Asset cache skipped {req.url}: {e}")
                 await route.continue_()
-            route_handler = _route_with_bandwidth_saver
+            route_handler = _route_requests
         screenings = []
 
         try:
@@ -260,13 +398,18 @@ class CGVCrawler(BaseCrawler):
                 )
 
             async def append_from_response(response) -> int:
+                if timing["first_schedule"] is None and timing["navigation"] is not None:
+                    timing["first_schedule"] = time.perf_counter() - timing["navigation"]
                 try:
                     import re
 
                     date_match = re.search(r"scnYmd=(\d{8})", response.url)
                     date = date_match.group(1) if date_match else "unknown"
 
-                    data = await response.json()
+                    body = await response.body()
+                    capture["responses"] += 1
+                    capture["bytes"] += len(body)
+                    data = json.loads(body)
                     if not (data and data.get("statusCode") == 0 and data.get("data")):
                         print(f"    API returned no data for date {date}")
                         return 0
@@ -297,31 +440,53 @@ class CGVCrawler(BaseCrawler):
                     print(f"    WARN: Failed to parse schedule response: {e}")
                     return 0
 
+            def count_captured(span, before: dict, rows: int) -> None:
+                span["responses"] = capture["responses"] - before["responses"]
+                span["bytes"] = capture["bytes"] - before["bytes"]
+                span["rows"] = rows
+
             async def collect_schedule_after_action(
-                action, first_timeout_ms: int, followup_timeout_ms: int = 800
+                action, first_timeout_ms: int, followup_timeout_ms: int = 800, phase: str = "click", **span_attrs
             ) -> tuple[int, bool]:
                 total_added = 0
-                try:
-                    async with page.expect_response(
-                        is_schedule_response, timeout=first_timeout_ms
-                    ) as first_resp_info:
-                        await action()
-                    first_resp = await first_resp_info.value
-                    total_added += await append_from_response(first_resp)
-                except PlaywrightTimeoutError:
-                    return 0, False
-
-                # Collect trailing schedule responses emitted by the same UI action.
-                while True:
+                # `phase`: the action up to its first schedule response; `<phase>.followup`: trailing waits.
+                # `retries` counts a first wait that timed out and every extra follow-up wait that
+                # caught another response; both also add to the theater's retries.
+                with self.spans.span(phase, theater=theater.cinema_code, retries=0, **span_attrs) as span:
+                    before = dict(capture)
                     try:
-                        resp = await page.wait_for_event(
-                            "response",
-                            predicate=is_schedule_response,
-                            timeout=followup_timeout_ms,
-                        )
+                        async with page.expect_response(
+                            is_schedule_response, timeout=first_timeout_ms
+                        ) as first_resp_info:
+                            await action()
+                        first_resp = await first_resp_info.value
+                        total_added += await append_from_response(first_resp)
                     except PlaywrightTimeoutError:
-                        break
-                    total_added += await append_from_response(resp)
+                        span["timed_out"] = True
+                        span["retries"] += 1
+                        return 0, False
+                    finally:
+                        count_captured(span, before, total_added)
+                        theater_span["retries"] += span["retries"]
+
+                # Collect trailing schedule responses emitted by the same UI action.
+                with self.spans.span(
+                    f"{phase}.followup", theater=theater.cinema_code, retries=0, **span_attrs
+                ) as span:
+                    before, first_added = dict(capture), total_added
+                    while True:
+                        try:
+                            resp = await page.wait_for_event(
+                                "response",
+                                predicate=is_schedule_response,
+                                timeout=followup_timeout_ms,
+                            )
+                        except PlaywrightTimeoutError:
+                            break
+                        span["retries"] += 1
+                        total_added += await append_from_response(resp)
+                    count_captured(span, before, total_added - first_added)
+                    theater_span["retries"] += span["retries"]
                 return total_added, True
 
             async def is_date_span_disabled(span) -> bool:
@@ -342,6 +507,7 @@ class CGVCrawler(BaseCrawler):
                     return True
 
             async def attach_page_hooks(target_page):
+                track_network_bytes(target_page, asset_stats, cache_served)
                 if route_handler is not None:
                     await target_page.route("**/*", route_handler)
 
@@ -350,28 +516,34 @@ class CGVCrawler(BaseCrawler):
             await attach_page_hooks(page)
 
             url = "https://cgv.co.kr/cnm/movieBook/cinema"
+            timing["navigation"] = time.perf_counter()
             goto_attempts = ((1, 12000), (2, 18000))
-            for attempt, timeout_ms in goto_attempts:
-                try:
-                    print(f"  Navigating to CGV cinema page... (attempt {attempt}/2)")
-                    await page.goto(
-                        url,
-                        wait_until="domcontentloaded",
-                        timeout=timeout_ms,
-                    )
-                    break
-                except Exception as e:
-                    if attempt == 2:
-                        raise
-                    print(f"  WARN: page.goto retrying after error: {e}")
+            with self.spans.span("goto", theater=theater.cinema_code, retries=0) as goto_span:
+                for attempt, timeout_ms in goto_attempts:
                     try:
-                        await page.close()
-                    except Exception:
-                        pass
-                    page = await context.new_page()
-                    await attach_page_hooks(page)
-                    await asyncio.sleep(0.5)
-            modal_selector = await self._wait_for_theater_modal(page)
+                        print(f"  Navigating to CGV cinema page... (attempt {attempt}/2)")
+                        await page.goto(
+                            url,
+                            wait_until="domcontentloaded",
+                            timeout=timeout_ms,
+                        )
+                        break
+                    except Exception as e:
+                        if attempt == 2:
+                            raise
+                        print(f"  WARN: page.goto retrying after error: {e}")
+                        goto_span["retries"] += 1
+                        theater_span["retries"] += 1
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+                        page = await context.new_page()
+                        await attach_page_hooks(page)
+                        await asyncio.sleep(0.5)
+            with self.spans.span("modal", theater=theater.cinema_code):
+                modal_selector = await self._wait_for_theater_modal(page)
+            timing["page_ready"] = time.perf_counter() - timing["navigation"]
             print(f"  Clicking on theater: {theater_name_for_click}")
             print(f"  Waiting for initial data to load...")
             async def click_theater():
@@ -380,154 +552,163 @@ class CGVCrawler(BaseCrawler):
                 ).click()
 
             _, initial_load_success = await collect_schedule_after_action(
-                click_theater, first_timeout_ms=15000
+                click_theater, first_timeout_ms=15000, phase="initial_click"
             )
             if not initial_load_success:
                 print(f"  WARNING: Initial data load timed out!")
+            if timing["first_schedule"] is not None:
+                self.first_schedule_times.append((warm, timing["first_schedule"]))
+                print(
+                    f"  First searchMovScnInfo after {timing['first_schedule']:.2f}s "
+                    f"({'warm' if warm else 'cold'} state)"
+                )
 
             print(f"  Initial data loaded: {len(theater_data)} screenings")
 
             # Find all available date navigation elements for this specific theater
             try:
-                # Get fresh date elements each time to avoid stale references
-                date_spans = await page.query_selector_all(
-                    "span.dayScroll_number__o8i9s"
-                )
-                print(f"  Found {len(date_spans)} total date elements for {theater.name}")
-
-                if len(date_spans) == 0:
-                    print(f"  WARNING: No date navigation elements found!")
-                else:
-                    # Track enabled/disabled state per visible date label.
-                    # If the same label appears multiple times (carousel clones/month boundary),
-                    # treat it as enabled when ANY instance is clickable.
-                    date_states: dict[str, dict[str, bool]] = {}
-                    ordered_dates: list[str] = []
-
-                    for span in date_spans:
-                        try:
-                            date_text = (await span.inner_text()).strip()
-                            if not date_text:
+                dates_to_click = []
+                with self.spans.span("date_strip", theater=theater.cinema_code) as strip_span:
+                    # Get fresh date elements each time to avoid stale references
+                    date_spans = await page.query_selector_all(
+                        "span.dayScroll_number__o8i9s"
+                    )
+                    print(f"  Found {len(date_spans)} total date elements for {theater.name}")
+
+                    if len(date_spans) == 0:
+                        print(f"  WARNING: No date navigation elements found!")
+                    else:
+                        # Track enabled/disabled state per visible date label.
+                        # If the same label appears multiple times (carousel clones/month boundary),
+                        # treat it as enabled when ANY instance is clickable.
+                        date_states: dict[str, dict[str, bool]] = {}
+                        ordered_dates: list[str] = []
+
+                        for span in date_spans:
+                            try:
+                                date_text = (await span.inner_text()).strip()
+                                if not date_text:
+                                    continue
+                                is_disabled = await is_date_span_disabled(span)
+
+                                if date_text not in date_states:
+                                    date_states[date_text] = {
+                                        "enabled": False,
+                                        "disabled": False,
+                                    }
+                                    ordered_dates.append(date_text)
+
+                                if is_disabled:
+                                    date_states[date_text]["disabled"] = True
+                                else:
+                                    date_states[date_text]["enabled"] = True
+                            except Exception:
                                 continue
-                            is_disabled = await is_date_span_disabled(span)
 
-                            if date_text not in date_states:
-                                date_states[date_text] = {
-                                    "enabled": False,
-                                    "disabled": False,
-                                }
-                                ordered_dates.append(date_text)
+                        available_dates = [
+                            d for d in ordered_dates if date_states[d]["enabled"]
+                        ]
+                        disabled_only_dates = sorted(
+                            [
+                                d
+                                for d in ordered_dates
+                                if date_states[d]["disabled"] and not date_states[d]["enabled"]
+                            ]
+                        )
+
+                        print(f"  Enabled dates: {available_dates}")
+                        if disabled_only_dates:
+                            print(f"  Disabled dates (skipped): {disabled_only_dates}")
+
+                        # Skip only the ACTUAL initially loaded date, not blindly available_dates[0].
+                        loaded_date_label = None
+                        if theater_data:
+                            loaded_scn_ymd = str(theater_data[0].get("scnYmd") or "").strip()
+                            if len(loaded_scn_ymd) == 8 and loaded_scn_ymd.isdigit():
+                                loaded_date_label = loaded_scn_ymd[6:]
+
+                        dates_to_click = []
+                        loaded_date_skipped = False
+                        for date_label in available_dates:
+                            if (
+                                not loaded_date_skipped
+                                and loaded_date_label is not None
+                                and date_label == loaded_date_label
+                            ):
+                                loaded_date_skipped = True
+                                continue
+                            dates_to_click.append(date_label)
 
-                            if is_disabled:
-                                date_states[date_text]["disabled"] = True
+                        if loaded_date_label:
+                            if loaded_date_skipped:
+                                print(
+                                    f"  Skipping loaded date '{loaded_date_label}'"
+                                )
                             else:
-                                date_states[date_text]["enabled"] = True
-                        except Exception:
-                            continue
+                                print(
+                                    f"  Loaded date '{loaded_date_label}' not found among enabled dates"
+                                )
+                        print(
+                            f"  Will click remaining {len(dates_to_click)} dates: {dates_to_click}"
+                        )
+                    strip_span["dates"] = len(dates_to_click)
 
-                    available_dates = [
-                        d for d in ordered_dates if date_states[d]["enabled"]
-                    ]
-                    disabled_only_dates = sorted(
-                        [
-                            d
-                            for d in ordered_dates
-                            if date_states[d]["disabled"] and not date_states[d]["enabled"]
-                        ]
-                    )
+                # Click through remaining available dates using fresh queries
+                for j, target_date in enumerate(dates_to_click):
+                    try:
+                        print(
+                            f"    [{j+1}/{len(dates_to_click)}] Clicking on date: {target_date}"
+                        )
 
-                    print(f"  Enabled dates: {available_dates}")
-                    if disabled_only_dates:
-                        print(f"  Disabled dates (skipped): {disabled_only_dates}")
-
-                    # Skip only the ACTUAL initially loaded date, not blindly available_dates[0].
-                    loaded_date_label = None
-                    if theater_data:
-                        loaded_scn_ymd = str(theater_data[0].get("scnYmd") or "").strip()
-                        if len(loaded_scn_ymd) == 8 and loaded_scn_ymd.isdigit():
-                            loaded_date_label = loaded_scn_ymd[6:]
-
-                    dates_to_click = []
-                    loaded_date_skipped = False
-                    for date_label in available_dates:
-                        if (
-                            not loaded_date_skipped
-                            and loaded_date_label is not None
-                            and date_label == loaded_date_label
-                        ):
-                            loaded_date_skipped = True
-                            continue
-                        dates_to_click.append(date_label)
+                        # Re-query to get a fresh element reference
+                        fresh_date_spans = await page.query_selector_all(
+                            "span.dayScroll_number__o8i9s"
+                        )
+                        target_span = None
+
+                        for span in fresh_date_spans:
+                            try:
+                                span_text = await span.inner_text()
+                                if (
+                                    span_text == target_date
+                                    and not await is_date_span_disabled(span)
+                                ):
+                                    target_span = span
+                                    break
+                            except:
+                                continue
 
-                    if loaded_date_label:
-                        if loaded_date_skipped:
+                        if not target_span:
                             print(
-                                f"  Skipping loaded date '{loaded_date_label}'"
+                                f"    ✗ Could not find date {target_date} on current page"
                             )
-                        else:
-                            print(
-                                f"  Loaded date '{loaded_date_label}' not found among enabled dates"
-                            )
-                    print(
-                        f"  Will click remaining {len(dates_to_click)} dates: {dates_to_click}"
-                    )
+                            continue
 
-                    # Click through remaining available dates using fresh queries
-                    for j, target_date in enumerate(dates_to_click):
-                        try:
+                        initial_count = len(theater_data)
+                        async def click_date():
+                            await target_span.click(timeout=3000)
+
+                        added_count, load_success = await collect_schedule_after_action(
+                            click_date, first_timeout_ms=8000, phase="date_click", date=target_date
+                        )
+                        new_count = len(theater_data)
+
+                        if load_success and added_count > 0:
                             print(
-                                f"    [{j+1}/{len(dates_to_click)}] Clicking on date: {target_date}"
+                                f"    ✓ Added {added_count} new screenings (Total: {new_count})"
                             )
-
-                            # Re-query to get a fresh element reference
-                            fresh_date_spans = await page.query_selector_all(
-                                "span.dayScroll_number__o8i9s"
+                        elif load_success and added_count == 0:
+                            print(
+                                f"    ⚠ Date {target_date} loaded but no new screenings (Total: {new_count})"
                             )
-                            target_span = None
-
-                            for span in fresh_date_spans:
-                                try:
-                                    span_text = await span.inner_text()
-                                    if (
-                                        span_text == target_date
-                                        and not await is_date_span_disabled(span)
-                                    ):
-                                        target_span = span
-                                        break
-                                except:
-                                    continue
-
-                            if not target_span:
-                                print(
-                                    f"    ✗ Could not find date {target_date} on current page"
-                                )
-                                continue
-
-                            initial_count = len(theater_data)
-                            async def click_date():
-                                await target_span.click(timeout=3000)
-
-                            added_count, load_success = await collect_schedule_after_action(
-                                click_date, first_timeout_ms=8000
+                        else:
+                            print(
+                                f"    ✗ Timeout waiting for date {target_date} (Total: {new_count})"
                             )
-                            new_count = len(theater_data)
 
-                            if load_success and added_count > 0:
-                                print(
-                                    f"    ✓ Added {added_count} new screenings (Total: {new_count})"
-                                )
-                            elif load_success and added_count == 0:
-                                print(
-                                    f"    ⚠ Date {target_date} loaded but no new screenings (Total: {new_count})"
-                                )
-                            else:
-                                print(
-                                    f"    ✗ Timeout waiting for date {target_date} (Total: {new_count})"
-                                )
-
-                        except Exception as e:
-                            print(f"    ✗ Failed to click date {target_date}: {e}")
-                            continue
+                    except Exception as e:
+                        print(f"    ✗ Failed to click date {target_date}: {e}")
+                        continue
 
             except Exception as e:
                 print(f"  Error finding date elements: {e}")
@@ -570,6 +751,11 @@ class CGVCrawler(BaseCrawler):
                     )
                 )
 
+            if self.state_store is not None and initial_load_success:
+                try:
+                    self.state_store.save(state_name, await context.storage_state())
+                except Exception as e:
+                    print(f"  WARN: Could not save browser state: {e}")
             print(f"  Completed theater {theater.name}")
             if bandwidth_saver:
                 print(
@@ -580,11 +766,36 @@ class CGVCrawler(BaseCrawler):
                 )
 
         except CGVAccessBlockedError:
+            theater_span["error"] = "CGVAccessBlockedError"
+            if warm:
+                # The stored cookies may be what got flagged; start the next context cold.
+                try:
+                    self.state_store.discard(state_name)
+                    print("  Discarded browser state used when the block was served.")
+                except Exception as e:
+                    print(f"  WARN: Could not discard browser state: {e}")
             raise
         except Exception as e:
+            theater_span["error"] = type(e).__name__
             print(f"  ERROR processing theater {theater.name}: {e}")
+            self.record_failure(theater.cinema_code, e)
             await self._dump_debug_artifacts(page, theater.cinema_code)
         finally:
+            self.spans.record(
+                {
+                    **theater_span,
+                    "duration_ms": round((time.perf_counter() - theater_started) * 1000, 1),
+                    "responses": capture["responses"],
+                    "bytes": capture["bytes"],
+                    "rows": len(screenings),
+                }
+            )
+            self.page_loads.append((timing["page_ready"], asset_stats))
+            print(
+                f"  Page ready in {timing['page_ready'] or 0:.2f}s; fetched {asset_stats['bytes_fetched'] / 1024:.0f} KB, "
+                f"{asset_stats['bytes_from_cache'] / 1024:.0f} KB from asset cache "
+                f"(hits={asset_stats['hits']} revalidated={asset_stats['revalidated']} misses={asset_stats['misses']})"
+            )
             # Always close the context
             await context.close()
         return screenings
@@ -0,0 +1,236 @@
+"""
+Crawl-to-crawl change feed.
+
+Each (provider, cinema_code, play_date) partition of the current crawl is
+compared with the same partition of the previous crawl. Rows are keyed by a
+64-bit hash of the screening conflict key and the diff emits typed events:
+
+    added         row not in the previous crawl
+    removed       row gone from the current crawl
+    time_changed  same screen and movie moved to another start time
+    sold_out      remain_seat_cnt dropped to 0
+    seat_delta    remain_seat_cnt changed otherwise
+
+Events carry the conflict-key fields, so they can drive delta writes as well as
+notifications. The previous crawl is persisted per provider by a ChangeState.
+"""
+import abc
+import datetime as dt
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from crawlers.sinks import screening_rows
+from models import SCREENING_CONFLICT_KEY, Screening, ScreeningBatch
+
+Partition = tuple[str, str]  # (cinema_code, play_date) within one provider
+# key hash -> [screen_name, movie_title, start_dt, remain_seat_cnt]
+PartitionRows = dict[str, list]
+
+EVENT_TYPES = ("added", "removed", "time_changed", "sold_out", "seat_delta")
+
+
+def row_key(row: dict[str, Any]) -> str:
+    joined = "\x1f".join(str(row[c]) for c in SCREENING_CONFLICT_KEY)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def partition_rows(data: "Iterable[Screening] | ScreeningBatch") -> dict[str, dict[Partition, PartitionRows]]:
+    """provider -> (cinema_code, play_date) -> key hash -> compact row."""
+    providers: dict[str, dict[Partition, PartitionRows]] = {}
+    for row in screening_rows(data):
+        partitions = providers.setdefault(row["provider"], {})
+        rows = partitions.setdefault((row["cinema_code"], row["play_date"]), {})
+        rows[row_key(row)] = [row["screen_name"], row["movie_title"], row["start_dt"], row["remain_seat_cnt"]]
+    return providers
+
+
+def _event(kind: str, provider: str, partition: Partition, key: str, row: list, **extra) -> dict[str, Any]:
+    cinema_code, play_date = partition
+    return {
+        "type": kind,
+        "provider": provider,
+        "cinema_code": cinema_code,
+        "play_date": play_date,
+        "screen_name": row[0],
+        "movie_title": row[1],
+        "start_dt": row[2],
+        "remain_seat_cnt": row[3],
+        "key": key,
+        **extra,
+    }
+
+
+def diff_partition(provider: str, partition: Partition, previous: PartitionRows, current: PartitionRows) -> list[dict[str, Any]]:
+    events = []
+    removed: dict[tuple[str, str], list[tuple[str, list]]] = {}
+    added: dict[tuple[str, str], list[tuple[str, list]]] = {}
+    for key, row in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.setdefault((row[0], row[1]), []).append((key, row))
+            continue
+        remain, old_remain = row[3], old[3]
+        if remain == old_remain or remain is None:
+            continue
+        if remain == 0:
+            events.append(_event("sold_out", provider, partition, key, row, previous_remain_seat_cnt=old_remain))
+        elif old_remain is not None:
+            events.append(
+                _event("seat_delta", provider, partition, key, row,
+                       previous_remain_seat_cnt=old_remain, delta=remain - old_remain)
+            )
+    for key, row in previous.items():
+        if key not in current:
+            removed.setdefault((row[0], row[1]), []).append((key, row))
+
+    # A removed and an added row for the same screen and movie is one moved screening;
+    # pair them in start-time order, anything left over is a real add/remove.
+    for group, gone in removed.items():
+        new = added.pop(group, [])
+        gone.sort(key=lambda entry: entry[1][2])
+        new.sort(key=lambda entry: entry[1][2])
+        for (old_key, old_row), (key, row) in zip(gone, new):
+            events.append(
+                _event("time_changed", provider, partition, key, row,
+                       previous_start_dt=old_row[2], previous_key=old_key)
+            )
+        for key, row in gone[len(new):]:
+            events.append(_event("removed", provider, partition, key, row))
+        for key, row in new[len(gone):]:
+            events.append(_event("added", provider, partition, key, row))
+    for new in added.values():
+        for key, row in new:
+            events.append(_event("added", provider, partition, key, row))
+    return events
+
+
+class ChangeState(abc.ABC):
+    """Previous crawl per provider."""
+
+    @abc.abstractmethod
+    def load(self, provider: str) -> dict[Partition, PartitionRows]:
+        ...
+
+    @abc.abstractmethod
+    def save(self, provider: str, partitions: dict[Partition, PartitionRows]) -> None:
+        ...
+
+
+class InMemoryChangeState(ChangeState):
+    def __init__(self):
+        self._providers: dict[str, dict[Partition, PartitionRows]] = {}
+
+    def load(self, provider: str) -> dict[Partition, PartitionRows]:
+        return self._providers.get(provider, {})
+
+    def save(self, provider: str, partitions: dict[Partition, PartitionRows]) -> None:
+        self._providers[provider] = partitions
+
+
+class LocalChangeState(ChangeState):
+    """`<root>/<provider>.json.gz` holding every partition of the provider's last crawl."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, provider: str) -> Path:
+        return self.root / f"{provider}.json.gz"
+
+    def load(self, provider: str) -> dict[Partition, PartitionRows]:
+        path = self._path(provider)
+        if not path.exists():
+            return {}
+        with gzip.open(path, "rt", encoding="utf-8") as fp:
+            stored = json.load(fp)
+        return {tuple(key.split("|", 1)): rows for key, rows in stored.items()}
+
+    def save(self, provider: str, partitions: dict[Partition, PartitionRows]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(provider)
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as fp:
+            json.dump({f"{code}|{date}": rows for (code, date), rows in partitions.items()}, fp, ensure_ascii=False)
+        tmp.replace(path)
+
+
+class ChangeSink(abc.ABC):
+    @abc.abstractmethod
+    def emit(self, events: list[dict[str, Any]]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesChangeSink(ChangeSink):
+    def __init__(self, path: str | Path = "changes.jsonl"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = open(self.path, "a", encoding="utf-8")
+
+    def emit(self, events: list[dict[str, Any]]) -> None:
+        for event in events:
+            self._fp.write(json.dumps(event, ensure_ascii=False))
+            self._fp.write("\n")
+        self._fp.flush()
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class QueueChangeSink(ChangeSink):
+    """Puts events on any object with `put` (queue.Queue, asyncio.Queue via put_nowait wrapper, ...)."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def emit(self, events: list[dict[str, Any]]) -> None:
+        for event in events:
+            self.queue.put(event)
+
+
+class ChangeFeed:
+    def __init__(self, state: ChangeState, sink: Optional[ChangeSink] = None):
+        self.state = state
+        self.sink = sink
+
+    def diff(
+        self, data: "Iterable[Screening] | ScreeningBatch", cinema_codes: Optional[set[str]] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Diff a crawl against the stored previous crawl, emit the events and store
+        the crawl as the new baseline. Previous partitions of a crawled provider
+        are only diffed (as removals) for play dates this crawl covered, and for
+        `cinema_codes` when the crawl only visited some theaters, so a shorter
+        horizon or a partial revisit does not read as mass removal.
+        """
+        events: list[dict[str, Any]] = []
+        for provider, current in partition_rows(data).items():
+            previous = self.state.load(provider)
+            crawled_dates = {play_date for _, play_date in current}
+
+            def recrawled(partition: Partition) -> bool:
+                return partition[1] in crawled_dates and (cinema_codes is None or partition[0] in cinema_codes)
+
+            for partition in current.keys() | {p for p in previous if recrawled(p)}:
+                events.extend(
+                    diff_partition(provider, partition, previous.get(partition, {}), current.get(partition, {}))
+                )
+            # Keep not-recrawled partitions from today on so the next run can still diff them.
+            today = dt.date.today().isoformat()
+            baseline = {p: rows for p, rows in previous.items() if p[1] >= today and not recrawled(p)}
+            baseline.update(current)
+            self.state.save(provider, baseline)
+        if self.sink is not None and events:
+            self.sink.emit(events)
+        return events
+
+
+def summarize(events: Iterable[dict[str, Any]]) -> dict[str, int]:
+    counts = dict.fromkeys(EVENT_TYPES, 0)
+    for event in events:
+        counts[event["type"]] += 1
+    return counts
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import Chain, Cinema
+
+logger = logging.getLogger(__name__)
+
+CINEMAS_JSON_PATH = Path(__file__).parent.parent / "cinemas.json"
+# Seconds before the shared registry re-checks its source for changes.
+CINEMA_REGISTRY_TTL = float(os.getenv("CINEMA_REGISTRY_TTL", "3600"))
+
+
+
+def _valid_cinemas(rows: List[Dict[str, Any]], source: str) -> List[Cinema]:
+    """Validate row by row so one malformed cinema is skipped instead of failing the registry."""
+    cinemas = []
+    for row in rows:
+        try:
+            cinemas.append(Cinema.model_validate(row))
+        except ValidationError as exc:
+            code = row.get("cinema_code") if isinstance(row, dict) else None
+            logger.warning("Skipping invalid cinema %r from %s: %s", code, source, exc)
+    return cinemas
+
+
+def _checksum(rows: List[Dict[str, Any]]) -> str:
+    canonical = sorted(json.dumps(row, sort_keys=True, ensure_ascii=False) for row in rows)
+    return hashlib.sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+
+
+class CinemaRegistry:
+    """
+    Every cinema, parsed once and indexed by chain, by cinema_code and by
+    (chain, cinema_code). Crawlers share one process-wide instance through
+    `CinemaRegistry.shared()` instead of each re-reading `cinemas.json` or
+    querying Supabase per chain.
+    """
+
+    _shared: Optional["CinemaRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rows: List[Dict[str, Any]], source: str):
+        self.source = source
+        self.checksum = _checksum(rows)
+        self.loaded_at = time.monotonic()
+        self.cinemas: List[Cinema] = _valid_cinemas(rows, source)
+        self.by_chain: Dict[Chain, List[Cinema]] = {}
+        self.by_code: Dict[str, List[Cinema]] = {}
+        self.by_key: Dict[Tuple[Chain, str], Cinema] = {}
+        for cinema in self.cinemas:
+            self.by_chain.setdefault(cinema.chain, []).append(cinema)
+            self.by_code.setdefault(cinema.cinema_code, []).append(cinema)
+            self.by_key[(cinema.chain, cinema.cinema_code)] = cinema
+
+    def __len__(self) -> int:
+        return len(self.cinemas)
+
+    @staticmethod
+    def _load_rows(supabase=None, json_path: Path = CINEMAS_JSON_PATH) -> Tuple[List[Dict[str, Any]], str]:
+        if json_path.exists():
+            with open(json_path, encoding="utf-8") as fp:
+                return json.load(fp), str(json_path)
+        if supabase:
+            return supabase.fetch_cinemas(), "Supabase"
+        return [], "none"
+
+    @classmethod
+    def load(cls, supabase=None, json_path: Path = CINEMAS_JSON_PATH) -> "CinemaRegistry":
+        """Load from local JSON, or every chain from Supabase in one paginated read."""
+        rows, source = cls._load_rows(supabase, json_path)
+        registry = cls(rows, source)
+        logger.info("Loaded %d cinemas from %s", len(registry), source)
+        return registry
+
+    @classmethod
+    def shared(cls, supabase=None, ttl: float = CINEMA_REGISTRY_TTL) -> "CinemaRegistry":
+        """
+        Process-wide registry. After `ttl` seconds the source is read again, but
+        the indexes are only rebuilt when the content checksum changed.
+        """
+        with cls._shared_lock:
+            current = cls._shared
+            if current is None or (not current and supabase):
+                cls._shared = cls.load(supabase)
+            elif time.monotonic() - current.loaded_at >= ttl:
+                rows, source = cls._load_rows(supabase)
+                if rows and _checksum(rows) != current.checksum:
+                    cls._shared = cls(rows, source)
+                    logger.info("Cinema registry changed; reloaded %d cinemas from %s", len(rows), source)
+                else:
+                    current.loaded_at = time.monotonic()
+            return cls._shared
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._shared_lock:
+            cls._shared = None
+
+    def for_chain(self, chain: Chain) -> List[Cinema]:
+        return list(self.by_chain.get(chain, ()))
+
+    def get(self, chain: Chain, cinema_code: str) -> Optional[Cinema]:
+        return self.by_key.get((chain, cinema_code))
+
+    def with_code(self, cinema_code: str) -> List[Cinema]:
+        return list(self.by_code.get(cinema_code, ()))
@@ -22,12 +22,16 @@ class CrawlerRegistry:
     }
 
     @classmethod
-    def get_crawler(cls, chain: Chain, supabase: SupabaseClient, batch_size: int = 10) -> BaseCrawler:
-        """Get crawler instance for a chain."""
+    def crawler_class(cls, chain: Chain) -> Type[BaseCrawler]:
         crawler_class = cls._crawlers.get(chain)
         if not crawler_class:
             raise ValueError(f"No crawler registered for chain: {chain}")
-        return crawler_class(supabase=supabase, batch_size=batch_size)
+        return crawler_class
+
+    @classmethod
+    def get_crawler(cls, chain: Chain, supabase: SupabaseClient, batch_size: int = 10) -> BaseCrawler:
+        """Get crawler instance for a chain."""
+        return cls.crawler_class(chain)(supabase=supabase, batch_size=batch_size)
 
     @classmethod
     def register_crawler(cls, chain: Chain, crawler_class: Type[BaseCrawler]) -> None:
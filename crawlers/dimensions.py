@@ -0,0 +1,198 @@
+"""
+Per-crawl dimension tables of distinct movies and cinemas.
+
+A chain's crawl has thousands of screenings but only a few dozen distinct
+movies, so derived work (title normalization, identity resolution) runs once
+per distinct entry here and is joined back to screenings by key.
+"""
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from crawlers.titles import normalize_for_match
+from models import Screening, ScreeningBatch
+
+# (provider, source_movie_code or "title:<raw title>"). Spellings that share a source
+# code are one movie; MovieDim.titles keeps each of them.
+MovieDimKey = tuple[str, str]
+CinemaDimKey = tuple[str, str]  # (provider, cinema_code)
+
+
+@dataclass(slots=True)
+class MovieDim:
+    provider: str
+    source_movie_code: Optional[str]
+    movie_title: str
+    movie_title_en: Optional[str]
+    source_year: Optional[int]
+    source_director: Optional[str]
+    normalized_title: str
+    canonical_title: Optional[str] = None
+    movie_id: Optional[int] = None
+    match_method: Optional[str] = None
+    screenings: int = 0
+    # Every raw title crawled under this key; one source code can carry several spellings.
+    titles: set[str] = field(default_factory=set)
+
+
+@dataclass(slots=True)
+class CinemaDim:
+    provider: str
+    cinema_code: str
+    cinema_name: str
+    screenings: int = 0
+
+
+def movie_dim_key(provider: str, source_movie_code: Optional[str], movie_title: str) -> MovieDimKey:
+    return (provider, source_movie_code or f"title:{movie_title}")
+
+
+_MOVIE_COLUMNS = (
+    "provider",
+    "source_movie_code",
+    "movie_title",
+    "movie_title_en",
+    "source_year",
+    "source_director",
+    "cinema_code",
+    "cinema_name",
+)
+
+
+def _grouped(data: "Iterable[Screening] | ScreeningBatch") -> dict[tuple, int]:
+    # Row count per distinct _MOVIE_COLUMNS tuple; a batch groups on its codes.
+    if isinstance(data, ScreeningBatch):
+        return data.distinct(_MOVIE_COLUMNS)
+    counts: dict[tuple, int] = {}
+    for s in data:
+        key = (
+            s.provider,
+            s.source_movie_code,
+            s.movie_title,
+            s.movie_title_en,
+            s.source_year,
+            s.source_director,
+            s.cinema_code,
+            s.cinema_name,
+        )
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class CrawlDimensions:
+    def __init__(self):
+        self.movies: dict[MovieDimKey, MovieDim] = {}
+        self.cinemas: dict[CinemaDimKey, CinemaDim] = {}
+        self.rows_by_provider: dict[str, int] = {}
+
+    @classmethod
+    def from_screenings(cls, data: "Iterable[Screening] | ScreeningBatch") -> "CrawlDimensions":
+        dims = cls()
+        dims.extend(data)
+        return dims
+
+    def extend(self, data: "Iterable[Screening] | ScreeningBatch") -> None:
+        for key, count in _grouped(data).items():
+            provider, code, title, title_en, year, director, cinema_code, cinema_name = key
+            self.rows_by_provider[provider] = self.rows_by_provider.get(provider, 0) + count
+
+            movie_key = movie_dim_key(provider, code, title)
+            movie = self.movies.get(movie_key)
+            if movie is None:
+                movie = self.movies[movie_key] = MovieDim(
+                    provider=provider,
+                    source_movie_code=code,
+                    movie_title=title,
+                    movie_title_en=title_en,
+                    source_year=year,
+                    source_director=director,
+                    normalized_title=normalize_for_match(title),
+                )
+            movie.screenings += count
+            movie.titles.add(title)
+
+            cinema = self.cinemas.get((provider, cinema_code))
+            if cinema is None:
+                cinema = self.cinemas[(provider, cinema_code)] = CinemaDim(
+                    provider=provider,
+                    cinema_code=cinema_code,
+                    cinema_name=cinema_name,
+                )
+            cinema.screenings += count
+
+    def resolve_identities(self, resolve: Callable[[MovieDim], tuple[Optional[int], str, str]]) -> int:
+        """
+        Run `resolve` once per distinct movie not resolved yet, storing the
+        returned (movie_id, canonical title, match method). Returns how many
+        resolved to an existing movie id.
+        """
+        matched = 0
+        for movie in self.movies.values():
+            if movie.canonical_title is None:
+                movie.movie_id, movie.canonical_title, movie.match_method = resolve(movie)
+                matched += movie.movie_id is not None
+        return matched
+
+    def movie_for(self, provider: str, source_movie_code: Optional[str], movie_title: str) -> Optional[MovieDim]:
+        """The dimension entry a screening joins to."""
+        return self.movies.get(movie_dim_key(provider, source_movie_code, movie_title))
+
+    def movie_aliases(self, data: "Iterable[Screening] | ScreeningBatch | None" = None) -> list[dict[str, Any]]:
+        """
+        `movie_aliases` rows for movies resolved to an existing id, one per raw
+        title. With `data`, only the titles in those screenings, joined back to
+        their entries; the write path records each batch's aliases with it.
+        """
+        if data is None:
+            titles = [(movie, title) for movie in self.movies.values() for title in sorted(movie.titles)]
+        else:
+            distinct = sorted({key[:3] for key in _grouped(data)}, key=lambda key: (key[0], key[1] or "", key[2]))
+            titles = [
+                (movie, title)
+                for provider, code, title in distinct
+                if (movie := self.movie_for(provider, code, title)) is not None
+            ]
+        now = dt.datetime.utcnow().isoformat()
+        return [
+            {
+                "provider": movie.provider,
+                "movie_title": title,
+                "source_movie_code": movie.source_movie_code or "",
+                "movie_id": movie.movie_id,
+                "method": movie.match_method,
+                "resolved_at": now,
+            }
+            for movie, title in titles
+            if movie.movie_id is not None
+        ]
+
+    def movie_keys(self) -> dict[tuple[str, str, str], str]:
+        """
+        (provider, normalized title, source_movie_code) -> raw title, for the
+        enrichment queue: one key per spelling crawled under a movie, since the
+        updater looks `movies` rows up by raw title. Movies resolved to an
+        existing `movies` row are skipped.
+        """
+        keys: dict[tuple[str, str, str], str] = {}
+        for movie in self.movies.values():
+            if movie.movie_id is not None:
+                continue
+            for title in sorted(movie.titles):
+                key = (movie.provider, normalize_for_match(title), movie.source_movie_code or "")
+                if key[1] and key not in keys:
+                    keys[key] = title
+        return keys
+
+    def dedup_report(self) -> dict[str, dict[str, float]]:
+        """Per provider: rows, distinct movies/cinemas and rows per distinct movie."""
+        report: dict[str, dict[str, float]] = {}
+        for provider, rows in self.rows_by_provider.items():
+            movies = sum(1 for key in self.movies if key[0] == provider)
+            cinemas = sum(1 for key in self.cinemas if key[0] == provider)
+            report[provider] = {
+                "rows": rows,
+                "movies": movies,
+                "cinemas": cinemas,
+                "dedup_ratio": round(rows / movies, 1) if movies else 0.0,
+            }
+        return report
@@ -1,69 +1,89 @@
 from crawlers.base import BaseCrawler
-from models import Screening, Chain
+from models import Screening, Chain, SeatCount
 import httpx
 import datetime as dt
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 class DtryxCrawler(BaseCrawler):
     chain: Chain = "Dtryx"
 
-    async def iter(self, date: dt.date) -> Iterable[Screening]:
-        url = "https://dtryx.com/cinema/showseq_list.do"
-        crawl_ts = dt.datetime.utcnow().isoformat()
+    _url = "https://dtryx.com/cinema/showseq_list.do"
+    probe_url = "https://dtryx.com/"
+    _headers = {
+        "X-Requested-With": "XMLHttpRequest",
+    }
 
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
+    async def _fetch_showseqs(self, theater, date: dt.date) -> list[dict] | None:
+        """`showseq_list.do` items for one theater and date, or None if the request failed."""
+        params = {
+            "cgid": "FE8EF4D2-F22D-4802-A39A-D58F23A29C1E",
+            "ssid": "",
+            "tokn": "",
+            "BrandCd": theater.brand_cd or "indieart",
+            "CinemaCd": theater.cinema_code,
+            "PlaySDT": date.isoformat(),
+            "_": str(int(dt.datetime.now().timestamp() * 1000))
         }
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            try:
+                resp = await client.get(self._url, params=params, headers=self._headers)
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                print(f"[{theater.cinema_code}] API request failed: {e}")
+                return None
+        return data.get("Showseqlist", [])
+
+    async def iter(self, date: dt.date) -> Iterable[Screening]:
+        crawl_ts = dt.datetime.utcnow().isoformat()
 
         for theater in self.theaters:
-            brand_cd = theater.brand_cd or "indieart"
-            params = {
-                "cgid": "FE8EF4D2-F22D-4802-A39A-D58F23A29C1E",
-                "ssid": "",
-                "tokn": "",
-                "BrandCd": brand_cd,
-                "CinemaCd": theater.cinema_code,
-                "PlaySDT": date.isoformat(),
-                "_": str(int(dt.datetime.now().timestamp() * 1000))
-            }
+            items = await self._fetch_showseqs(theater, date)
+            if items is None:
+                self.record_failure(theater.cinema_code, "showseq_list.do request failed", date)
+                continue
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                try:
-                    resp = await client.get(url, params=params, headers=headers)
-                    resp.raise_for_status()
-                    data = resp.json()
-                except Exception as e:
-                    print(f"[{theater.cinema_code}] API request failed: {e}")
-                    continue
+            for item in items:
+                cinema_code = str(item.get("CinemaCd") or "").strip()
+                cinema_name = (item.get("CinemaNm") or "").strip()
+                is_core_art_screen = cinema_code != "000088" and "아리랑" not in cinema_name
+                book_url = (
+                    f"https://www.dtryx.com/reserve/movie.do"
+                    f"?cgid=FE8EF4D2-F22D-4802-A39A-D58F23A29C1E"
+                    f"&CinemaCd={item['CinemaCd']}"
+                    f"&MovieCd={item['MovieCd']}"
+                    f"&PlaySDT={item['PlaySDT']}"
+                    f"&ScreenCd={item['ScreenCd']}"
+                    f"&ShowSeq={item['ShowSeq']}"
+                )
 
-                for item in data.get("Showseqlist", []):
-                    cinema_code = str(item.get("CinemaCd") or "").strip()
-                    cinema_name = (item.get("CinemaNm") or "").strip()
-                    is_core_art_screen = cinema_code != "000088" and "아리랑" not in cinema_name
-                    book_url = (
-                        f"https://www.dtryx.com/reserve/movie.do"
-                        f"?cgid=FE8EF4D2-F22D-4802-A39A-D58F23A29C1E"
-                        f"&CinemaCd={item['CinemaCd']}"
-                        f"&MovieCd={item['MovieCd']}"
-                        f"&PlaySDT={item['PlaySDT']}"
-                        f"&ScreenCd={item['ScreenCd']}"
-                        f"&ShowSeq={item['ShowSeq']}"
-                    )
+                yield Screening(
+                    provider=self.chain,
+                    cinema_name=cinema_name,
+                    cinema_code=cinema_code,
+                    screen_name=item["ScreenNm"],
+                    movie_title=item["MovieNmNat"].strip(),
+                    movie_title_en=(item.get("MovieNmEng") or "").strip() or None,
+                    source_movie_code=str(item.get("MovieCd") or "").strip() or None,
+                    is_core_art_screen=is_core_art_screen,
+                    play_date=date.isoformat(),
+                    start_dt=item["StartTime"],
+                    end_dt=item["EndTime"],
+                    crawl_ts=crawl_ts,
+                    url=book_url,
+                    remain_seat_cnt=int(item["RemainSeatCnt"]),
+                    total_seat_cnt=int(item["TotalSeatCnt"])
+                )
 
-                    yield Screening(
-                        provider=self.chain,
-                        cinema_name=cinema_name,
-                        cinema_code=cinema_code,
-                        screen_name=item["ScreenNm"],
-                        movie_title=item["MovieNmNat"].strip(),
-                        movie_title_en=(item.get("MovieNmEng") or "").strip() or None,
-                        source_movie_code=str(item.get("MovieCd") or "").strip() or None,
-                        is_core_art_screen=is_core_art_screen,
-                        play_date=date.isoformat(),
-                        start_dt=item["StartTime"],
-                        end_dt=item["EndTime"],
-                        crawl_ts=crawl_ts,
-                        url=book_url,
-                        remain_seat_cnt=int(item["RemainSeatCnt"]),
-                        total_seat_cnt=int(item["TotalSeatCnt"])
-                    )
+    async def iter_seats(self, date: dt.date) -> AsyncIterator[SeatCount]:
+        for theater in self.theaters:
+            for item in await self._fetch_showseqs(theater, date) or ():
+                yield SeatCount(
+                    self.chain,
+                    str(item.get("CinemaCd") or "").strip(),
+                    date.isoformat(),
+                    item["StartTime"],
+                    item["ScreenNm"],
+                    int(item["RemainSeatCnt"]),
+                    int(item["TotalSeatCnt"]),
+                )
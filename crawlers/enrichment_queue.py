@@ -0,0 +1,178 @@
+"""
+Delta queue between the crawler and the TMDB updater.
+
+At the end of a crawl, the crawler publishes the distinct
+(provider, normalized title, source_movie_code) keys it has never seen before.
+The TMDB updater drains only those entries instead of rescanning
+`upcoming_movie_ids` on every run.
+"""
+import abc
+import datetime as dt
+from typing import Any, Iterable
+
+try:
+    from titles import normalize_for_match
+except ModuleNotFoundError:
+    from crawlers.titles import normalize_for_match
+
+MovieKey = tuple[str, str, str]  # (provider, normalized_title, source_movie_code or "")
+
+
+def movie_key(provider: str, movie_title: str, source_movie_code: str | None) -> MovieKey:
+    return (provider, normalize_for_match(movie_title), source_movie_code or "")
+
+
+def collect_movie_keys(screenings: Iterable) -> dict[MovieKey, str]:
+    """Distinct movie keys in a crawl, mapped to the first raw title seen for each."""
+    keys: dict[MovieKey, str] = {}
+    for s in screenings:
+        key = movie_key(s.provider, s.movie_title, s.source_movie_code)
+        if key[1] and key not in keys:
+            keys[key] = s.movie_title
+    return keys
+
+
+class EnrichmentQueue(abc.ABC):
+    @abc.abstractmethod
+    def known_keys(self, keys: Iterable[MovieKey]) -> set[MovieKey]:
+        """The subset of `keys` that was published before."""
+
+    @abc.abstractmethod
+    def _publish(self, entries: list[dict[str, Any]]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def drain(self, limit: int = 500) -> list[dict[str, Any]]:
+        """Pending entries, oldest first. Entries stay pending until acked."""
+
+    @abc.abstractmethod
+    def ack(self, entries: list[dict[str, Any]]) -> None:
+        """Mark these entries processed, matched on the full (provider, normalized title, code) key."""
+
+    def publish_new(self, keys: dict[MovieKey, str]) -> list[dict[str, Any]]:
+        """Publish keys not seen before and return them as queue entries."""
+        if not keys:
+            return []
+        known = self.known_keys(keys)
+        now = dt.datetime.utcnow().isoformat()
+        entries = [
+            {
+                "provider": provider,
+                "normalized_title": normalized_title,
+                "source_movie_code": source_movie_code,
+                "movie_title": movie_title,
+                "first_seen_at": now,
+            }
+            for (provider, normalized_title, source_movie_code), movie_title in keys.items()
+            if (provider, normalized_title, source_movie_code) not in known
+        ]
+        if entries:
+            self._publish(entries)
+        return entries
+
+
+class InMemoryEnrichmentQueue(EnrichmentQueue):
+    """In-process stand-in for tests and offline runs."""
+
+    def __init__(self):
+        self._entries: dict[MovieKey, dict[str, Any]] = {}
+
+    @staticmethod
+    def _key(entry: dict[str, Any]) -> MovieKey:
+        return (entry["provider"], entry["normalized_title"], entry["source_movie_code"])
+
+    def known_keys(self, keys: Iterable[MovieKey]) -> set[MovieKey]:
+        return {key for key in keys if key in self._entries}
+
+    def _publish(self, entries: list[dict[str, Any]]) -> None:
+        for entry in entries:
+            self._entries.setdefault(self._key(entry), {**entry, "processed_at": None})
+
+    def drain(self, limit: int = 500) -> list[dict[str, Any]]:
+        pending = [e for e in self._entries.values() if e["processed_at"] is None]
+        pending.sort(key=lambda e: e["first_seen_at"])
+        return [dict(e) for e in pending[:limit]]
+
+    def ack(self, entries: list[dict[str, Any]]) -> None:
+        now = dt.datetime.utcnow().isoformat()
+        for entry in entries:
+            stored = self._entries.get(self._key(entry))
+            if stored is not None:
+                stored["processed_at"] = now
+
+
+class SupabaseEnrichmentQueue(EnrichmentQueue):
+    """
+    Backed by the `movie_enrichment_queue` table, which also serves as the
+    ledger of keys already seen (processed rows keep `processed_at`).
+    """
+
+    table = "movie_enrichment_queue"
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def known_keys(self, keys: Iterable[MovieKey], chunk_size: int = 200) -> set[MovieKey]:
+        """Looks up only this batch's titles, per provider in chunks, not the whole ledger."""
+        keys = set(keys)
+        titles_by_provider: dict[str, list[str]] = {}
+        for provider, normalized_title, _ in keys:
+            titles_by_provider.setdefault(provider, []).append(normalized_title)
+        known: set[MovieKey] = set()
+        for provider, titles in titles_by_provider.items():
+            titles = sorted(set(titles))
+            for start in range(0, len(titles), chunk_size):
+                chunk = titles[start: start + chunk_size]
+                rows = self.supabase.iter_rows(
+                    self.table,
+                    "provider, normalized_title, source_movie_code",
+                    filters=lambda query, chunk=chunk, provider=provider: query.eq("provider", provider).in_(
+                        "normalized_title", chunk
+                    ),
+                    order_by=("normalized_title", "source_movie_code"),
+                )
+                known.update(
+                    (row["provider"], row["normalized_title"], row.get("source_movie_code") or "")
+                    for row in rows
+                )
+        return known & keys
+
+    def _publish(self, entries: list[dict[str, Any]]) -> None:
+        (
+            self.supabase.client.table(self.table)
+            .upsert(
+                entries,
+                on_conflict="provider,normalized_title,source_movie_code",
+                ignore_duplicates=True,
+            )
+            .execute()
+        )
+
+    def drain(self, limit: int = 500) -> list[dict[str, Any]]:
+        response = (
+            self.supabase.client.table(self.table)
+            .select("provider, normalized_title, source_movie_code, movie_title, first_seen_at")
+            .is_("processed_at", None)
+            .order("first_seen_at")
+            .limit(limit)
+            .execute()
+        )
+        return response.data or []
+
+    def ack(self, entries: list[dict[str, Any]]) -> None:
+        """Marks exactly these keys: one update per (provider, source code) over their titles."""
+        now = dt.datetime.utcnow().isoformat()
+        titles_by_group: dict[tuple[str, str], set[str]] = {}
+        for entry in entries:
+            group = (entry["provider"], entry.get("source_movie_code") or "")
+            titles_by_group.setdefault(group, set()).add(entry["normalized_title"])
+        for (provider, source_movie_code), titles in titles_by_group.items():
+            (
+                self.supabase.client.table(self.table)
+                .update({"processed_at": now})
+                .eq("provider", provider)
+                .eq("source_movie_code", source_movie_code)
+                .in_("normalized_title", sorted(titles))
+                .is_("processed_at", None)
+                .execute()
+            )
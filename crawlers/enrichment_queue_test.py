@@ -0,0 +1,66 @@
+from crawlers.enrichment_queue import InMemoryEnrichmentQueue, collect_movie_keys, movie_key
+from models import Screening
+
+
+def _screening(title, code=None, provider="CGV"):
+    return Screening(
+        provider=provider,
+        cinema_name="강남",
+        cinema_code="0056",
+        screen_name="1관",
+        movie_title=title,
+        source_movie_code=code,
+        play_date="2026-10-19",
+        start_dt="10:00",
+        end_dt="12:00",
+        crawl_ts="2026-10-19T09:00:00",
+    )
+
+
+def test_collect_movie_keys_keeps_first_raw_title_per_key():
+    keys = collect_movie_keys(
+        [_screening("기생충", "M1"), _screening("기생충!", "M1"), _screening("기생충", "M1", provider="Lotte")]
+    )
+    assert keys == {("CGV", "기생충", "M1"): "기생충", ("Lotte", "기생충", "M1"): "기생충"}
+
+
+def test_publish_new_only_returns_unseen_keys():
+    queue = InMemoryEnrichmentQueue()
+    first = queue.publish_new({movie_key("CGV", "기생충", "M1"): "기생충"})
+    assert [entry["movie_title"] for entry in first] == ["기생충"]
+
+    again = queue.publish_new(
+        {movie_key("CGV", "기생충", "M1"): "기생충", movie_key("CGV", "헤어질 결심", None): "헤어질 결심"}
+    )
+    assert [entry["movie_title"] for entry in again] == ["헤어질 결심"]
+    assert queue.publish_new({}) == []
+
+
+def test_drain_is_oldest_first_and_limited():
+    queue = InMemoryEnrichmentQueue()
+    queue._publish(
+        [
+            {"provider": "CGV", "normalized_title": "b", "source_movie_code": "", "movie_title": "B", "first_seen_at": "2"},
+            {"provider": "CGV", "normalized_title": "a", "source_movie_code": "", "movie_title": "A", "first_seen_at": "1"},
+        ]
+    )
+    assert [entry["movie_title"] for entry in queue.drain()] == ["A", "B"]
+    assert [entry["movie_title"] for entry in queue.drain(limit=1)] == ["A"]
+
+
+def test_ack_marks_only_the_given_keys():
+    queue = InMemoryEnrichmentQueue()
+    queue.publish_new(
+        {
+            movie_key("CGV", "기생충", "M1"): "기생충",
+            movie_key("CGV", "기생충", "M2"): "기생충",
+            movie_key("Lotte", "기생충", "M1"): "기생충",
+        }
+    )
+    drained = queue.drain()
+    queue.ack([entry for entry in drained if entry["source_movie_code"] == "M1" and entry["provider"] == "CGV"])
+
+    pending = {(entry["provider"], entry["source_movie_code"]) for entry in queue.drain()}
+    assert pending == {("CGV", "M2"), ("Lotte", "M1")}
+    # Acked keys stay known, so they are not published again.
+    assert queue.publish_new({movie_key("CGV", "기생충", "M1"): "기생충"}) == []
@@ -0,0 +1,184 @@
+"""
+Ledger of crawl work units that failed or timed out.
+
+Crawlers record per-theater failures (BaseCrawler.record_failure) and the
+handler records whole-chain failures and timeouts. After the main pass the
+handler re-crawls just the ledger's units once; whatever still fails is
+persisted so a `{"mode": "retry"}` invocation re-crawls only those units
+instead of every chain.
+
+State, stored through a crawlers.state_store StateStore:
+    {"units": [{"unit": {...WorkUnit}, "error": str, "attempts": int, "first_failed_at": iso}]}
+"""
+import datetime as dt
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from crawlers.cinema_registry import CinemaRegistry
+from crawlers.state_store import StateStore
+from crawlers.work_queue import WorkUnit, group_theaters, group_units
+
+
+class FailureLedger:
+    def __init__(self, state: Optional[StateStore] = None):
+        self.state = state
+        self._entries: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, state: StateStore) -> "FailureLedger":
+        ledger = cls(state)
+        for entry in state.load().get("units", []):
+            unit = WorkUnit.from_json(entry["unit"])
+            ledger._entries[unit.unit_id] = {**entry, "unit": unit}
+        return ledger
+
+    def record(self, unit: WorkUnit, error: str) -> None:
+        entry = self._entries.get(unit.unit_id)
+        if entry is None:
+            entry = self._entries[unit.unit_id] = {
+                "unit": unit,
+                "attempts": 0,
+                "first_failed_at": dt.datetime.utcnow().isoformat(),
+            }
+        entry["attempts"] += 1
+        entry["error"] = error
+
+    def record_all(self, failures: Iterable[tuple[WorkUnit, str]]) -> int:
+        count = 0
+        for unit, error in failures:
+            self.record(unit, error)
+            count += 1
+        return count
+
+    def record_window(
+        self,
+        chain: str,
+        segments: Iterable[tuple[dt.date, int]],
+        error: str,
+        cinema_codes: Optional[Iterable[str]] = None,
+    ) -> None:
+        """
+        Record the (start_date, days) segments a failed or deferred chain did
+        not crawl: one unit per theater in `cinema_codes`, or one whole-chain
+        unit per segment when None.
+        """
+        codes = list(cinema_codes) if cinema_codes else [None]
+        for start_date, days in segments:
+            for cinema_code in codes:
+                self.record(WorkUnit(chain, cinema_code, start_date.isoformat(), days), error)
+
+    def resolve(self, units: Iterable[WorkUnit]) -> None:
+        for unit in units:
+            self._entries.pop(unit.unit_id, None)
+
+    def covered(
+        self,
+        chain: str,
+        start_date: dt.date,
+        days: int,
+        cinema_codes: Optional[set[str]] = None,
+        today: Optional[dt.date] = None,
+    ) -> list[WorkUnit]:
+        """
+        Pending units of `chain` whose remaining (today on) dates fall inside a
+        crawl of [start_date, start_date + days) over `cinema_codes` (None:
+        every theater, which also covers whole-chain units).
+        """
+        today = today or dt.date.today()
+        end = start_date + dt.timedelta(days=days)
+        covered = []
+        for entry in self._entries.values():
+            unit = entry["unit"]
+            if unit.chain != chain:
+                continue
+            # A whole-chain unit (cinema_code None) is only covered by a crawl of every theater.
+            if cinema_codes is not None and unit.cinema_code not in cinema_codes:
+                continue
+            unit_start = dt.date.fromisoformat(unit.start_date)
+            unit_end = unit_start + dt.timedelta(days=unit.days)
+            if start_date <= max(unit_start, today) and unit_end <= end:
+                covered.append(unit)
+        return covered
+
+    def units(self, max_attempts: Optional[int] = None, exclude_chains: Iterable[str] = ()) -> list[WorkUnit]:
+        """
+        Pending units, optionally only those tried fewer than `max_attempts`
+        times and not of `exclude_chains` (e.g. chains deferred by a probe).
+        """
+        excluded = set(exclude_chains)
+        return [
+            entry["unit"]
+            for entry in self._entries.values()
+            if (max_attempts is None or entry["attempts"] < max_attempts) and entry["unit"].chain not in excluded
+        ]
+
+    def entries(self) -> list[dict[str, Any]]:
+        return [{**entry, "unit": asdict(entry["unit"])} for entry in self._entries.values()]
+
+    def prune(self, today: Optional[dt.date] = None) -> int:
+        """Drop units whose play dates are all in the past."""
+        today = today or dt.date.today()
+        past = [
+            unit_id
+            for unit_id, entry in self._entries.items()
+            if dt.date.fromisoformat(entry["unit"].start_date) + dt.timedelta(days=entry["unit"].days - 1) < today
+        ]
+        for unit_id in past:
+            del self._entries[unit_id]
+        return len(past)
+
+    def save(self) -> None:
+        if self.state is not None:
+            self.prune()
+            self.state.save({"units": self.entries()})
+
+
+def crawled_codes(crawler, failures: list[tuple[WorkUnit, str]]) -> Optional[set[str]]:
+    """
+    Theaters a crawl actually covered: its theater list minus the ones that
+    failed, so the change feed and snapshots do not read them as emptied.
+    None for crawlers without a theater list (they record no failures).
+    """
+    if not crawler.theaters:
+        return None
+    failed_codes = {unit.cinema_code for unit, _ in failures}
+    return {theater.cinema_code for theater in crawler.theaters} - failed_codes
+
+
+async def retry_units(
+    ledger: FailureLedger,
+    units: list[WorkUnit],
+    crawler_for: Callable[[str], Any],
+    crawl: Callable[[Any, dt.date, int], Awaitable[Any]],
+    on_batch: Callable[[str, Any, Optional[set[str]]], None],
+    *,
+    supabase=None,
+) -> None:
+    """
+    Re-crawl just these units, grouped into one `crawl(crawler, start_date,
+    days)` per chain and date range. Units that succeed are resolved, failures
+    are recorded again, and each batch goes to `on_batch(chain, batch,
+    crawled cinema codes)`.
+    """
+    registry = CinemaRegistry.shared(supabase)
+    for group in group_units(units):
+        chain, start_date, days = group[0].chain, group[0].start_date, group[0].days
+        try:
+            crawler = crawler_for(chain)
+            crawler.theaters = group_theaters(registry, group)
+            crawler.take_failures()
+            print(f"▶ Retrying {chain} ({start_date}, {days} day(s), {len(crawler.theaters)} theater(s))...")
+            batch = await crawl(crawler, dt.date.fromisoformat(start_date), days)
+        except Exception as e:
+            print(f"❌ Retry of {chain} {start_date} failed: {e}")
+            for unit in group:
+                ledger.record(unit, str(e))
+            continue
+        failures = crawler.take_failures()
+        still_failing = {unit.unit_id for unit, _ in failures}
+        ledger.resolve(unit for unit in group if unit.unit_id not in still_failing)
+        ledger.record_all(failures)
+        on_batch(chain, batch, crawled_codes(crawler, failures))
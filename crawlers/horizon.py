@@ -0,0 +1,107 @@
+"""
+Tiered crawl horizon: crawl near dates on every run and far dates less often.
+
+A tier spec comes from the Lambda event:
+    "horizon": [
+        {"days": [0, 1]},                     # every run
+        {"days": [2, 6], "every_runs": 3},    # every third run
+        {"days": [7, 13], "every_hours": 24}  # once a day per chain
+    ]
+Day offsets are relative to today and clipped to `max_days`. A small persisted
+state document (run counter + last-crawled time per chain and tier) decides which
+tiers are due; due tiers are merged into contiguous (start_date, days) segments.
+"""
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from crawlers.state_store import LocalStateStore, StateStore, SupabaseStateStore
+
+
+@dataclass(frozen=True)
+class HorizonTier:
+    first_day: int
+    last_day: int
+    every_runs: int = 1
+    every_hours: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.first_day}-{self.last_day}"
+
+    @classmethod
+    def from_spec(cls, spec: dict[str, Any]) -> "HorizonTier":
+        first_day, last_day = spec["days"]
+        if first_day < 0 or last_day < first_day:
+            raise ValueError(f"Invalid horizon tier days: {spec['days']}")
+        return cls(
+            first_day=int(first_day),
+            last_day=int(last_day),
+            every_runs=max(int(spec.get("every_runs", 1)), 1),
+            every_hours=float(spec["every_hours"]) if spec.get("every_hours") is not None else None,
+        )
+
+
+def parse_tiers(spec: list[dict[str, Any]]) -> list[HorizonTier]:
+    return [HorizonTier.from_spec(tier) for tier in spec]
+
+
+# Horizon state is {"runs": int, "last_crawled": {"<chain>:<tier>": iso timestamp}}
+# in a generic state store; the old names stay importable.
+HorizonState = StateStore
+LocalHorizonState = LocalStateStore
+SupabaseHorizonState = SupabaseStateStore
+
+
+class HorizonPlanner:
+    def __init__(self, tiers: list[HorizonTier], state: StateStore, max_days: int = 14):
+        self.tiers = [t for t in tiers if t.first_day < max_days]
+        self.max_days = max_days
+        self.state = state
+        self._state = state.load()
+        self.run_number = int(self._state.get("runs", 0))
+        self._last_crawled: dict[str, str] = dict(self._state.get("last_crawled", {}))
+        self._due: dict[str, list[HorizonTier]] = {}
+
+    def due_tiers(self, chain: str, now: Optional[dt.datetime] = None) -> list[HorizonTier]:
+        now = now or dt.datetime.utcnow()
+        due = []
+        for tier in self.tiers:
+            if tier.every_hours is not None:
+                last = self._last_crawled.get(f"{chain}:{tier.name}")
+                if last is None or now - dt.datetime.fromisoformat(last) >= dt.timedelta(hours=tier.every_hours):
+                    due.append(tier)
+            elif self.run_number % tier.every_runs == 0:
+                due.append(tier)
+        self._due[chain] = due
+        return due
+
+    def segments(
+        self, chain: str, today: Optional[dt.date] = None, now: Optional[dt.datetime] = None
+    ) -> list[tuple[dt.date, int]]:
+        """Contiguous (start_date, days) ranges to crawl for `chain` in this run."""
+        today = today or dt.date.today()
+        days = sorted(
+            {
+                day
+                for tier in self.due_tiers(chain, now)
+                for day in range(tier.first_day, min(tier.last_day, self.max_days - 1) + 1)
+            }
+        )
+        segments: list[tuple[dt.date, int]] = []
+        for day in days:
+            if segments and (segments[-1][0] - today).days + segments[-1][1] == day:
+                segments[-1] = (segments[-1][0], segments[-1][1] + 1)
+            else:
+                segments.append((today + dt.timedelta(days=day), 1))
+        return segments
+
+    def mark_crawled(self, chain: str, now: Optional[dt.datetime] = None) -> None:
+        """Record a successful crawl of the tiers planned for `chain`."""
+        stamp = (now or dt.datetime.utcnow()).isoformat()
+        for tier in self._due.get(chain, []):
+            self._last_crawled[f"{chain}:{tier.name}"] = stamp
+
+    def finish(self) -> None:
+        """Advance the run counter and persist."""
+        self.state.save({"runs": self.run_number + 1, "last_crawled": self._last_crawled})
@@ -13,8 +13,32 @@ from models import Screening, Chain
 
 class KOFACrawler(BaseCrawler):
     chain: Chain = "KOFA"
+    date_addressable = False
     api_url = "https://www.kmdb.or.kr/info/api/3/api.json"
     service_key = os.getenv("KOFA_SERVICE_KEY")
+
+    @classmethod
+    async def probe(cls, client: httpx.AsyncClient) -> Optional[str]:
+        """A one-day query: catches a missing, expired or unregistered service key."""
+        if not cls.service_key:
+            return "KOFA_SERVICE_KEY is not set"
+        today = dt.date.today().strftime("%Y%m%d")
+        resp = await client.get(
+            cls.api_url, params={"serviceKey": cls.service_key, "StartDate": today, "EndDate": today}
+        )
+        if resp.status_code in (401, 403):
+            return f"service key rejected (HTTP {resp.status_code})"
+        if resp.status_code >= 400:
+            return f"HTTP {resp.status_code}"
+        # Key errors come back as a plain-text/XML message instead of the JSON result.
+        try:
+            data = resp.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return f"service key rejected: {resp.text.strip()[:120]!r}"
+        return None
+
     async def run(
         self,
         start_date: Optional[dt.date] = None,
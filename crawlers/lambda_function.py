@@ -1,41 +1,503 @@
 import asyncio
 import datetime as dt
+import json
+import os
+import time
+from dataclasses import asdict
+from pathlib import Path
+from crawlers.cinema_registry import CinemaRegistry
+from crawlers.change_feed import ChangeFeed, JsonLinesChangeSink, LocalChangeState, summarize
 from crawlers.crawler_registry import CrawlerRegistry
+from crawlers.dimensions import CrawlDimensions
+from crawlers.enrichment_queue import SupabaseEnrichmentQueue
+from crawlers.failure_ledger import FailureLedger, crawled_codes, retry_units
+from crawlers.horizon import HorizonPlanner, parse_tiers
+from crawlers.movie_identity import MovieIdentityIndex, write_movie_aliases
+from crawlers.probes import probe_chains
+from crawlers.revisit import RevisitScheduler
+from crawlers.sinks import get_sink
+from crawlers.snapshots import get_snapshot_store, publish_snapshots
+from crawlers.state_store import LocalStateStore, SupabaseStateStore
 from crawlers.supabase_client import SupabaseClient
+from crawlers.work_queue import get_work_queue, plan_units, run_worker
 
-def lambda_handler(event, context):
-    chains = event.get(
-        "chains",
-        ["CGV", "Megabox", "Lotte", "TinyTicket", "Dtryx", "Moviee", "KOFA"],
+# Fallback directory for local state files (failed units, horizon, revisit, SQLite
+# work queue) when no path or Supabase is configured; Lambda can only write /tmp.
+LOCAL_STATE_DIR = Path(os.getenv("CRAWL_STATE_DIR", "/tmp"))
+
+
+def _state_store(event, supabase, path_key: str, env: str, name: str, filename: str):
+    """`event[path_key]` or the env var, else Supabase row `name`, else LOCAL_STATE_DIR/filename."""
+    path = event.get(path_key, os.getenv(env))
+    if path:
+        return LocalStateStore(path)
+    if supabase:
+        return SupabaseStateStore(supabase, name=name)
+    return LocalStateStore(LOCAL_STATE_DIR / filename)
+
+
+def trigger_enrichment(entries: list[dict]) -> None:
+    """Invoke the TMDB updater asynchronously for this crawl's new titles."""
+    function_name = os.getenv("TMDB_FUNCTION_NAME")
+    if not entries or not function_name:
+        return
+    try:
+        import boto3
+    except ImportError:
+        print("⚠ boto3 not available; TMDB updater will pick up new titles on its schedule.")
+        return
+    boto3.client("lambda").invoke(
+        FunctionName=function_name,
+        InvocationType="Event",
+        Payload=json.dumps({"mode": "delta"}).encode("utf-8"),
     )
-    max_days = event.get("max_days", 14)
-    supabase = SupabaseClient()
+    print(f"▶ Triggered {function_name} for {len(entries)} new title(s)")
+
+
+SEAT_CHAINS = ["Megabox", "Lotte", "Dtryx", "Moviee"]
 
+
+def refresh_seats(event):
+    """
+    Seats-only mode: re-read seat counts for screenings starting within
+    `within_hours` and update just those two columns.
+    """
+    chains = event.get("chains", SEAT_CHAINS)
+    within_hours = float(event.get("within_hours", 3))
+    supabase = SupabaseClient()
     failed = []
-    succeeded = []
+    updated = 0
 
     async def run_all():
+        nonlocal updated
         for chain in chains:
             try:
                 crawler = CrawlerRegistry.get_crawler(chain, supabase)
-                print(f"▶ Running crawler for {chain}...")
-                screenings = await crawler.run(
-                    start_date=dt.date.today(),
-                    max_days=max_days
-                )
-                print(f"✔ {chain}: Crawled {len(screenings)} screenings")
-                await crawler.save_to_db(screenings)
-                succeeded.append(chain)
+                if not crawler.supports_seats:
+                    print(f"⏭ {chain}: no seats-only endpoint")
+                    continue
+                started = time.perf_counter()
+                seats = await crawler.run_seats(within_hours)
+                sent = supabase.update_seat_counts(seats)
+                updated += sent
+                print(f"✔ {chain}: {sent} seat counts in {time.perf_counter() - started:.2f}s")
             except Exception as e:
                 print(f"❌ Error with {chain}: {e}")
                 failed.append(chain)
 
     asyncio.run(run_all())
-
     if failed:
-        # Raise so EventBridge/scheduled Lambda marks the invocation as failed.
         raise RuntimeError(f"Failed chains: {failed}")
+    return {"statusCode": 200, "body": f"OK: seats for {chains}", "seat_counts": updated}
+
+
+ALL_CHAINS = ["CGV", "Megabox", "Lotte", "TinyTicket", "Dtryx", "Moviee", "KOFA"]
+
+
+def _work_queue(event, supabase):
+    name = event.get("queue", "supabase" if supabase else "sqlite")
+    path = event.get("queue_path", os.getenv("WORK_QUEUE_PATH")) or str(LOCAL_STATE_DIR / "crawl_work_units.sqlite3")
+    return get_work_queue(name, supabase=supabase, path=path)
+
+
+def publish_work(event, context):
+    """
+    Publish mode: split the crawl into work units and queue them, then
+    optionally fan out `workers` asynchronous worker invocations.
+    """
+    chains = event.get("chains", ALL_CHAINS)
+    max_days = event.get("max_days", 14)
+    supabase = SupabaseClient() if os.getenv("SUPABASE_URL") else None
+    queue = _work_queue(event, supabase)
+    registry = CinemaRegistry.shared(supabase)
+    units = [
+        unit
+        for chain in chains
+        for unit in plan_units(
+            chain,
+            registry.for_chain(chain),
+            CrawlerRegistry.crawler_class(chain).date_addressable,
+            dt.date.today(),
+            max_days,
+        )
+    ]
+    queued = queue.publish(units)
+    print(f"✔ Queued {queued} of {len(units)} work unit(s) on {queue.name}: {queue.counts()}")
+
+    workers = int(event.get("workers", 0))
+    function_name = getattr(context, "function_name", None) or os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    if workers and function_name:
+        try:
+            import boto3
+        except ImportError:
+            boto3 = None
+            print(f'⚠ boto3 not available; start workers with {{"mode": "worker"}} to drain {queue.name}.')
+        if boto3 is not None:
+            client = boto3.client("lambda")
+            payload = {k: event[k] for k in ("queue", "queue_path", "sink", "sink_path") if k in event}
+            for _ in range(workers):
+                client.invoke(
+                    FunctionName=function_name,
+                    InvocationType="Event",
+                    Payload=json.dumps({**payload, "mode": "worker"}).encode("utf-8"),
+                )
+            print(f"▶ Started {workers} worker invocation(s) of {function_name}")
+    queue.close()
+    return {"statusCode": 200, "body": f"OK: queued {queued} unit(s)", "units": len(units), "queued": queued}
+
+
+def work(event, context):
+    """
+    Worker mode: lease units from the queue and crawl them until the queue is
+    drained or the invocation is about to time out.
+    """
+    sink_name = event.get("sink", "supabase")
+    supabase = SupabaseClient() if sink_name == "supabase" or os.getenv("SUPABASE_URL") else None
+    queue = _work_queue(event, supabase)
+    # Workers on one host may share a local sink file; none of them truncates it.
+    sink = get_sink(sink_name, supabase=supabase, path=event.get("sink_path"), append=True)
+    deadline = None
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        # Stop leasing with enough time left to finish one batch of units.
+        remaining = context.get_remaining_time_in_millis() / 1000
+        deadline = time.monotonic() + remaining - min(120, remaining / 4)
+    try:
+        stats = asyncio.run(
+            run_worker(
+                queue,
+                lambda chain: CrawlerRegistry.get_crawler(chain, supabase),
+                sink,
+                supabase=supabase,
+                batch_size=int(event.get("lease_units", 10)),
+                visibility_timeout=float(event.get("visibility_timeout", 300)),
+                deadline=deadline,
+            )
+        )
+    finally:
+        sink.close()
+    counts = queue.counts()
+    queue.close()
+    print(f"✔ Worker done: {stats}; queue {counts}")
+    return {"statusCode": 200, "body": "OK: worker", "stats": stats, "queue": counts}
+
+
+def lambda_handler(event, context):
+    if event.get("mode") == "seats":
+        return refresh_seats(event)
+    if event.get("mode") == "publish":
+        return publish_work(event, context)
+    if event.get("mode") == "worker":
+        return work(event, context)
+
+    max_days = event.get("max_days", 14)
+    sink_name = event.get("sink", "supabase")
+    # Local sinks (sqlite/parquet/jsonl) can run without Supabase credentials.
+    supabase = (
+        SupabaseClient()
+        if sink_name == "supabase" or os.getenv("SUPABASE_URL")
+        else None
+    )
+
+    # Failed (chain, theater, date) units: retried once at the end of this run,
+    # leftovers persisted for the next run or a {"mode": "retry"} invocation.
+    ledger = FailureLedger.load(
+        _state_store(event, supabase, "failed_units_path", "FAILED_UNITS_PATH", "failed_units", "crawl_failed_units.json")
+    )
+    max_unit_attempts = int(event.get("max_unit_attempts", 5))
+    chain_timeout = event.get("chain_timeout")
+    retry_only = event.get("mode") == "retry"
+    if retry_only:
+        chains = sorted({unit.chain for unit in ledger.units(max_unit_attempts)})
+        if not chains:
+            # Scheduled retries with nothing pending skip the probes, identity index and sink.
+            print("✔ No failed units to retry")
+            return {"statusCode": 200, "body": "OK: nothing to retry", "failed_units": ledger.entries()}
+        print(f"▶ Retrying {len(ledger.units(max_unit_attempts))} failed unit(s) of {chains}")
+    else:
+        chains = event.get("chains", ALL_CHAINS)
+        if len(ledger):
+            print(f"▶ {len(ledger)} failed unit(s) left over from earlier runs")
+
+    # One cheap request per chain before launching browsers or paging through
+    # theaters; chains that look down, blocked or misconfigured are deferred.
+    probes = {}
+    deferred = {}
+    if event.get("probe", True) and chains:
+        probes = asyncio.run(
+            probe_chains(
+                {chain: CrawlerRegistry.crawler_class(chain) for chain in chains},
+                timeout=float(event.get("probe_timeout", 10)),
+            )
+        )
+        for chain, result in probes.items():
+            if result.ok:
+                print(f"✔ {chain}: probe OK in {result.latency_ms:.0f}ms")
+            else:
+                print(f"⚠ {chain}: probe failed in {result.latency_ms:.0f}ms: {result.error}")
+                deferred[chain] = f"probe failed: {result.error}"
+
+    sink = get_sink(sink_name, supabase=supabase, path=event.get("sink_path"))
+
+    identity = None
+    if event.get("resolve_movies", True):
+        try:
+            identity = MovieIdentityIndex.from_supabase(supabase) if supabase else MovieIdentityIndex()
+            print(f"✔ Movie identity index seeded with {len(identity)} movies")
+        except Exception as e:
+            print(f"⚠ Could not seed movie identity index, skipping movie aliases: {e}")
+
+    failed = []
+    succeeded = []
+    dimensions = CrawlDimensions()
+    try:
+        snapshot_store = get_snapshot_store(
+            directory=event.get("snapshot_dir", os.getenv("SNAPSHOT_DIR")),
+            bucket=os.getenv("SNAPSHOT_BUCKET"),
+            prefix=os.getenv("SNAPSHOT_PREFIX", ""),
+        )
+    except Exception as e:
+        print(f"⚠ Could not open the snapshot store, skipping snapshots: {e}")
+        snapshot_store = None
+    batches = []
+    change_state_dir = event.get("change_state_dir", os.getenv("CHANGE_STATE_DIR"))
+    change_feed_path = event.get("change_feed_path", os.getenv("CHANGE_FEED_PATH"))
+    change_feed = (
+        ChangeFeed(
+            LocalChangeState(change_state_dir),
+            JsonLinesChangeSink(change_feed_path) if change_feed_path else None,
+        )
+        if change_state_dir
+        else None
+    )
+
+    planner = None
+    if event.get("horizon") and not retry_only:
+        state = _state_store(
+            event, supabase, "horizon_state_path", "HORIZON_STATE_PATH", "default", "crawl_horizon_state.json"
+        )
+        planner = HorizonPlanner(parse_tiers(event["horizon"]), state, max_days=max_days)
+        print(f"▶ Horizon run #{planner.run_number}")
+
+    def chain_segments(chain):
+        segments = [(dt.date.today(), max_days)]
+        if planner is not None:
+            segments = planner.segments(chain)
+            if segments and not CrawlerRegistry.crawler_class(chain).date_addressable:
+                segments = [(dt.date.today(), max_days)]
+        return segments
+
+    revisit = None
+    revisit_plan = {}
+    segments_by_chain = {}
+    if event.get("revisit") and not retry_only:
+        options = event["revisit"]
+        state = _state_store(
+            event, supabase, "revisit_state_path", "REVISIT_STATE_PATH", "revisit", "crawl_revisit_state.json"
+        )
+        revisit = RevisitScheduler(
+            state,
+            budget=int(options["budget"]),
+            max_staleness_hours=float(options.get("max_staleness_hours", 24)),
+            min_change_probability=float(options.get("min_change_probability", 0.05)),
+        )
+        units = {}
+        registry = CinemaRegistry.shared(supabase)
+        for chain in chains:
+            if chain in deferred:
+                continue
+            segments_by_chain[chain] = chain_segments(chain)
+            # One request per theater and date; chains that ignore dates pay once per theater.
+            days = sum(days for _, days in segments_by_chain[chain])
+            cost = days if CrawlerRegistry.crawler_class(chain).date_addressable else 1
+            if days:
+                units[chain] = (registry.for_chain(chain), cost)
+        revisit_plan = revisit.plan(units)
+        print(f"▶ Revisit plan: {revisit.summary}")
+        if revisit.summary["requests"] > revisit.budget:
+            print("⚠ Max staleness needs more requests than the revisit budget allows")
+
+    crawled_cinemas = {}
+    fully_crawled = set()
+
+    def process(chain, screenings, cinema_codes=None):
+        print(f"✔ {chain}: Crawled {len(screenings)} screenings")
+        dimensions.extend(screenings)
+        if identity is not None:
+            matched = identity.resolve_dimensions(dimensions)
+            if matched:
+                print(f"✔ {chain}: Resolved {matched} movies to existing movie ids")
+        write_started = time.perf_counter()
+        written = sink.write(screenings)
+        write_secs = time.perf_counter() - write_started
+        print(
+            f"✔ {chain}: Wrote {written} rows to {sink.name} in {write_secs:.2f}s "
+            f"({written / write_secs if write_secs else 0:.0f} rows/s)"
+        )
+        if identity is not None and supabase:
+            # The batch's resolved movie ids, joined back from the dimension table.
+            try:
+                aliases = write_movie_aliases(supabase, dimensions.movie_aliases(screenings))
+                if aliases:
+                    print(f"✔ {chain}: Recorded {aliases} movie alias(es)")
+            except Exception as e:
+                print(f"⚠ {chain}: Could not record movie aliases: {e}")
+        if change_feed is not None:
+            print(f"✔ {chain}: Changes {summarize(change_feed.diff(screenings, cinema_codes))}")
+        if snapshot_store is not None:
+            batches.append(screenings)
+            if cinema_codes is None:
+                fully_crawled.add(chain)
+                crawled_cinemas.pop(chain, None)
+            elif chain not in fully_crawled:
+                crawled_cinemas.setdefault(chain, set()).update(cinema_codes)
+
+    async def crawl(crawler, start_date, days):
+        if chain_timeout is None:
+            return await crawler.run_batch(start_date=start_date, max_days=days)
+        try:
+            return await asyncio.wait_for(
+                crawler.run_batch(start_date=start_date, max_days=days), float(chain_timeout)
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"timed out after {chain_timeout}s") from None
+
+    crawlers = {}
+
+    def get_crawler(chain):
+        if chain not in crawlers:
+            crawlers[chain] = CrawlerRegistry.get_crawler(chain, supabase)
+        return crawlers[chain]
+
+    async def run_all():
+        if retry_only:
+            return
+        for chain in chains:
+            # Segments not crawled yet; recorded as failed units if the chain fails.
+            remaining = [(dt.date.today(), max_days)]
+            try:
+                segments = segments_by_chain[chain] if chain in segments_by_chain else chain_segments(chain)
+                if not segments:
+                    print(f"⏭ {chain}: no horizon tier due")
+                    continue
+                if chain in deferred:
+                    # Revisit runs catch up through the scheduler's staleness bound instead.
+                    if revisit is None:
+                        ledger.record_window(chain, segments, deferred[chain])
+                    print(f"⏭ {chain}: deferred ({deferred[chain]})")
+                    continue
+                if revisit is not None and not revisit_plan.get(chain):
+                    print(f"⏭ {chain}: no theater due for a revisit")
+                    continue
+                crawler = get_crawler(chain)
+                if revisit is not None:
+                    crawler.theaters = revisit_plan[chain]
+                    print(f"▶ {chain}: revisiting {len(crawler.theaters)} theater(s)")
+                crawled, play_dates, failed_codes = [], [], set()
+                remaining = list(segments)
+                for start_date, days in segments:
+                    print(f"▶ Running crawler for {chain} ({start_date}, {days} day(s))...")
+                    screenings = await crawl(crawler, start_date, days)
+                    remaining.pop(0)
+                    failures = crawler.take_failures()
+                    # Earlier failed units this segment just crawled successfully are done.
+                    codes = crawled_codes(crawler, failures)
+                    covered = ledger.covered(
+                        chain, start_date, days, None if revisit is None and not failures else codes
+                    )
+                    ledger.resolve(covered)
+                    recorded = ledger.record_all(failures)
+                    failed_codes.update(unit.cinema_code for unit, _ in failures)
+                    if recorded:
+                        print(f"⚠ {chain}: {recorded} theater/date unit(s) failed")
+                    if covered:
+                        print(f"✔ {chain}: {len(covered)} earlier failed unit(s) crawled")
+                    process(chain, screenings, codes)
+                    crawled.append(screenings)
+                    play_dates.extend((start_date + dt.timedelta(days=d)).isoformat() for d in range(days))
+                if revisit is not None:
+                    # Failed theaters keep their last visit so they stay due and are not counted as changed.
+                    visited = [t for t in crawler.theaters if t.cinema_code not in failed_codes]
+                    changed = revisit.observe(chain, visited, play_dates, crawled)
+                    print(f"✔ {chain}: {changed} theater(s) changed since their last visit")
+                if planner is not None:
+                    planner.mark_crawled(chain)
+                succeeded.append(chain)
+            except Exception as e:
+                print(f"❌ Error with {chain}: {e}")
+                failed.append(chain)
+                # Revisit runs record the planned theaters; other runs whole-chain units.
+                codes = [theater.cinema_code for theater in revisit_plan.get(chain, ())]
+                ledger.record_window(chain, remaining, str(e), codes or None)
+
+        pending = ledger.units(max_unit_attempts, exclude_chains=deferred)
+        if pending and event.get("retry_failed", True):
+            print(f"▶ Retry pass over {len(pending)} failed unit(s)")
+            await retry_units(ledger, pending, get_crawler, crawl, process, supabase=supabase)
+
+    try:
+        if retry_only:
+            pending = ledger.units(max_unit_attempts, exclude_chains=deferred)
+            asyncio.run(retry_units(ledger, pending, get_crawler, crawl, process, supabase=supabase))
+        else:
+            asyncio.run(run_all())
+        if planner is not None:
+            planner.finish()
+        if revisit is not None:
+            revisit.finish()
+    finally:
+        sink.close()
+        if change_feed is not None and change_feed.sink is not None:
+            change_feed.sink.close()
+
+    if snapshot_store is not None and batches:
+        try:
+            started = time.perf_counter()
+            stats = publish_snapshots(
+                (row for batch in batches for row in batch.rows()), snapshot_store, crawled_cinemas
+            )
+            print(
+                f"✔ Snapshots: {stats['written']} written, {stats['unchanged']} unchanged, "
+                f"{stats['deleted']} deleted ({stats['bytes_raw']} B raw, {stats['bytes_gzip']} B gzip, "
+                f"{stats['bytes_br']} B br) in {time.perf_counter() - started:.2f}s"
+            )
+        except Exception as e:
+            print(f"⚠ Could not publish schedule snapshots: {e}")
+
+    for provider, stats in dimensions.dedup_report().items():
+        print(
+            f"✔ {provider}: {stats['rows']} rows -> {stats['movies']} movies, "
+            f"{stats['cinemas']} cinemas ({stats['dedup_ratio']}x rows per movie)"
+        )
+
+    if identity is not None:
+        print(f"✔ Movie identity: {dict(identity.stats)}")
+
+    movie_keys = dimensions.movie_keys()
+    new_titles = []
+    if supabase and event.get("emit_new_titles", True):
+        try:
+            new_titles = SupabaseEnrichmentQueue(supabase).publish_new(movie_keys)
+            print(f"✔ {len(new_titles)} new title(s) out of {len(movie_keys)} distinct")
+            trigger_enrichment(new_titles)
+        except Exception as e:
+            print(f"⚠ Could not publish new titles for enrichment: {e}")
+
+    leftovers = ledger.entries()
+    try:
+        ledger.save()
+    except Exception as e:
+        print(f"⚠ Could not persist failed units: {e}")
+        if failed or leftovers:
+            # Nothing to retry from, so let EventBridge/scheduled Lambda retry the whole run.
+            raise RuntimeError(f"Failed chains: {failed}; {len(leftovers)} failed unit(s)") from e
+    if leftovers:
+        print(f'⚠ {len(leftovers)} unit(s) still failing; re-crawl them with {{"mode": "retry"}}')
     return {
         "statusCode": 200,
-        "body": f"OK: {succeeded}"
+        "body": f"OK: {succeeded}" if not retry_only else f"OK: retried {chains}",
+        "new_titles": len(new_titles),
+        "failed_chains": failed,
+        "deferred_chains": sorted(deferred),
+        "failed_units": leftovers,
+        "probes": {chain: asdict(result) for chain, result in probes.items()},
     }
@@ -1,13 +1,26 @@
 from crawlers.base import BaseCrawler
-from models import Screening, Chain
+from models import Screening, Chain, SeatCount
 import httpx
 import datetime as dt
 import html
 import re
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 class MegaboxCrawler(BaseCrawler):
     chain: Chain = "Megabox"
+    _schedule_url = "https://www.megabox.co.kr/on/oh/ohc/Brch/schedulePage.do"
+    probe_url = "https://www.megabox.co.kr/booking/timetable"
+    _headers = {
+        "Content-Type": "application/json",
+        "X-Requested-With": "XMLHttpRequest",
+        "Origin": "https://www.megabox.co.kr",
+        "Referer": "https://www.megabox.co.kr/booking/timetable",
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/124.0.0.0 Safari/537.36"
+        )
+    }
 
     @staticmethod
     def _normalize_screen_name(raw_name: str) -> str:
@@ -17,74 +30,79 @@ class MegaboxCrawler(BaseCrawler):
         name = re.sub(r"\s*\([^)]*\)\s*$", "", name)
         return re.sub(r"\s+", " ", name).strip()
 
-    async def iter(self, date: dt.date) -> Iterable[Screening]:
-        url = "https://www.megabox.co.kr/on/oh/ohc/Brch/schedulePage.do"
-
-        headers = {
-            "Content-Type": "application/json",
-            "X-Requested-With": "XMLHttpRequest",
-            "Origin": "https://www.megabox.co.kr",
-            "Referer": "https://www.megabox.co.kr/booking/timetable",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            )
+    async def _fetch_schedule(self, brch_no: str, date: dt.date) -> list[dict] | None:
+        """`schedulePage.do` items for one branch and date, or None if the request failed."""
+        body = {
+            "masterType": "brch",
+            "detailType": "area",
+            "brchNo": brch_no,
+            "brchNo1": brch_no,
+            "firstAt": "N",
+            "crtDe": dt.date.today().strftime("%Y%m%d"),
+            "playDe": date.strftime("%Y%m%d"),
         }
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            try:
+                resp = await client.post(self._schedule_url, json=body, headers=self._headers)
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                print(f"[{brch_no}] API request failed: {e}")
+                return None
+        return data.get("megaMap", {}).get("movieFormList", [])
 
+    async def iter(self, date: dt.date) -> Iterable[Screening]:
         crawl_ts = dt.datetime.utcnow()
 
         for theater in self.theaters:
-            brch_no = theater.cinema_code
-            body = {
-                "masterType": "brch",
-                "detailType": "area",
-                "brchNo": brch_no,
-                "brchNo1": brch_no,
-                "firstAt": "N",
-                "crtDe": dt.date.today().strftime("%Y%m%d"),
-                "playDe": date.strftime("%Y%m%d"),
-            }
+            items = await self._fetch_schedule(theater.cinema_code, date)
+            if items is None:
+                self.record_failure(theater.cinema_code, "schedulePage.do request failed", date)
+                continue
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                try:
-                    resp = await client.post(url, json=body, headers=headers)
-                    resp.raise_for_status()
-                    data = resp.json()
+            for item in items:
+                cinema_name = html.unescape(item["brchNm"]).strip()
+                screen_name = self._normalize_screen_name(item.get("theabExpoNm"))
+                branch_code = str(item.get("brchNo") or "").strip()
+                is_core_art_screen = (
+                    (cinema_name == "코엑스" and screen_name in {"스크린A", "스크린B"})
+                    or branch_code == "0081"
+                    or "픽쳐하우스" in cinema_name
+                )
 
-                except Exception as e:
-                    print(f"[{brch_no}] API request failed: {e}")
-                    continue
+                play_schdl_no = item.get("playSchdlNo")
+                book_url = f"https://www.megabox.co.kr/bookingByPlaySchdlNo?playSchdlNo={play_schdl_no}" if play_schdl_no else None
 
-                for item in data.get("megaMap", {}).get("movieFormList", []):
-                    cinema_name = html.unescape(item["brchNm"]).strip()
-                    screen_name = self._normalize_screen_name(item.get("theabExpoNm"))
-                    branch_code = str(item.get("brchNo") or "").strip()
-                    is_core_art_screen = (
-                        (cinema_name == "코엑스" and screen_name in {"스크린A", "스크린B"})
-                        or branch_code == "0081"
-                        or "픽쳐하우스" in cinema_name
-                    )
+                yield Screening(
+                    provider=self.chain,
+                    cinema_name=cinema_name,
+                    cinema_code=branch_code,
+                    screen_name=screen_name,
+                    movie_title=html.unescape(item["rpstMovieNm"]).strip(),
+                    movie_title_en=html.unescape(item.get("movieEngNm") or "").strip() or None,
+                    source_movie_code=str(
+                        item.get("rpstMovieNo") or item.get("movieNo") or ""
+                    ).strip() or None,
+                    is_core_art_screen=is_core_art_screen,
+                    play_date=date.isoformat(),
+                    start_dt=item["playStartTime"],
+                    end_dt=item["playEndTime"],
+                    crawl_ts=crawl_ts.isoformat(),
+                    url=book_url,
+                    remain_seat_cnt=int(item["restSeatCnt"]),
+                    total_seat_cnt=int(item["totSeatCnt"])
+                )
 
-                    play_schdl_no = item.get("playSchdlNo")
-                    book_url = f"https://www.megabox.co.kr/bookingByPlaySchdlNo?playSchdlNo={play_schdl_no}" if play_schdl_no else None
-
-                    yield Screening(
-                        provider=self.chain,
-                        cinema_name=cinema_name,
-                        cinema_code=branch_code,
-                        screen_name=screen_name,
-                        movie_title=html.unescape(item["rpstMovieNm"]).strip(),
-                        movie_title_en=html.unescape(item.get("movieEngNm") or "").strip() or None,
-                        source_movie_code=str(
-                            item.get("rpstMovieNo") or item.get("movieNo") or ""
-                        ).strip() or None,
-                        is_core_art_screen=is_core_art_screen,
-                        play_date=date.isoformat(),
-                        start_dt=item["playStartTime"],
-                        end_dt=item["playEndTime"],
-                        crawl_ts=crawl_ts.isoformat(),
-                        url=book_url,
-                        remain_seat_cnt=int(item["restSeatCnt"]),
-                        total_seat_cnt=int(item["totSeatCnt"])
-                    )
+    async def iter_seats(self, date: dt.date) -> AsyncIterator[SeatCount]:
+        for theater in self.theaters:
+            items = await self._fetch_schedule(theater.cinema_code, date)
+            for item in items or ():
+                yield SeatCount(
+                    self.chain,
+                    str(item.get("brchNo") or "").strip(),
+                    date.isoformat(),
+                    item["playStartTime"],
+                    self._normalize_screen_name(item.get("theabExpoNm")),
+                    int(item["restSeatCnt"]),
+                    int(item["totSeatCnt"]),
+                )
@@ -0,0 +1,161 @@
+"""
+Cross-chain movie identity index used at ingest time.
+
+Each chain spells the same film differently (CGV `movNm`, Megabox `rpstMovieNm`,
+Lotte `MovieNameKR`, Dtryx `MovieNmNat`) and carries its own movie code. The
+index resolves a crawl's distinct movies to existing `movies` rows by, in order:
+  1. source movie code
+  2. normalized title (movies.title or canonical_title)
+  3. character n-gram similarity, rejected when both sides carry different years
+
+Screenings keep the crawled title. Each (provider, crawled title, source code)
+resolved to an existing row is recorded in the `movie_aliases` mapping table
+with the method that matched it. The TMDB updater reads it
+(`poster_updater.merge_aliased_movies`): a new `movies` row whose title has a
+`code` or `title` alias to an already-linked movie is merged into that movie
+with `merge_movie_rows` instead of being looked up on TMDB again. Unmatched
+movies are registered for the rest of the run, so later chains match them
+without another scan.
+"""
+from collections import Counter
+from typing import Any, Optional
+
+from crawlers.dimensions import CrawlDimensions, MovieDim
+from crawlers.titles import char_ngrams, normalize_for_match
+
+MOVIE_COLUMNS = "id, title, canonical_title, source_year, source_movie_code"
+MOVIE_FALLBACK_COLUMNS = ("id, title, canonical_title",)
+
+
+class MovieIdentityIndex:
+    def __init__(self, *, ngram_size: int = 3, min_similarity: float = 0.85, max_posting: int = 5000):
+        self.ngram_size = ngram_size
+        self.min_similarity = min_similarity
+        self.max_posting = max_posting
+        # Entry = (movie_id or None for a movie first seen this run, title, year)
+        self._entries: list[tuple[Optional[int], str, Optional[int]]] = []
+        self._ngram_counts: list[int] = []
+        self._by_code: dict[str, int] = {}
+        self._by_title: dict[str, int] = {}
+        self._by_ngram: dict[str, list[int]] = {}
+        self.stats: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def from_supabase(cls, supabase, **kwargs) -> "MovieIdentityIndex":
+        """Seed from the `movies` table in one paginated read."""
+        index = cls(**kwargs)
+        for row in supabase.iter_rows("movies", MOVIE_COLUMNS, fallback_columns=MOVIE_FALLBACK_COLUMNS):
+            index.add(
+                row["id"],
+                row.get("title") or "",
+                year=row.get("source_year"),
+                source_movie_code=row.get("source_movie_code"),
+                aliases=(row.get("canonical_title"),),
+            )
+        return index
+
+    def add(
+        self,
+        movie_id: Optional[int],
+        title: str,
+        *,
+        year: Optional[int] = None,
+        source_movie_code: Optional[str] = None,
+        aliases: tuple[Optional[str], ...] = (),
+    ) -> Optional[int]:
+        """Register a movie. Returns its entry number, or None for an empty title."""
+        normalized = normalize_for_match(title)
+        if not normalized:
+            return None
+        entry = len(self._entries)
+        grams = char_ngrams(normalized, self.ngram_size)
+        self._entries.append((movie_id, title, year))
+        self._ngram_counts.append(len(grams))
+        if source_movie_code:
+            self._by_code.setdefault(source_movie_code, entry)
+        for value in (normalized, *(normalize_for_match(a) for a in aliases if a)):
+            if value:
+                self._by_title.setdefault(value, entry)
+        for gram in grams:
+            self._by_ngram.setdefault(gram, []).append(entry)
+        return entry
+
+    def _similar(self, normalized: str, year: Optional[int]) -> Optional[int]:
+        grams = char_ngrams(normalized, self.ngram_size)
+        if not grams:
+            return None
+        shared: Counter = Counter()
+        for gram in grams:
+            posting = self._by_ngram.get(gram)
+            if posting is None or len(posting) > self.max_posting:
+                continue
+            shared.update(posting)
+
+        best, best_similarity = None, self.min_similarity
+        for entry, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + self._ngram_counts[entry])
+            if similarity < best_similarity:
+                continue
+            entry_year = self._entries[entry][2]
+            if year and entry_year and year != entry_year:
+                continue
+            best, best_similarity = entry, similarity
+        return best
+
+    def _same_film(self, normalized: str, entry: int) -> bool:
+        # movies.source_movie_code carries no provider, so a code hit must also
+        # look like the same title to rule out codes colliding across chains.
+        entry_grams = set(char_ngrams(normalize_for_match(self._entries[entry][1]), self.ngram_size))
+        grams = set(char_ngrams(normalized, self.ngram_size))
+        if not grams or not entry_grams:
+            return False
+        return 2.0 * len(grams & entry_grams) / (len(grams) + len(entry_grams)) >= 0.5
+
+    def resolve(self, movie: MovieDim) -> tuple[Optional[int], str, str]:
+        """
+        (movie_id, title, method) for a crawled movie; method is "code",
+        "title", "ngram" or "new". movie_id is None when the movie is not in
+        `movies` yet; the title is then the first spelling seen this run.
+        """
+        entry = None
+        method = "new"
+        code_entry = self._by_code.get(movie.source_movie_code) if movie.source_movie_code else None
+        if code_entry is not None and self._same_film(movie.normalized_title, code_entry):
+            entry, method = code_entry, "code"
+        elif movie.normalized_title in self._by_title:
+            entry, method = self._by_title[movie.normalized_title], "title"
+        elif movie.normalized_title:
+            entry = self._similar(movie.normalized_title, movie.source_year)
+            if entry is not None:
+                method = "ngram"
+        self.stats[method] += 1
+
+        if entry is None:
+            self.add(None, movie.movie_title, year=movie.source_year, source_movie_code=movie.source_movie_code)
+            return None, movie.movie_title, method
+
+        movie_id, title, _ = self._entries[entry]
+        # Later chains reuse this spelling and code without another fuzzy scan.
+        if movie.normalized_title:
+            self._by_title.setdefault(movie.normalized_title, entry)
+        if movie.source_movie_code and method == "code":
+            self._by_code.setdefault(movie.source_movie_code, entry)
+        return movie_id, title, method
+
+    def resolve_dimensions(self, dims: CrawlDimensions) -> int:
+        """Resolve every not-yet-resolved movie in `dims`; returns how many matched `movies` rows."""
+        return dims.resolve_identities(self.resolve)
+
+
+def write_movie_aliases(supabase, aliases: list[dict[str, Any]], chunk_size: int = 500) -> int:
+    """Upsert alias rows into `movie_aliases`; a later run's match replaces an earlier one."""
+    for start in range(0, len(aliases), chunk_size):
+        (
+            supabase.client.table("movie_aliases")
+            .upsert(aliases[start: start + chunk_size], on_conflict="provider,movie_title,source_movie_code")
+            .execute()
+        )
+    return len(aliases)
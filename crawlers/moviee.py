@@ -1,11 +1,11 @@
 import datetime as dt
 import re
-from typing import Iterable
+from typing import AsyncIterator, Iterable
 
 import httpx
 
 from crawlers.base import BaseCrawler
-from models import Chain, Screening
+from models import Chain, Screening, SeatCount
 
 
 class MovieeCrawler(BaseCrawler):
@@ -14,7 +14,16 @@ class MovieeCrawler(BaseCrawler):
     _base_url = "https://moviee.co.kr"
     _play_date_url = f"{_base_url}/api/TicketApi/GetPlayDateList"
     _play_time_url = f"{_base_url}/api/TicketApi/GetPlayTimeList"
+    probe_url = _base_url
     _provider_id = "Y24"
+    _headers = {
+        "X-Requested-With": "XMLHttpRequest",
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/124.0.0.0 Safari/537.36"
+        ),
+    }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -80,48 +89,48 @@ class MovieeCrawler(BaseCrawler):
         self._play_dates_cache[theater_code] = dates
         return dates
 
+    async def _fetch_play_times(
+        self, client: httpx.AsyncClient, theater_code: str, target_date: str
+    ) -> list[dict] | None:
+        """`GetPlayTimeList` rows for one theater and date ([] when it has none, None when the call failed)."""
+        available_dates = await self._get_available_dates(client, theater_code)
+        if available_dates and target_date not in available_dates:
+            return []
+
+        params = {
+            "tId": theater_code,
+            "mId": "",
+            "playDt": target_date,
+            "ntId": "",
+            "gId": "",
+        }
+        try:
+            response = await client.get(self._play_time_url, params=params)
+            response.raise_for_status()
+            payload = response.json()
+        except Exception as exc:
+            print(f"[Moviee:{theater_code}] GetPlayTimeList failed: {exc}")
+            return None
+
+        if payload.get("ResCd") != "00":
+            print(
+                f"[Moviee:{theater_code}] GetPlayTimeList returned ResCd={payload.get('ResCd')}"
+            )
+            return None
+
+        return ((payload.get("ResData") or {}).get("Table") or [])
+
     async def iter(self, date: dt.date) -> Iterable[Screening]:
         target_date = date.isoformat()
         crawl_ts = dt.datetime.utcnow().isoformat()
 
-        headers = {
-            "X-Requested-With": "XMLHttpRequest",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-        }
-
-        async with httpx.AsyncClient(timeout=10.0, headers=headers) as client:
+        async with httpx.AsyncClient(timeout=10.0, headers=self._headers) as client:
             for theater in self.theaters:
                 theater_code = str(theater.cinema_code)
-                available_dates = await self._get_available_dates(client, theater_code)
-                if available_dates and target_date not in available_dates:
-                    continue
-
-                params = {
-                    "tId": theater_code,
-                    "mId": "",
-                    "playDt": target_date,
-                    "ntId": "",
-                    "gId": "",
-                }
-                try:
-                    response = await client.get(self._play_time_url, params=params)
-                    response.raise_for_status()
-                    payload = response.json()
-                except Exception as exc:
-                    print(f"[Moviee:{theater_code}] GetPlayTimeList failed: {exc}")
-                    continue
-
-                if payload.get("ResCd") != "00":
-                    print(
-                        f"[Moviee:{theater_code}] GetPlayTimeList returned ResCd={payload.get('ResCd')}"
-                    )
+                rows = await self._fetch_play_times(client, theater_code, target_date)
+                if rows is None:
+                    self.record_failure(theater_code, "GetPlayTimeList request failed", date)
                     continue
-
-                rows = ((payload.get("ResData") or {}).get("Table") or [])
                 for item in rows:
                     movie_title = (item.get("M_NM") or "").strip()
                     if not movie_title:
@@ -165,3 +174,22 @@ class MovieeCrawler(BaseCrawler):
                         remain_seat_cnt=self._to_int(item.get("REMAINSEAT_CNT")),
                         total_seat_cnt=self._to_int(item.get("SEAT_CNT")),
                     )
+
+    async def iter_seats(self, date: dt.date) -> AsyncIterator[SeatCount]:
+        target_date = date.isoformat()
+        async with httpx.AsyncClient(timeout=10.0, headers=self._headers) as client:
+            for theater in self.theaters:
+                theater_code = str(theater.cinema_code)
+                for item in await self._fetch_play_times(client, theater_code, target_date) or ():
+                    start_dt = self._to_hhmm(item.get("PLAY_TIME"))
+                    if not (item.get("M_NM") or "").strip() or not start_dt:
+                        continue
+                    yield SeatCount(
+                        self.chain,
+                        str(item.get("T_ID") or theater_code),
+                        (item.get("PLAY_DT") or target_date).strip() or target_date,
+                        start_dt,
+                        (item.get("TS_NM") or "").strip() or "미지정",
+                        self._to_int(item.get("REMAINSEAT_CNT")),
+                        self._to_int(item.get("SEAT_CNT")),
+                    )
@@ -2,10 +2,12 @@ import asyncio
 import datetime as dt
 import json
 from pathlib import Path
-import importlib
+import time
 from crawlers.crawler_registry import CrawlerRegistry
+from crawlers.sinks import get_sink
 
 CHAIN = "Megabox"  # ⬅️ change this to "Lotte", "Megabox", "CGV", etc.
+SINK = "jsonl"  # ⬅️ "jsonl", "sqlite" or "parquet"; None keeps the pretty-printed JSON dump
 
 # --- dummy supabase for local testing ---
 class DummySupabase:
@@ -13,7 +15,7 @@ class DummySupabase:
         json_path = Path(__file__).parent.parent / "cinemas.json"
         with open(json_path, encoding="utf-8") as f:
             cinemas = json.load(f)
-        return [c for c in cinemas if c["chain"] == chain]
+        return [c for c in cinemas if chain is None or c["chain"] == chain]
 
     def delete_screenings_by_date_and_chain(self, date_str, chain):
         print(f"[DummySupabase] delete where provider='{chain}' and date='{date_str}'")
@@ -32,8 +34,18 @@ async def main():
     for s in results:
         print(s.model_dump())
 
-    with open(f"{CHAIN.lower()}_screenings.json", "w", encoding="utf-8") as f:
-        json.dump([s.model_dump() for s in results], f, ensure_ascii=False, indent=2)
+    if SINK is None:
+        with open(f"{CHAIN.lower()}_screenings.json", "w", encoding="utf-8") as f:
+            json.dump([s.model_dump() for s in results], f, ensure_ascii=False, indent=2)
+        return
+
+    suffix = {"jsonl": ".jsonl", "sqlite": ".sqlite3", "parquet": "_parquet"}[SINK]
+    sink = get_sink(SINK, path=f"{CHAIN.lower()}_screenings{suffix}")
+    started = time.perf_counter()
+    written = sink.write(results)
+    sink.close()
+    elapsed = time.perf_counter() - started
+    print(f"[{SINK}] wrote {written} rows in {elapsed:.3f}s ({written / elapsed if elapsed else 0:.0f} rows/s)")
 
 
 if __name__ == "__main__":
@@ -11,114 +11,116 @@ try:
 except ModuleNotFoundError:
     # Local repo layout
     from crawlers.supabase_client import SupabaseClient
+try:
+    from titles import (
+        TRAILING_EVENT_PAREN_RE,
+        clean_title_core,
+        contains_event_keyword,
+        normalize_for_match,
+        strip_parentheses_and_brackets,
+        trim_edition_suffix,
+        trim_format_suffix,
+    )
+    from tmdb_index import TMDBTitleIndex
+    from enrichment_queue import SupabaseEnrichmentQueue
+except ModuleNotFoundError:
+    from crawlers.titles import (
+        TRAILING_EVENT_PAREN_RE,
+        clean_title_core,
+        contains_event_keyword,
+        normalize_for_match,
+        strip_parentheses_and_brackets,
+        trim_edition_suffix,
+        trim_format_suffix,
+    )
+    from crawlers.tmdb_index import TMDBTitleIndex
+    from crawlers.enrichment_queue import SupabaseEnrichmentQueue
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+# Optional TMDB daily id export (movie_ids_MM_DD_YYYY.json.gz) for offline shortlisting.
+TMDB_INDEX_PATH = os.getenv("TMDB_INDEX_PATH")
+TMDB_INDEX_MIN_POPULARITY = float(os.getenv("TMDB_INDEX_MIN_POPULARITY", "0"))
 
 supabase_wrapper = SupabaseClient()
 supabase = supabase_wrapper.client
+# Swap for InMemoryEnrichmentQueue in tests.
+enrichment_queue = SupabaseEnrichmentQueue(supabase_wrapper)
 
 TMDB_SEARCH_URL  = "https://api.themoviedb.org/3/search/movie"
+TMDB_MOVIE_URL   = "https://api.themoviedb.org/3/movie/{tmdb_id}"
+TMDB_CREDITS_URL = "https://api.themoviedb.org/3/movie/{tmdb_id}/credits"
 TMDB_IMAGE_BASE  = "https://image.tmdb.org/t/p/w500"
 SEARCH_LANGUAGES = ("ko-KR", "en-US")
 GENERIC_EN_CLEAR_MARGIN = 12
-EDITION_SUFFIX_PATTERN = r"(?:특별판|무삭제판|극장판|감독판|디렉터스\s*컷|director['’]s\s*cut)"
-FORMAT_SUFFIX_PATTERN = r"(?:2d|3d|4k|8k|35mm|70mm|16mm|imax|dolby|atmos|자막|더빙|리마스터링|디지털복원|배리어프리(?:\s*버전)?|영문자막|한글자막)"
-EVENT_REGEX_FRAGMENTS = (
-    r"g\s*[.]?\s*v\s*[.]?",
-    r"시네토크",
-    r"씨네토크",
-    r"인디토크",
-    r"무대인사",
-    r"영화소개",
-    r"관객과의\s*대화",
-    r"q\s*&\s*a",
-    r"q\s*n\s*a",
-    r"qna",
-    r"강연",
-    r"강의",
-    r"대담",
-    r"좌담",
-    r"스페셜\s*토크",
-    r"토크",
-    r"포럼",
-    r"라이브\s*스크리닝",
-    r"시사회",
-    r"상영\s*후",
-    r"섹션\s*\d+",
-)
-EVENT_MARKER_PATTERN = r"(?:%s)" % "|".join(EVENT_REGEX_FRAGMENTS)
-PLUS_EVENT_SUFFIX_RE = re.compile(
-    r"\s*\+\s*%s.*$" % EVENT_MARKER_PATTERN,
-    flags=re.IGNORECASE,
-)
-TRAILING_EVENT_PAREN_RE = re.compile(
-    r"\s*\((?=[^)]*%s)[^)]*\)\s*$" % EVENT_MARKER_PATTERN,
-    flags=re.IGNORECASE,
-)
-EDITION_SUFFIX_RE = re.compile(
-    r"\s*%s\s*$" % EDITION_SUFFIX_PATTERN,
-    flags=re.IGNORECASE,
-)
-FORMAT_SUFFIX_RE = re.compile(
-    r"\s*(?:%s\s*)+$" % FORMAT_SUFFIX_PATTERN,
-    flags=re.IGNORECASE,
-)
-YEAR_PAREN_RE = re.compile(r"\(\s*((?:19|20)\d{2})\s*\)")
-ANY_PAREN_RE = re.compile(r"\([^)]*\)")
-ANY_BRACKET_RE = re.compile(r"\[[^]]*\]")
+YEAR_MATCH_BONUS = 16
+YEAR_MISMATCH_PENALTY = 25
+DIRECTOR_TIE_MARGIN = 10
+DIRECTOR_TIE_MAX_LOOKUPS = 3
+DIRECTOR_MATCH_BONUS = 30
 MOVIE_FETCH_CHUNK_SIZE = 500
+# movie_aliases match methods trusted to skip a TMDB lookup; n-gram matches may be a sequel.
+TRUSTED_ALIAS_METHODS = ("code", "title")
+MOVIE_COLUMNS = "id, title, canonical_title, canonical_title_en, source_year, source_director, source_movie_code"
+MOVIE_FALLBACK_COLUMNS = (
+    "id, title, canonical_title, canonical_title_en",
+    "id, title, canonical_title",
+)
 EN_STOPWORDS = {"the", "a", "an", "of", "and", "in", "on", "to", "for", "with", "without", "at", "from"}
 
+_title_index: TMDBTitleIndex | None = None
+_title_index_loaded = False
+_details_cache: dict[tuple[int, str], dict | None] = {}
+_directors_cache: dict[int, set[str]] = {}
+
 
 def fetch_movies_needing_posters() -> list[dict]:
     """
     Select upcoming movie rows that have not been linked to TMDB yet.
     Returns a list of dicts, or [] if no matches.
     """
-    upcoming_resp = (
-        supabase.table("upcoming_movie_ids")
-        .select("movie_id")
-        .execute()
-    )
-
     upcoming_ids = sorted(
         {
             row.get("movie_id")
-            for row in (upcoming_resp.data or [])
+            for row in supabase_wrapper.iter_rows(
+                "upcoming_movie_ids", "movie_id", order_by="movie_id"
+            )
             if row.get("movie_id") is not None
         }
     )
     if not upcoming_ids:
         return []
 
+    return _fetch_unlinked_movies("id", upcoming_ids)
+
+
+def fetch_movies_for_titles(titles: list[str]) -> list[dict]:
+    """
+    Select not-yet-linked movie rows for titles published by the crawler's delta queue.
+    """
+    return _fetch_unlinked_movies("title", sorted(set(titles)))
+
+
+def _fetch_unlinked_movies(column: str, values: list) -> list[dict]:
     movies: list[dict] = []
-    for idx in range(0, len(upcoming_ids), MOVIE_FETCH_CHUNK_SIZE):
-        chunk = upcoming_ids[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
-        try:
-            movie_resp = (
-                supabase.table("movies")
-                .select("id, title, canonical_title, canonical_title_en")
-                .in_("id", chunk)
-                .is_("tmdb_id", None)
-                .or_("tmdb_locked.is.null,tmdb_locked.eq.false")
-                .execute()
-            )
-        except Exception as exc:
-            # Backward compatibility if migration adding canonical_title_en is not applied yet.
-            if "canonical_title_en" not in str(exc):
-                raise
-            movie_resp = (
-                supabase.table("movies")
-                .select("id, title, canonical_title")
-                .in_("id", chunk)
-                .is_("tmdb_id", None)
-                .or_("tmdb_locked.is.null,tmdb_locked.eq.false")
-                .execute()
+    for idx in range(0, len(values), MOVIE_FETCH_CHUNK_SIZE):
+        chunk = values[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
+        movies.extend(
+            supabase_wrapper.iter_rows(
+                "movies",
+                MOVIE_COLUMNS,
+                # Backward compatibility if migrations adding these columns are not applied yet.
+                fallback_columns=MOVIE_FALLBACK_COLUMNS,
+                filters=lambda query, chunk=chunk: (
+                    query.in_(column, chunk)
+                    .is_("tmdb_id", None)
+                    .or_("tmdb_locked.is.null,tmdb_locked.eq.false")
+                ),
+                page_size=MOVIE_FETCH_CHUNK_SIZE,
             )
-        movies.extend(movie_resp.data or [])
+        )
 
     return movies
 
@@ -158,48 +160,81 @@ def merge_movie_rows(keep_movie_id: int, drop_movie_id: int) -> bool:
         return False
 
 
-def _normalize_for_match(value: str) -> str:
-    value = _clean_title_core(value)
-    value = re.sub(r"[^0-9a-zA-Z가-힣\s]", " ", value)
-    value = re.sub(r"\s+", " ", value)
-    return value.strip()
-
-
-def _contains_event_keyword(value: str) -> bool:
-    return bool(re.search(EVENT_MARKER_PATTERN, value, flags=re.IGNORECASE))
-
-
-def _strip_plus_event_suffix(value: str) -> str:
-    return PLUS_EVENT_SUFFIX_RE.sub("", value).strip()
-
-
-def _trim_edition_suffix(value: str) -> str:
-    return EDITION_SUFFIX_RE.sub("", value).strip()
-
-
-def _trim_format_suffix(value: str) -> str:
-    return FORMAT_SUFFIX_RE.sub("", value).strip()
-
+def fetch_alias_targets(movies: list[dict]) -> dict[int, int]:
+    """
+    Map unlinked movie rows to the TMDB-linked movie the crawler resolved their
+    title to (`movie_aliases`). Only `code` and `title` matches count; titles
+    whose aliases point at more than one linked movie are left out.
+    """
+    ids_by_title: dict[str, list[int]] = {}
+    for movie in movies:
+        if movie.get("title") and movie.get("id") is not None:
+            ids_by_title.setdefault(movie["title"], []).append(movie["id"])
+    titles = sorted(ids_by_title)
+    if not titles:
+        return {}
+
+    targets_by_title: dict[str, set[int]] = {}
+    try:
+        for idx in range(0, len(titles), MOVIE_FETCH_CHUNK_SIZE):
+            chunk = titles[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
+            for row in supabase_wrapper.iter_rows(
+                "movie_aliases",
+                "movie_title, movie_id",
+                filters=lambda query, chunk=chunk: (
+                    query.in_("movie_title", chunk).in_("method", list(TRUSTED_ALIAS_METHODS))
+                ),
+                order_by=("movie_title", "movie_id"),
+                page_size=MOVIE_FETCH_CHUNK_SIZE,
+            ):
+                targets_by_title.setdefault(row["movie_title"], set()).add(row["movie_id"])
+    except APIError as exc:
+        logger.warning("Skipping movie_aliases lookup (missing or failed): %s", exc)
+        return {}
+
+    target_ids = sorted({movie_id for ids in targets_by_title.values() for movie_id in ids})
+    linked: set[int] = set()
+    for idx in range(0, len(target_ids), MOVIE_FETCH_CHUNK_SIZE):
+        chunk = target_ids[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
+        resp = (
+            supabase.table("movies")
+            .select("id")
+            .in_("id", chunk)
+            .not_.is_("tmdb_id", "null")
+            .execute()
+        )
+        linked.update(row["id"] for row in resp.data or [])
 
-def _strip_parentheses_and_brackets(value: str) -> str:
-    # Keep year-only tags like "(1980)" as plain "1980", then drop all other (...) and [...].
-    cleaned = YEAR_PAREN_RE.sub(r" \1 ", value)
-    cleaned = ANY_PAREN_RE.sub(" ", cleaned)
-    cleaned = ANY_BRACKET_RE.sub(" ", cleaned)
-    return cleaned.strip()
+    targets: dict[int, int] = {}
+    for title, ids in targets_by_title.items():
+        linked_ids = ids & linked
+        if len(linked_ids) != 1:
+            continue
+        keep_movie_id = next(iter(linked_ids))
+        for movie_id in ids_by_title.get(title, []):
+            if movie_id != keep_movie_id:
+                targets[movie_id] = keep_movie_id
+    return targets
 
 
-def _clean_title_core(value: str, *, lower: bool = True) -> str:
-    cleaned = (value or "").strip()
-    if lower:
-        cleaned = cleaned.lower()
-    cleaned = _strip_plus_event_suffix(cleaned)
-    cleaned = TRAILING_EVENT_PAREN_RE.sub("", cleaned).strip()
-    cleaned = _strip_parentheses_and_brackets(cleaned)
-    cleaned = _trim_edition_suffix(cleaned)
-    cleaned = _trim_format_suffix(cleaned)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
-    return cleaned
+def merge_aliased_movies(movies: list[dict]) -> tuple[list[dict], list[int]]:
+    """
+    Fold rows whose crawled title resolves to an already-linked movie into that
+    movie instead of looking them up on TMDB again.
+    Returns (movies still needing a lookup, merged movie ids).
+    """
+    targets = fetch_alias_targets(movies)
+    remaining: list[dict] = []
+    merged: list[int] = []
+    for movie in movies:
+        keep_movie_id = targets.get(movie.get("id"))
+        if keep_movie_id is None:
+            remaining.append(movie)
+            continue
+        if merge_movie_rows(keep_movie_id, movie["id"]):
+            logger.info("Merged aliased movie id=%s into id=%s", movie["id"], keep_movie_id)
+            merged.append(movie["id"])
+    return remaining, merged
 
 
 def _build_title_candidates(title: str) -> list[str]:
@@ -216,7 +251,7 @@ def _build_title_candidates(title: str) -> list[str]:
     raw = title.strip()
     add(raw)
 
-    cleaned = _clean_title_core(raw, lower=False)
+    cleaned = clean_title_core(raw, lower=False)
     add(cleaned)
 
     # Keep left side only when '+' suffix is event metadata.
@@ -224,14 +259,14 @@ def _build_title_candidates(title: str) -> list[str]:
     plus_parts = re.split(r"\s*\+\s*", raw, maxsplit=1)
     if len(plus_parts) == 2:
         left_part, right_part = plus_parts[0].strip(), plus_parts[1].strip()
-        if _contains_event_keyword(right_part):
+        if contains_event_keyword(right_part):
             no_event_suffix = left_part
             add(left_part)
 
     no_event_suffix = TRAILING_EVENT_PAREN_RE.sub("", no_event_suffix).strip()
-    no_event_suffix = _strip_parentheses_and_brackets(no_event_suffix)
-    no_event_suffix = _trim_edition_suffix(no_event_suffix)
-    no_event_suffix = _trim_format_suffix(no_event_suffix)
+    no_event_suffix = strip_parentheses_and_brackets(no_event_suffix)
+    no_event_suffix = trim_edition_suffix(no_event_suffix)
+    no_event_suffix = trim_format_suffix(no_event_suffix)
     add(no_event_suffix)
 
     return candidates
@@ -283,16 +318,23 @@ def _preferred_languages_for(seed: str) -> tuple[str, str]:
     return SEARCH_LANGUAGES
 
 
-def _score_result(result: dict, query: str, original_title: str) -> int:
+def _release_year(result: dict) -> int | None:
+    release_date = result.get("release_date") or ""
+    if len(release_date) >= 4 and release_date[:4].isdigit():
+        return int(release_date[:4])
+    return None
+
+
+def _score_result(result: dict, query: str, original_title: str, year: int | None = None) -> int:
     poster_path = result.get("poster_path")
     if not poster_path:
         return -10_000
 
-    normalized_query = _normalize_for_match(query)
-    normalized_original = _normalize_for_match(original_title)
+    normalized_query = normalize_for_match(query)
+    normalized_original = normalize_for_match(original_title)
     normalized_result_titles = {
-        _normalize_for_match(result.get("title") or ""),
-        _normalize_for_match(result.get("original_title") or ""),
+        normalize_for_match(result.get("title") or ""),
+        normalize_for_match(result.get("original_title") or ""),
     }
     normalized_result_titles.discard("")
 
@@ -320,6 +362,17 @@ def _score_result(result: dict, query: str, original_title: str) -> int:
     if result.get("release_date"):
         score += 5
 
+    # Crawler-provided years (KOFA production year) are often one year off the release year.
+    release_year = _release_year(result)
+    if year and release_year:
+        year_gap = abs(release_year - year)
+        if year_gap == 0:
+            score += YEAR_MATCH_BONUS
+        elif year_gap == 1:
+            score += YEAR_MATCH_BONUS // 2
+        elif year_gap >= 3:
+            score -= YEAR_MISMATCH_PENALTY
+
     popularity = result.get("popularity")
     if isinstance(popularity, (int, float)):
         score += min(int(popularity), 20)
@@ -327,13 +380,18 @@ def _score_result(result: dict, query: str, original_title: str) -> int:
     return score
 
 
-def _find_best_result(results: list[dict], query: str, original_title: str) -> dict | None:
+def _find_best_result(
+    results: list[dict],
+    query: str,
+    original_title: str,
+    year: int | None = None,
+) -> dict | None:
     best: dict | None = None
     best_score = -10_000
-    normalized_query = _normalize_for_match(query)
+    normalized_query = normalize_for_match(query)
 
     for result in results:
-        score = _score_result(result, query, original_title)
+        score = _score_result(result, query, original_title, year)
         if score > best_score:
             best = result
             best_score = score
@@ -346,13 +404,20 @@ def _find_best_result(results: list[dict], query: str, original_title: str) -> d
     return best
 
 
-def _search_tmdb(client: httpx.Client, query: str, language: str) -> list[dict]:
+def _search_tmdb(
+    client: httpx.Client,
+    query: str,
+    language: str,
+    year: int | None = None,
+) -> list[dict]:
     params = {
         "query": query,
         "language": language,
         "include_adult": "false",
         "region": "KR",
     }
+    if year:
+        params["primary_release_year"] = year
     response = client.get(TMDB_SEARCH_URL, params=params)
     response.raise_for_status()
     data = response.json()
@@ -399,111 +464,257 @@ def _pick_final_candidate(candidates: list[dict]) -> dict | None:
     return best_overall
 
 
-def lookup_poster_for(seed_titles: list[tuple[str, str]], client: httpx.Client) -> dict | None:
+def load_title_index() -> TMDBTitleIndex | None:
+    """
+    Build the offline title index once per container when TMDB_INDEX_PATH is set.
+    """
+    global _title_index, _title_index_loaded
+    if _title_index_loaded:
+        return _title_index
+    _title_index_loaded = True
+    if not TMDB_INDEX_PATH:
+        return None
+    try:
+        _title_index = TMDBTitleIndex.from_export(
+            TMDB_INDEX_PATH,
+            min_popularity=TMDB_INDEX_MIN_POPULARITY,
+        )
+        logger.info("Loaded offline TMDB title index: %s titles from %s", len(_title_index), TMDB_INDEX_PATH)
+    except Exception as exc:
+        logger.warning("Offline TMDB index unavailable (%s); using live search only", exc)
+        _title_index = None
+    return _title_index
+
+
+def _fetch_tmdb_details(client: httpx.Client, tmdb_id: int, language: str) -> dict | None:
+    cache_key = (tmdb_id, language)
+    if cache_key in _details_cache:
+        return _details_cache[cache_key]
+    try:
+        response = client.get(TMDB_MOVIE_URL.format(tmdb_id=tmdb_id), params={"language": language})
+        response.raise_for_status()
+        details = response.json()
+    except Exception as exc:
+        logger.error("TMDB details request failed for tmdb_id=%s lang=%s error=%s", tmdb_id, language, exc)
+        details = None
+    _details_cache[cache_key] = details
+    return details
+
+
+def _lookup_offline(
+    client: httpx.Client,
+    index: TMDBTitleIndex,
+    query: str,
+    seed: str,
+    language: str,
+    year: int | None = None,
+) -> dict | None:
+    """
+    Shortlist ids from the offline index and confirm them with TMDB details calls.
+    Details payloads have the same title/poster/popularity fields as search results.
+    """
+    results = []
+    for hit in index.lookup(query):
+        details = _fetch_tmdb_details(client, hit["id"], language)
+        if details:
+            results.append(details)
+    if not results:
+        return None
+    return _find_best_result(results, query=query, original_title=seed, year=year)
+
+
+def _build_candidate(
+    best: dict,
+    query: str,
+    seed: str,
+    seed_type: str,
+    language: str,
+    year: int | None = None,
+) -> dict | None:
+    poster_path = best.get("poster_path")
+    if not poster_path:
+        return None
+
+    tmdb_id = best.get("id")
+    if not tmdb_id:
+        return None
+
+    score = _score_result(best, query=query, original_title=seed, year=year)
+    return {
+        "tmdb_id": tmdb_id,
+        "poster_url": TMDB_IMAGE_BASE + poster_path,
+        "matched_seed_title": seed,
+        "seed_type": seed_type,
+        "matched_query": query,
+        "matched_tmdb_title": best.get("title") or best.get("original_title") or "",
+        "original_title": best.get("original_title") or None,
+        "release_date": best.get("release_date") or None,
+        "tmdb_language": best.get("original_language") or language,
+        "tmdb_match_score": float(score),
+    }
+
+
+def _safe_search(
+    client: httpx.Client,
+    seed: str,
+    query: str,
+    language: str,
+    year: int | None = None,
+) -> list[dict] | None:
+    try:
+        return _search_tmdb(client, query=query, language=language, year=year)
+    except httpx.HTTPStatusError as exc:
+        logger.error(
+            "TMDB HTTP error for seed='%s' query='%s' lang=%s year=%s status=%s",
+            seed,
+            query,
+            language,
+            year,
+            exc.response.status_code if exc.response else "unknown",
+        )
+    except Exception as exc:
+        logger.error(
+            "TMDB request failed for seed='%s' query='%s' lang=%s year=%s error=%s",
+            seed,
+            query,
+            language,
+            year,
+            exc,
+        )
+    return None
+
+
+def _director_key(value: str | None) -> str:
+    return re.sub(r"[^0-9a-z가-힣]", "", (value or "").casefold())
+
+
+def _fetch_tmdb_directors(client: httpx.Client, tmdb_id: int) -> set[str]:
+    if tmdb_id in _directors_cache:
+        return _directors_cache[tmdb_id]
+    directors: set[str] = set()
+    try:
+        response = client.get(TMDB_CREDITS_URL.format(tmdb_id=tmdb_id))
+        response.raise_for_status()
+        for member in response.json().get("crew") or []:
+            if member.get("job") == "Director":
+                directors.add(_director_key(member.get("name")))
+                directors.add(_director_key(member.get("original_name")))
+    except Exception as exc:
+        logger.error("TMDB credits request failed for tmdb_id=%s error=%s", tmdb_id, exc)
+    directors.discard("")
+    _directors_cache[tmdb_id] = directors
+    return directors
+
+
+def _break_tie_by_director(client: httpx.Client, candidates: list[dict], director: str | None) -> None:
+    """
+    When the top candidates point at different TMDB ids with near-equal scores,
+    boost the ones whose TMDB director matches the crawler-provided director.
+    Only the tied ids are checked, so this costs at most a few credits calls.
+    """
+    director_key = _director_key(director)
+    if not director_key or not candidates:
+        return
+    top_score = max(candidate["tmdb_match_score"] for candidate in candidates)
+    tied_ids = []
+    for candidate in sorted(candidates, key=lambda c: c["tmdb_match_score"], reverse=True):
+        if top_score - candidate["tmdb_match_score"] > DIRECTOR_TIE_MARGIN:
+            break
+        if candidate["tmdb_id"] not in tied_ids:
+            tied_ids.append(candidate["tmdb_id"])
+    if len(tied_ids) < 2:
+        return
+
+    matched_ids = set()
+    for tmdb_id in tied_ids[:DIRECTOR_TIE_MAX_LOOKUPS]:
+        directors = _fetch_tmdb_directors(client, tmdb_id)
+        if any(director_key in name or name in director_key for name in directors):
+            matched_ids.add(tmdb_id)
+    for candidate in candidates:
+        if candidate["tmdb_id"] in matched_ids:
+            candidate["tmdb_match_score"] += DIRECTOR_MATCH_BONUS
+            candidate["director_match"] = True
+
+
+def lookup_poster_for(
+    seed_titles: list[tuple[str, str]],
+    client: httpx.Client,
+    index: TMDBTitleIndex | None = None,
+    year: int | None = None,
+    director: str | None = None,
+) -> dict | None:
     """
     Try multiple normalized query variants and languages.
+    With an offline `index`, a query confirmed from the index skips live search;
+    live search only runs when the index has no confirmed hit.
+    With a known `year`, each query is first searched narrowed to that release year
+    and only widened when the narrowed search has no acceptable match.
+    `director` breaks ties between near-equal candidates.
     Returns TMDB match payload when matched.
     """
     attempted: set[tuple[str, str]] = set()
     candidates: list[dict] = []
     for seed, seed_type in seed_titles:
         for query in _build_title_candidates(seed):
-            for language in _preferred_languages_for(seed):
+            languages = _preferred_languages_for(seed)
+            if index is not None:
+                best = _lookup_offline(client, index, query, seed, languages[0], year)
+                candidate = _build_candidate(best, query, seed, seed_type, languages[0], year) if best else None
+                if candidate:
+                    candidate["match_source"] = "offline_index"
+                    candidates.append(candidate)
+                    continue
+
+            for language in languages:
                 attempt_key = (query.casefold(), language)
                 if attempt_key in attempted:
                     continue
                 attempted.add(attempt_key)
 
-                try:
-                    results = _search_tmdb(client, query=query, language=language)
-                except httpx.HTTPStatusError as exc:
-                    logger.error(
-                        "TMDB HTTP error for seed='%s' query='%s' lang=%s status=%s",
-                        seed,
-                        query,
-                        language,
-                        exc.response.status_code if exc.response else "unknown",
-                    )
-                    continue
-                except Exception as exc:
-                    logger.error(
-                        "TMDB request failed for seed='%s' query='%s' lang=%s error=%s",
-                        seed,
-                        query,
-                        language,
-                        exc,
-                    )
-                    continue
-
-                best = _find_best_result(results, query=query, original_title=seed)
+                best = None
+                if year:
+                    results = _safe_search(client, seed, query, language, year)
+                    best = _find_best_result(results or [], query=query, original_title=seed, year=year)
+                if not best:
+                    results = _safe_search(client, seed, query, language)
+                    if results is None:
+                        continue
+                    best = _find_best_result(results, query=query, original_title=seed, year=year)
                 if not best:
                     continue
 
-                poster_path = best.get("poster_path")
-                if not poster_path:
-                    continue
-
-                tmdb_id = best.get("id")
-                if not tmdb_id:
-                    continue
-
-                score = _score_result(best, query=query, original_title=seed)
-                candidates.append(
-                    {
-                    "tmdb_id": tmdb_id,
-                    "poster_url": TMDB_IMAGE_BASE + poster_path,
-                    "matched_seed_title": seed,
-                    "seed_type": seed_type,
-                    "matched_query": query,
-                    "matched_tmdb_title": best.get("title") or best.get("original_title") or "",
-                    "original_title": best.get("original_title") or None,
-                    "release_date": best.get("release_date") or None,
-                    "tmdb_language": best.get("original_language") or language,
-                    "tmdb_match_score": float(score),
-                    }
-                )
+                candidate = _build_candidate(best, query, seed, seed_type, language, year)
+                if candidate:
+                    candidates.append(candidate)
 
+    _break_tie_by_director(client, candidates, director)
     return _pick_final_candidate(candidates)
 
 
-def update_movie_poster(movie_id: int, match: dict) -> bool:
+def fetch_tmdb_owners(tmdb_ids: list[int]) -> dict[int, int]:
     """
-    Update TMDB enrichment fields for a given movie ID.
+    Map each already-linked tmdb_id in `tmdb_ids` to the movie row that owns it.
+    One `in_()` query per chunk replaces the per-movie ownership lookups.
     """
-    tmdb_id = match.get("tmdb_id")
-    if tmdb_id is None:
-        return False
-
-    # Guard: tmdb_id is unique on movies; skip instead of crashing if another row already owns it.
-    existing = (
-        supabase.table("movies")
-        .select("id")
-        .eq("tmdb_id", tmdb_id)
-        .limit(1)
-        .execute()
-    )
-    existing_rows = existing.data or []
-    if existing_rows and existing_rows[0].get("id") != movie_id:
-        existing_movie_id = existing_rows[0].get("id")
-        merged = merge_movie_rows(existing_movie_id, movie_id)
-        if merged:
-            logger.info(
-                "Merged duplicate movie id=%s into id=%s via tmdb_id=%s",
-                movie_id,
-                existing_movie_id,
-                tmdb_id,
-            )
-            return False
-        logger.warning(
-            "Skipping movie id=%s: tmdb_id=%s already linked to movie id=%s",
-            movie_id,
-            tmdb_id,
-            existing_movie_id,
+    unique_ids = sorted({tmdb_id for tmdb_id in tmdb_ids if tmdb_id is not None})
+    owners: dict[int, int] = {}
+    for idx in range(0, len(unique_ids), MOVIE_FETCH_CHUNK_SIZE):
+        chunk = unique_ids[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
+        resp = (
+            supabase.table("movies")
+            .select("id, tmdb_id")
+            .in_("tmdb_id", chunk)
+            .execute()
         )
-        return False
+        for row in resp.data or []:
+            if row.get("tmdb_id") is not None:
+                owners[row["tmdb_id"]] = row.get("id")
+    return owners
 
+
+def _build_update_payload(match: dict) -> dict:
     payload = {
-        "tmdb_id": tmdb_id,
+        "tmdb_id": match.get("tmdb_id"),
         "poster_url": match.get("poster_url"),
         "original_title": match.get("original_title"),
         "release_date": match.get("release_date"),
@@ -511,10 +722,48 @@ def update_movie_poster(movie_id: int, match: dict) -> bool:
         "tmdb_match_score": match.get("tmdb_match_score"),
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
-    payload = {k: v for k, v in payload.items() if v is not None}
+    return {k: v for k, v in payload.items() if v is not None}
+
+
+def _is_tmdb_conflict(exc: Exception) -> bool:
+    message = str(exc)
+    return "movies_tmdb_id_uidx" in message or "duplicate key value" in message
+
 
+def plan_movie_updates(
+    matches: list[tuple[int, dict]],
+    owners: dict[int, int],
+) -> tuple[list[tuple[int, dict]], list[tuple[int, int]]]:
+    """
+    Resolve tmdb_id ownership in memory.
+    Returns (updates, merges) where merges are (keep_movie_id, drop_movie_id) pairs.
+    A tmdb_id claimed earlier in the same run is treated like an existing owner.
+    """
+    claimed = dict(owners)
+    updates: list[tuple[int, dict]] = []
+    merges: list[tuple[int, int]] = []
+    for movie_id, match in matches:
+        tmdb_id = match.get("tmdb_id")
+        if tmdb_id is None:
+            continue
+        owner_id = claimed.get(tmdb_id)
+        if owner_id is not None and owner_id != movie_id:
+            merges.append((owner_id, movie_id))
+            continue
+        claimed[tmdb_id] = movie_id
+        updates.append((movie_id, _build_update_payload(match)))
+    return updates, merges
+
+
+def _is_missing_rpc(exc: Exception) -> bool:
+    # PostgREST answers PGRST202 when no function with that name and signature is deployed.
+    return isinstance(exc, APIError) and (exc.code == "PGRST202" or "Could not find the function" in str(exc))
+
+
+def _update_movie_row(movie_id: int, payload: dict) -> bool:
+    """Guarded single-row update; False when the row is locked, already linked or conflicting."""
     try:
-        (
+        resp = (
             supabase.table("movies")
             .update(payload)
             .eq("id", movie_id)
@@ -522,24 +771,101 @@ def update_movie_poster(movie_id: int, match: dict) -> bool:
             .or_("tmdb_locked.is.null,tmdb_locked.eq.false")
             .execute()
         )
-        return True
+        return bool(resp.data)
     except APIError as exc:
-        if str(exc).find("movies_tmdb_id_uidx") >= 0 or str(exc).find("duplicate key value") >= 0:
+        if _is_tmdb_conflict(exc):
             logger.warning(
                 "Skipping movie id=%s due tmdb_id conflict (tmdb_id=%s): %s",
                 movie_id,
-                tmdb_id,
+                payload.get("tmdb_id"),
                 exc,
             )
             return False
         raise
 
 
+def apply_tmdb_updates(updates: list[tuple[int, dict]]) -> set[int]:
+    """
+    Write TMDB payloads in chunks through the `apply_tmdb_matches` RPC.
+    The RPC applies the same guards as the single-row update (tmdb_id still null,
+    tmdb_locked not set, unique-index conflicts skipped) and returns updated ids.
+    Falls back to guarded per-row updates when the RPC is not deployed.
+    """
+    updated: set[int] = set()
+    use_rpc = True
+    for idx in range(0, len(updates), MOVIE_FETCH_CHUNK_SIZE):
+        chunk = updates[idx: idx + MOVIE_FETCH_CHUNK_SIZE]
+        if use_rpc:
+            try:
+                resp = supabase.rpc(
+                    "apply_tmdb_matches",
+                    {"matches": [{"id": movie_id, **payload} for movie_id, payload in chunk]},
+                ).execute()
+            except APIError as exc:
+                if not _is_missing_rpc(exc):
+                    raise
+                logger.warning("apply_tmdb_matches RPC not deployed, falling back to per-row updates: %s", exc)
+                use_rpc = False
+        if not use_rpc:
+            for movie_id, payload in chunk:
+                if _update_movie_row(movie_id, payload):
+                    updated.add(movie_id)
+            continue
+        for row in resp.data or []:
+            updated.add(row.get("id") if isinstance(row, dict) else row)
+    return updated
+
+
+def apply_movie_matches(matches: list[tuple[int, dict]]) -> dict[str, list[int]]:
+    """
+    Write TMDB matches back to `movies` with a handful of round-trips:
+    one ownership prefetch per chunk, one batched write per chunk, and one
+    `merge_movie_rows` RPC per duplicate.
+    """
+    owners = fetch_tmdb_owners([match.get("tmdb_id") for _, match in matches])
+    updates, merges = plan_movie_updates(matches, owners)
+    updated = apply_tmdb_updates(updates)
+    existing_owner_ids = set(owners.values())
+
+    merged: list[int] = []
+    for keep_movie_id, drop_movie_id in merges:
+        if keep_movie_id not in existing_owner_ids and keep_movie_id not in updated:
+            # The in-run owner was not written (locked or conflicting), so there is nothing to merge into.
+            logger.warning(
+                "Skipping movie id=%s: tmdb_id owner id=%s was not updated in this run",
+                drop_movie_id,
+                keep_movie_id,
+            )
+            continue
+        if merge_movie_rows(keep_movie_id, drop_movie_id):
+            logger.info("Merged duplicate movie id=%s into id=%s", drop_movie_id, keep_movie_id)
+            merged.append(drop_movie_id)
+        else:
+            logger.warning(
+                "Skipping movie id=%s: tmdb_id already linked to movie id=%s",
+                drop_movie_id,
+                keep_movie_id,
+            )
+
+    return {"updated": sorted(updated), "merged": merged}
+
+
+def update_movie_poster(movie_id: int, match: dict) -> bool:
+    """
+    Update TMDB enrichment fields for a given movie ID.
+    """
+    if match.get("tmdb_id") is None:
+        return False
+    result = apply_movie_matches([(movie_id, match)])
+    return movie_id in result["updated"]
+
+
 def lambda_handler(event, context):
     """
-    1) Fetch movies missing TMDB identity
+    1) Fetch movies missing TMDB identity (all upcoming, or only the crawler's delta)
+       and merge the ones the crawler already resolved to a linked movie
     2) Resolve TMDB match for each movie title
-    3) Write TMDB metadata + poster URL back to Supabase
+    3) Write TMDB metadata + poster URL back to Supabase in batches
     """
     logger.info("=== TMDB Poster Updater: Starting run")
     if not TMDB_API_KEY:
@@ -551,19 +877,47 @@ def lambda_handler(event, context):
     if reconciled:
         logger.info("Reconciliation merged %s duplicate movie row(s) before TMDB run", reconciled)
 
+    # "delta" runs only look at titles the crawler published as new; default is a full rescan.
+    delta_mode = (event or {}).get("mode") == "delta"
+    delta_entries: list[dict] = []
     try:
-        movies = fetch_movies_needing_posters()
+        if delta_mode:
+            delta_entries = enrichment_queue.drain()
+            movies = fetch_movies_for_titles([entry["movie_title"] for entry in delta_entries])
+            logger.info("Delta run: %s new title(s) from the crawler", len(delta_entries))
+        else:
+            movies = fetch_movies_needing_posters()
+        fetched = movies
+        movies, aliased = merge_aliased_movies(movies)
     except Exception as e:
         logger.error(f"Aborting run: {e}")
         return {"status": "error", "message": str(e)}
+    if aliased:
+        logger.info("Merged %s movie row(s) resolved to linked movies by the crawler", len(aliased))
 
     logger.info(f"Found {len(movies)} movie(s) needing TMDB enrichment")
     processed = 0
+    updated = 0
+    merged = len(aliased)
+    # Titles whose movie rows were looked up (or merged); only their delta entries are acked.
+    done_titles = {movie.get("title") for movie in fetched if movie.get("id") in aliased}
+    # Written every MOVIE_FETCH_CHUNK_SIZE matches, so a timeout keeps the lookups already flushed.
+    matches: list[tuple[int, dict]] = []
+
+    def flush_matches():
+        nonlocal updated, merged
+        if not matches:
+            return
+        written = apply_movie_matches(matches)
+        updated += len(written["updated"])
+        merged += len(written["merged"])
+        matches.clear()
 
     headers = {
         "accept": "application/json",
         "Authorization": f"Bearer {TMDB_API_KEY}",
     }
+    title_index = load_title_index()
     with httpx.Client(timeout=10.0, headers=headers) as client:
         for movie in movies:
             movie_id = movie.get("id")
@@ -571,21 +925,29 @@ def lambda_handler(event, context):
                 seed_titles = _build_seed_titles(movie)
                 if not seed_titles:
                     logger.warning("Skipping id=%s because all candidate titles are empty", movie_id)
+                    done_titles.add(movie.get("title"))
                     continue
 
-                lookup_result = lookup_poster_for(seed_titles, client)
+                lookup_result = lookup_poster_for(
+                    seed_titles,
+                    client,
+                    title_index,
+                    year=movie.get("source_year"),
+                    director=movie.get("source_director"),
+                )
                 if not lookup_result:
                     logger.info(
                         "No poster found for id=%s seeds=%s",
                         movie_id,
                         [seed for seed, _ in seed_titles[:3]],
                     )
+                    done_titles.add(movie.get("title"))
                     continue
 
-                update_movie_poster(movie_id, lookup_result)
+                matches.append((movie_id, lookup_result))
 
                 logger.info(
-                    "Updated movie id=%s seed='%s'(%s) tmdb_id=%s matched_query='%s' tmdb_title='%s' reason=%s score=%.1f",
+                    "Matched movie id=%s seed='%s'(%s) tmdb_id=%s matched_query='%s' tmdb_title='%s' reason=%s score=%.1f",
                     movie_id,
                     lookup_result.get("matched_seed_title"),
                     lookup_result.get("seed_type"),
@@ -596,8 +958,40 @@ def lambda_handler(event, context):
                     lookup_result.get("tmdb_match_score", 0.0),
                 )
                 processed += 1
+                done_titles.add(movie.get("title"))
             except Exception as e:
                 logger.error("Unexpected error processing movie id=%s: %s", movie_id, e)
 
-    logger.info(f"=== Completed run; processed {processed}/{len(movies)}")
-    return {"status": "success", "processed": processed}
+            if len(matches) >= MOVIE_FETCH_CHUNK_SIZE:
+                try:
+                    flush_matches()
+                except Exception as e:
+                    logger.error("Failed to write TMDB matches: %s", e)
+                    return {"status": "error", "message": str(e), "processed": processed, "updated": updated}
+
+    try:
+        flush_matches()
+    except Exception as e:
+        logger.error("Failed to write TMDB matches: %s", e)
+        return {"status": "error", "message": str(e), "processed": processed, "updated": updated}
+
+    if delta_entries:
+        # Entries without a movies row yet (or whose lookup failed) stay pending for the next delta run.
+        acked = [entry for entry in delta_entries if entry["movie_title"] in done_titles]
+        enrichment_queue.ack(acked)
+        if len(acked) < len(delta_entries):
+            logger.info("Left %s delta title(s) pending", len(delta_entries) - len(acked))
+
+    logger.info(
+        "=== Completed run; processed %s/%s updated=%s merged=%s",
+        processed,
+        len(movies),
+        updated,
+        merged,
+    )
+    return {
+        "status": "success",
+        "processed": processed,
+        "updated": updated,
+        "merged": merged,
+    }
@@ -0,0 +1,60 @@
+"""
+Pre-flight health probes: one cheap request per chain before the crawl.
+
+CGV only notices a block page after fetching a proxy, launching Chromium and
+loading the booking SPA; KOFA only notices an expired service key when the
+real query fails. `probe_chains` runs every chain's `BaseCrawler.probe`
+concurrently on one shared client so the handler can defer unusable chains
+up front. Each result keeps its latency.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Mapping, Optional, Type
+
+import httpx
+
+from crawlers.base import BaseCrawler
+
+PROBE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "ko-KR,ko;q=0.9",
+}
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    chain: str
+    # Why the chain looks unusable; None when healthy.
+    error: Optional[str]
+    latency_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def probe_chain(crawler_class: Type[BaseCrawler], client: httpx.AsyncClient, timeout: float) -> ProbeResult:
+    started = time.perf_counter()
+    try:
+        error = await asyncio.wait_for(crawler_class.probe(client), timeout)
+    except asyncio.TimeoutError:
+        error = f"probe timed out after {timeout:g}s"
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+    return ProbeResult(crawler_class.chain, error, round((time.perf_counter() - started) * 1000, 1))
+
+
+async def probe_chains(
+    crawler_classes: Mapping[str, Type[BaseCrawler]], timeout: float = 10.0
+) -> dict[str, ProbeResult]:
+    """Probe every chain concurrently; chain -> result."""
+    async with httpx.AsyncClient(timeout=timeout, headers=PROBE_HEADERS, follow_redirects=True) as client:
+        results = await asyncio.gather(
+            *(probe_chain(crawler_class, client, timeout) for crawler_class in crawler_classes.values())
+        )
+    return dict(zip(crawler_classes, results))
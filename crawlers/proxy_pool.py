@@ -0,0 +1,206 @@
+"""
+Proxy pool for the browser crawlers (CGV).
+
+The proxy list is cached per process for `PROXY_LIST_TTL` seconds instead of
+being downloaded on every run, and each proxy keeps a health record: successes,
+failures, access blocks and a moving average of its per-theater latency.
+`acquire` hands out the best-scoring proxy that is not already in use, so
+parallel browser contexts get different exits, and proxies that were blocked
+sit out `PROXY_BLOCK_COOLDOWN` seconds before being tried again.
+
+Sources:
+- `CGV_PROXY_LIST`: path to a local JSON list (Playwright `{"server", "username",
+  "password"}` entries or Webshare list entries), e.g. a fake list for tests
+- `WEBSHARE_API_KEY`: the Webshare proxy list API
+"""
+import abc
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+# Seconds before the shared pool downloads its proxy list again.
+PROXY_LIST_TTL = float(os.getenv("PROXY_LIST_TTL", "900"))
+# Seconds a blocked proxy is kept out of rotation.
+PROXY_BLOCK_COOLDOWN = float(os.getenv("PROXY_BLOCK_COOLDOWN", "1800"))
+# Weight of the newest latency sample in the moving average.
+LATENCY_SMOOTHING = 0.3
+
+
+def proxy_id(proxy: dict) -> str:
+    return f"{proxy.get('username') or ''}@{proxy['server']}"
+
+
+def _playwright_proxy(entry: dict) -> dict:
+    """Webshare list entries and Playwright proxy dicts, as Playwright proxy dicts."""
+    if "server" in entry:
+        return {key: entry[key] for key in ("server", "username", "password") if entry.get(key)}
+    return {
+        "server": f"http://{entry['proxy_address']}:{entry['port']}",
+        "username": entry["username"],
+        "password": entry["password"],
+    }
+
+
+class ProxySource(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    async def fetch(self) -> list[dict]:
+        """Current proxies as Playwright proxy dicts."""
+
+
+class FileProxySource(ProxySource):
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    async def fetch(self) -> list[dict]:
+        entries = json.loads(self.path.read_text(encoding="utf-8"))
+        if isinstance(entries, dict):
+            entries = entries.get("results", [])
+        return [_playwright_proxy(entry) for entry in entries if entry.get("valid", True)]
+
+
+class WebshareProxySource(ProxySource):
+    name = "webshare"
+    url = "https://proxy.webshare.io/api/v2/proxy/list/"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    async def fetch(self) -> list[dict]:
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(
+                self.url,
+                params={"mode": "direct", "page_size": 100},
+                headers={"Authorization": f"Token {self.api_key}"},
+            )
+            resp.raise_for_status()
+        return [_playwright_proxy(p) for p in resp.json()["results"] if p.get("valid")]
+
+
+class ProxyPool:
+    _shared: dict[str, "ProxyPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        source: ProxySource,
+        ttl: float = PROXY_LIST_TTL,
+        block_cooldown: float = PROXY_BLOCK_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.ttl = ttl
+        self.block_cooldown = block_cooldown
+        self.clock = clock
+        self._proxies: list[dict] = []
+        self._fetched_at: Optional[float] = None
+        self._health: dict[str, dict[str, Any]] = {}
+        self._in_use: set[str] = set()
+
+    @classmethod
+    def from_env(cls) -> Optional["ProxyPool"]:
+        """Process-wide pool for the configured source, or None without one."""
+        list_path = os.getenv("CGV_PROXY_LIST")
+        api_key = os.getenv("WEBSHARE_API_KEY")
+        if list_path:
+            key, make = f"file:{list_path}", lambda: FileProxySource(list_path)
+        elif api_key:
+            key, make = f"webshare:{api_key[-6:]}", lambda: WebshareProxySource(api_key)
+        else:
+            return None
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(make())
+            return cls._shared[key]
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._shared_lock:
+            cls._shared = {}
+
+    async def proxies(self) -> list[dict]:
+        """The cached list, re-fetched after `ttl`; a failed re-fetch keeps the stale list."""
+        now = self.clock()
+        if self._fetched_at is None or now - self._fetched_at >= self.ttl:
+            try:
+                self._proxies = await self.source.fetch()
+                ids = {proxy_id(p) for p in self._proxies}
+                self._health = {pid: h for pid, h in self._health.items() if pid in ids}
+            except Exception as e:
+                print(f"⚠ Could not fetch {self.source.name} proxy list: {e}")
+                if self._fetched_at is None:
+                    self._proxies = []
+            self._fetched_at = now
+        return self._proxies
+
+    def _record(self, proxy: dict) -> dict[str, Any]:
+        return self._health.setdefault(
+            proxy_id(proxy), {"successes": 0, "failures": 0, "blocks": 0, "latency": None, "blocked_at": None}
+        )
+
+    def score(self, proxy: dict) -> float:
+        """Smoothed success rate, blocks counted three times, discounted by latency."""
+        record = self._health.get(proxy_id(proxy))
+        if record is None:
+            return 0.5
+        good = record["successes"] + 1
+        bad = record["failures"] + 3 * record["blocks"] + 1
+        latency = record["latency"] or 0.0
+        return good / (good + bad) / (1 + latency / 60)
+
+    def cooling_down(self, proxy: dict) -> bool:
+        record = self._health.get(proxy_id(proxy))
+        return bool(
+            record and record["blocked_at"] is not None and self.clock() - record["blocked_at"] < self.block_cooldown
+        )
+
+    async def acquire(self) -> Optional[dict]:
+        """Best healthy proxy not held by another context, or None when none is left."""
+        candidates = [
+            p for p in await self.proxies() if proxy_id(p) not in self._in_use and not self.cooling_down(p)
+        ]
+        if not candidates:
+            return None
+        random.shuffle(candidates)  # spread load across proxies with equal scores
+        best = max(candidates, key=self.score)
+        self._in_use.add(proxy_id(best))
+        return best
+
+    def release(self, proxy: Optional[dict]) -> None:
+        if proxy is not None:
+            self._in_use.discard(proxy_id(proxy))
+
+    def report_success(self, proxy: dict, latency: float) -> None:
+        record = self._record(proxy)
+        record["successes"] += 1
+        previous = record["latency"]
+        record["latency"] = latency if previous is None else previous + LATENCY_SMOOTHING * (latency - previous)
+
+    def report_failure(self, proxy: dict) -> None:
+        self._record(proxy)["failures"] += 1
+
+    def report_block(self, proxy: dict) -> None:
+        record = self._record(proxy)
+        record["blocks"] += 1
+        record["blocked_at"] = self.clock()
+
+    def health(self) -> dict[str, dict[str, Any]]:
+        """proxy id -> counts, latency and score, for logs."""
+        return {
+            proxy_id(p): {
+                **{k: v for k, v in self._record(p).items() if k != "blocked_at"},
+                "score": round(self.score(p), 3),
+                "cooling_down": self.cooling_down(p),
+            }
+            for p in self._proxies
+            if proxy_id(p) in self._health
+        }
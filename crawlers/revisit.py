@@ -0,0 +1,194 @@
+"""
+Change-rate-driven revisit scheduling per theater.
+
+Every crawled (chain, cinema_code) keeps a small record in a StateStore:
+a fingerprint per play date of its schedule (screen, start time, movie; seat
+counts are ignored), decayed counts of visits and of visits that saw a change,
+and the decayed time between visits. The change rate is estimated from those
+binary observations as
+
+    rate = -ln((visits - changes + 0.5) / (visits + 0.5)) / mean_interval
+
+(the usual estimator for "changed since the last look" samples, which does not
+undercount theaters that changed several times between two visits).
+
+`plan` spends a per-invocation request budget on the theaters where a revisit
+gains the most freshness per request (see `revisit_gain`); theaters unlikely
+to have changed at all since their last visit are skipped. Theaters that
+would exceed `max_staleness_hours` before the next invocation are always
+included, even past the budget, so the staleness bound holds.
+"""
+import datetime as dt
+import hashlib
+import math
+from typing import Any, Iterable, Optional
+
+from crawlers.state_store import StateStore
+from crawlers.sinks import screening_rows
+from models import Cinema, Screening, ScreeningBatch
+
+# Changes per hour assumed for a theater seen once but never compared.
+DEFAULT_CHANGE_RATE = 1 / 12
+# Weight kept by older observations on each new visit (~10 visits of memory).
+OBSERVATION_DECAY = 0.9
+
+
+def theater_key(chain: str, cinema_code: str) -> str:
+    return f"{chain}:{cinema_code}"
+
+
+def schedule_fingerprints(
+    batches: "Iterable[Iterable[Screening] | ScreeningBatch]",
+) -> dict[str, dict[str, str]]:
+    """cinema_code -> play_date -> hash of the sorted (screen, start, movie) rows."""
+    slots: dict[str, dict[str, list[str]]] = {}
+    for data in batches:
+        for row in screening_rows(data):
+            dates = slots.setdefault(row["cinema_code"], {})
+            dates.setdefault(row["play_date"], []).append(
+                f"{row['screen_name']}\x1f{row['start_dt']}\x1f{row['movie_title']}"
+            )
+    return {
+        code: {
+            play_date: hashlib.blake2b("\n".join(sorted(rows)).encode("utf-8"), digest_size=6).hexdigest()
+            for play_date, rows in dates.items()
+        }
+        for code, dates in slots.items()
+    }
+
+
+def revisit_gain(rate: float, hours: float) -> float:
+    """
+    Freshness gained by revisiting now, a theater changing `rate` times an hour
+    last visited `hours` ago: (1 - (1 + rate*hours) * exp(-rate*hours)) / rate.
+    Unlike the plain change probability it does not keep spending on theaters
+    that change faster than any affordable revisit interval.
+    """
+    if rate <= 0:
+        return 0.0
+    x = rate * hours
+    return (1 - (1 + x) * math.exp(-x)) / rate
+
+
+class RevisitScheduler:
+    def __init__(
+        self,
+        state: StateStore,
+        budget: int,
+        max_staleness_hours: float = 24,
+        min_change_probability: float = 0.05,
+    ):
+        self.state = state
+        self.budget = budget
+        self.max_staleness = dt.timedelta(hours=max_staleness_hours)
+        self.min_change_probability = min_change_probability
+        stored = state.load()
+        self._last_run: Optional[str] = stored.get("last_run")
+        self._theaters: dict[str, dict[str, Any]] = dict(stored.get("theaters", {}))
+        self.summary: dict[str, int] = {}
+
+    def change_rate(self, chain: str, cinema_code: str) -> float:
+        """Estimated schedule changes per hour."""
+        record = self._theaters.get(theater_key(chain, cinema_code))
+        if not record or record.get("visits", 0) < 0.5:
+            return DEFAULT_CHANGE_RATE
+        visits, changes, hours = record["visits"], record["changes"], record["hours"]
+        if hours <= 0:
+            return DEFAULT_CHANGE_RATE
+        unchanged = (visits - changes + 0.5) / (visits + 0.5)
+        return -math.log(unchanged) / (hours / visits)
+
+    def plan(
+        self, units: dict[str, tuple[list[Cinema], int]], now: Optional[dt.datetime] = None
+    ) -> dict[str, list[Cinema]]:
+        """
+        `units` maps chain -> (theaters, requests per theater). Returns the
+        theaters to crawl per chain in this invocation.
+        """
+        now = now or dt.datetime.utcnow()
+        # Time until the next invocation, assumed equal to the last gap.
+        gap = now - dt.datetime.fromisoformat(self._last_run) if self._last_run else dt.timedelta(0)
+
+        mandatory: list[tuple[dt.timedelta, str, Cinema, int]] = []
+        optional: list[tuple[float, float, str, Cinema, int]] = []
+        for chain, (theaters, cost) in units.items():
+            for theater in theaters:
+                record = self._theaters.get(theater_key(chain, theater.cinema_code))
+                if not record or not record.get("last_crawled"):
+                    mandatory.append((dt.timedelta.max, chain, theater, cost))
+                    continue
+                age = now - dt.datetime.fromisoformat(record["last_crawled"])
+                if age + gap >= self.max_staleness:
+                    mandatory.append((age, chain, theater, cost))
+                    continue
+                rate = self.change_rate(chain, theater.cinema_code)
+                hours = age.total_seconds() / 3600
+                probability = 1 - math.exp(-rate * hours)
+                optional.append((revisit_gain(rate, hours) / max(cost, 1), probability, chain, theater, cost))
+
+        selected: dict[str, list[Cinema]] = {chain: [] for chain in units}
+        spent = 0
+        for _, chain, theater, cost in sorted(mandatory, key=lambda entry: entry[0], reverse=True):
+            selected[chain].append(theater)
+            spent += cost
+        chosen = 0
+        for _, probability, chain, theater, cost in sorted(optional, key=lambda entry: entry[0], reverse=True):
+            if probability < self.min_change_probability or spent + cost > self.budget:
+                continue
+            selected[chain].append(theater)
+            spent += cost
+            chosen += 1
+
+        self.summary = {
+            "theaters": sum(len(theaters) for theaters, _ in units.values()),
+            "mandatory": len(mandatory),
+            "by_change_rate": chosen,
+            "requests": spent,
+            "budget": self.budget,
+        }
+        return selected
+
+    def observe(
+        self,
+        chain: str,
+        theaters: list[Cinema],
+        play_dates: Iterable[str],
+        batches: "Iterable[Iterable[Screening] | ScreeningBatch]",
+        now: Optional[dt.datetime] = None,
+        today: Optional[dt.date] = None,
+    ) -> int:
+        """
+        Record one chain's successful crawl of `theaters` over `play_dates`
+        (all segments of the run at once). Returns how many of them changed
+        since their previous visit.
+        """
+        now = now or dt.datetime.utcnow()
+        today_iso = (today or dt.date.today()).isoformat()
+        play_dates = list(play_dates)
+        fingerprints = schedule_fingerprints(batches)
+        changed = 0
+        for theater in theaters:
+            key = theater_key(chain, theater.cinema_code)
+            record = self._theaters.setdefault(key, {"visits": 0.0, "changes": 0.0, "hours": 0.0, "dates": {}})
+            crawled = fingerprints.get(theater.cinema_code, {})
+            current = {play_date: crawled.get(play_date, "") for play_date in play_dates}
+            # Today is not compared: chains drop screenings that already started.
+            compared = [d for d in current if d > today_iso and d in record["dates"]]
+            if record.get("last_crawled") and compared:
+                hours = (now - dt.datetime.fromisoformat(record["last_crawled"])).total_seconds() / 3600
+                is_changed = any(record["dates"][d] != current[d] for d in compared)
+                record["visits"] = record["visits"] * OBSERVATION_DECAY + 1
+                record["changes"] = record["changes"] * OBSERVATION_DECAY + is_changed
+                record["hours"] = record["hours"] * OBSERVATION_DECAY + hours
+                changed += is_changed
+            record["dates"].update(current)
+            record["last_crawled"] = now.isoformat()
+        return changed
+
+    def finish(self, now: Optional[dt.datetime] = None, today: Optional[dt.date] = None) -> None:
+        """Drop past play dates and persist."""
+        now = now or dt.datetime.utcnow()
+        today_iso = (today or dt.date.today()).isoformat()
+        for record in self._theaters.values():
+            record["dates"] = {d: fp for d, fp in record["dates"].items() if d >= today_iso}
+        self.state.save({"last_run": now.isoformat(), "theaters": self._theaters})
@@ -0,0 +1,191 @@
+"""
+In-memory "what's playing nearby" index over cinemas and screenings.
+
+Cinemas are bucketed into a lat/lon grid, and each cinema's screenings are kept
+in start-time order, so a radius + time-window (+ movie) query only touches the
+grid cells covering the circle and bisects each nearby cinema's timeline.
+
+Build it from sink output:
+    index = ScheduleIndex.from_jsonl("screenings.jsonl")
+    index = ScheduleIndex.from_sqlite("screenings.sqlite3")
+    index.query(37.5665, 126.9780, radius_km=3, start=now, end=now + 2h, movie="헤어질 결심")
+"""
+import datetime as dt
+import json
+import math
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from crawlers.cinema_registry import CinemaRegistry
+from crawlers.titles import normalize_for_match
+from models import SCREENING_CONFLICT_KEY, Cinema, hhmm_to_minutes
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+# ~5.5 km cells: a 3 km query touches at most a 3x3 block.
+GRID_CELL_DEGREES = 0.05
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def screening_start(play_date: str, start_dt: str) -> int:
+    """Absolute minute of a screening; 24:00-26:59 fall on the next calendar day."""
+    return dt.date.fromisoformat(play_date).toordinal() * 1440 + hhmm_to_minutes(start_dt)
+
+
+def _to_minute(value: dt.datetime) -> int:
+    return value.date().toordinal() * 1440 + value.hour * 60 + value.minute
+
+
+class _Timeline:
+    __slots__ = ("starts", "movies", "rows")
+
+    def __init__(self):
+        self.starts = array("q")
+        self.movies = array("I")
+        self.rows: list[dict[str, Any]] = []
+
+
+class ScheduleIndex:
+    def __init__(self, cinemas: Iterable[Cinema], cell_degrees: float = GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.cinemas: list[Cinema] = list(cinemas)
+        self._cinema_index = {(c.chain, c.cinema_code): i for i, c in enumerate(self.cinemas)}
+        self._grid: dict[tuple[int, int], list[int]] = {}
+        for i, cinema in enumerate(self.cinemas):
+            self._grid.setdefault(self._cell(cinema.latitude, cinema.longitude), []).append(i)
+        self._timelines: dict[int, _Timeline] = {}
+        self._movie_ids: dict[str, int] = {}
+        self.unmatched = 0
+
+    def __len__(self) -> int:
+        return sum(len(t.rows) for t in self._timelines.values())
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _movie_id(self, title: str) -> int:
+        normalized = normalize_for_match(title)
+        movie_id = self._movie_ids.get(normalized)
+        if movie_id is None:
+            movie_id = self._movie_ids[normalized] = len(self._movie_ids)
+        return movie_id
+
+    def add_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Add screening rows (Screening-shaped dicts); rows for unknown cinemas are counted in `unmatched`."""
+        pending: dict[int, list[tuple[int, int, dict[str, Any]]]] = {}
+        for row in rows:
+            cinema = self._cinema_index.get((row["provider"], row["cinema_code"]))
+            if cinema is None:
+                self.unmatched += 1
+                continue
+            pending.setdefault(cinema, []).append(
+                (screening_start(row["play_date"], row["start_dt"]), self._movie_id(row["movie_title"]), row)
+            )
+
+        for cinema, entries in pending.items():
+            timeline = self._timelines.get(cinema)
+            if timeline is not None:
+                entries.extend(zip(timeline.starts, timeline.movies, timeline.rows))
+            entries.sort(key=lambda entry: entry[0])
+            timeline = self._timelines[cinema] = _Timeline()
+            for start, movie_id, row in entries:
+                timeline.starts.append(start)
+                timeline.movies.append(movie_id)
+                timeline.rows.append(row)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[dict[str, Any]], cinemas: Optional[Iterable[Cinema]] = None
+    ) -> "ScheduleIndex":
+        index = cls(CinemaRegistry.shared().cinemas if cinemas is None else cinemas)
+        index.add_rows(rows)
+        return index
+
+    @classmethod
+    def from_jsonl(cls, path: str | Path, cinemas: Optional[Iterable[Cinema]] = None) -> "ScheduleIndex":
+        """
+        Build from JsonLinesSink output. Rows repeated on the screening conflict
+        key (appended runs, retries) are deduplicated, the last one wins.
+        """
+        latest: dict[tuple, dict[str, Any]] = {}
+        with open(path, encoding="utf-8") as fp:
+            for line in fp:
+                if line.strip():
+                    row = json.loads(line)
+                    latest[tuple(row[c] for c in SCREENING_CONFLICT_KEY)] = row
+        return cls.from_rows(latest.values(), cinemas)
+
+    @classmethod
+    def from_sqlite(cls, path: str | Path, cinemas: Optional[Iterable[Cinema]] = None) -> "ScheduleIndex":
+        """Build from SQLiteSink output."""
+        conn = sqlite3.connect(str(path))
+        conn.row_factory = sqlite3.Row
+        try:
+            return cls.from_rows((dict(row) for row in conn.execute("SELECT * FROM screenings")), cinemas)
+        finally:
+            conn.close()
+
+    def nearby_cinemas(self, lat: float, lon: float, radius_km: float) -> list[tuple[float, int]]:
+        """(distance_km, cinema position) within the radius, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, col_lo = self._cell(lat - dlat, lon - dlon)
+        row_hi, col_hi = self._cell(lat + dlat, lon + dlon)
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                for i in self._grid.get((row, col), ()):
+                    cinema = self.cinemas[i]
+                    distance = haversine_km(lat, lon, cinema.latitude, cinema.longitude)
+                    if distance <= radius_km:
+                        found.append((distance, i))
+        found.sort()
+        return found
+
+    def query(
+        self,
+        lat: float,
+        lon: float,
+        *,
+        radius_km: float,
+        start: dt.datetime,
+        end: dt.datetime,
+        movie: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Screenings starting in [start, end] at cinemas within `radius_km`,
+        optionally for one movie (matched on normalized title). Ordered by
+        start time, then distance; each result is the stored row plus `distance_km`.
+        """
+        movie_id = None
+        if movie is not None:
+            movie_id = self._movie_ids.get(normalize_for_match(movie))
+            if movie_id is None:
+                return []
+        lo, hi = _to_minute(start), _to_minute(end)
+
+        hits = []
+        for distance, i in self.nearby_cinemas(lat, lon, radius_km):
+            timeline = self._timelines.get(i)
+            if timeline is None:
+                continue
+            first = bisect_left(timeline.starts, lo)
+            last = bisect_right(timeline.starts, hi)
+            for k in range(first, last):
+                if movie_id is None or timeline.movies[k] == movie_id:
+                    hits.append((timeline.starts[k], distance, timeline.rows[k]))
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        if limit is not None:
+            hits = hits[:limit]
+        return [{**row, "distance_km": round(distance, 3)} for _, distance, row in hits]
@@ -0,0 +1,180 @@
+"""
+Output sinks for crawled screenings, selectable per run.
+
+- `supabase`: production upsert (row or compact mode, see SCREENINGS_WRITE_MODE)
+- `sqlite`:   local database with the same conflict key as the production upsert
+- `parquet`:  files partitioned by provider/play_date (needs pyarrow)
+- `jsonl`:    streaming JSON Lines
+"""
+import abc
+import datetime as dt
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Type
+
+from models import SCREENING_CONFLICT_KEY, Screening, ScreeningBatch
+
+SCREENING_COLUMNS = tuple(Screening.model_fields)
+
+
+def screening_rows(data: "Iterable[Screening] | ScreeningBatch") -> Iterator[dict[str, Any]]:
+    """Every screening as a full dict (None fields kept) in Screening field order."""
+    if isinstance(data, ScreeningBatch):
+        yield from data.rows()
+    else:
+        for screening in data:
+            yield screening.model_dump()
+
+
+class ScreeningSink(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    def write(self, data: "list[Screening] | ScreeningBatch") -> int:
+        """Persist one chain's screenings. Returns the number of rows written."""
+
+    def close(self) -> None:
+        pass
+
+
+class SupabaseSink(ScreeningSink):
+    name = "supabase"
+
+    def __init__(self, supabase, compact: bool | None = None):
+        self.supabase = supabase
+        if compact is None:
+            compact = os.getenv("SCREENINGS_WRITE_MODE", "rows") == "compact"
+        self.compact = compact
+
+    def write(self, data: "list[Screening] | ScreeningBatch") -> int:
+        if not data:
+            return 0
+        if self.compact:
+            return self.supabase.insert_screenings_compact(data)
+        return self.supabase.insert_screenings(data)
+
+
+class SQLiteSink(ScreeningSink):
+    name = "sqlite"
+
+    def __init__(self, path: str | Path = "screenings.sqlite3"):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        columns = ", ".join(
+            f"{c} INTEGER" if c in {"source_year", "remain_seat_cnt", "total_seat_cnt", "is_core_art_screen"}
+            else f"{c} TEXT"
+            for c in SCREENING_COLUMNS
+        )
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS screenings ({columns}, "
+            f"PRIMARY KEY ({', '.join(SCREENING_CONFLICT_KEY)}))"
+        )
+        updates = ", ".join(
+            f"{c} = excluded.{c}" for c in SCREENING_COLUMNS if c not in SCREENING_CONFLICT_KEY
+        )
+        self._upsert_sql = (
+            f"INSERT INTO screenings ({', '.join(SCREENING_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in SCREENING_COLUMNS)}) "
+            f"ON CONFLICT ({', '.join(SCREENING_CONFLICT_KEY)}) DO UPDATE SET {updates}"
+        )
+
+    def write(self, data: "list[Screening] | ScreeningBatch") -> int:
+        rows = [tuple(row[c] for c in SCREENING_COLUMNS) for row in screening_rows(data)]
+        with self.conn:
+            self.conn.executemany(self._upsert_sql, rows)
+        return len(rows)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class JsonLinesSink(ScreeningSink):
+    """
+    One file per run: truncated on open unless `append` (workers sharing a file).
+    Each write is deduplicated on the conflict key, last row wins; readers such
+    as ScheduleIndex.from_jsonl apply the same rule across writes.
+    """
+
+    name = "jsonl"
+
+    def __init__(self, path: str | Path = "screenings.jsonl", append: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = open(self.path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, data: "list[Screening] | ScreeningBatch") -> int:
+        latest = {tuple(row[c] for c in SCREENING_CONFLICT_KEY): row for row in screening_rows(data)}
+        for row in latest.values():
+            self._fp.write(json.dumps(row, ensure_ascii=False))
+            self._fp.write("\n")
+        self._fp.flush()
+        return len(latest)
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class ParquetSink(ScreeningSink):
+    """Writes `<root>/provider=<p>/play_date=<d>/part-<timestamp>.parquet`."""
+
+    name = "parquet"
+
+    def __init__(self, path: str | Path = "screenings_parquet"):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as exc:
+            raise RuntimeError("ParquetSink requires pyarrow (pip install pyarrow)") from exc
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.root = Path(path)
+        self._schema = pyarrow.schema(
+            [
+                (c, pyarrow.int64() if c in {"source_year", "remain_seat_cnt", "total_seat_cnt"}
+                 else pyarrow.bool_() if c == "is_core_art_screen"
+                 else pyarrow.string())
+                for c in SCREENING_COLUMNS
+            ]
+        )
+
+    def write(self, data: "list[Screening] | ScreeningBatch") -> int:
+        partitions: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for row in screening_rows(data):
+            partitions.setdefault((row["provider"], row["play_date"]), []).append(row)
+
+        stamp = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        count = 0
+        for (provider, play_date), rows in partitions.items():
+            directory = self.root / f"provider={provider}" / f"play_date={play_date}"
+            directory.mkdir(parents=True, exist_ok=True)
+            table = self._pa.Table.from_pylist(rows, schema=self._schema)
+            self._pq.write_table(table, directory / f"part-{stamp}.parquet")
+            count += len(rows)
+        return count
+
+
+SINKS: dict[str, Type[ScreeningSink]] = {
+    SupabaseSink.name: SupabaseSink,
+    SQLiteSink.name: SQLiteSink,
+    ParquetSink.name: ParquetSink,
+    JsonLinesSink.name: JsonLinesSink,
+}
+
+
+def get_sink(name: str, *, supabase=None, path: str | None = None, append: bool = False) -> ScreeningSink:
+    """
+    Build a sink by name. `path` applies to local sinks, `supabase` to the
+    Supabase sink, `append` to the JSON Lines sink.
+    """
+    sink_class = SINKS.get(name)
+    if not sink_class:
+        raise ValueError(f"Unknown sink: {name} (expected one of {sorted(SINKS)})")
+    if sink_class is SupabaseSink:
+        if supabase is None:
+            raise ValueError("The supabase sink needs a SupabaseClient")
+        return SupabaseSink(supabase)
+    if sink_class is JsonLinesSink:
+        return JsonLinesSink(path or "screenings.jsonl", append=append)
+    return sink_class(path) if path else sink_class()
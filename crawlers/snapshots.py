@@ -0,0 +1,299 @@
+"""
+Precomputed schedule snapshots for static/CDN delivery.
+
+After a crawl, screenings are materialized into pre-sorted JSON files:
+    dates/<play_date>.json                 every screening on a date
+    cinemas/<provider>/<cinema_code>.json  one cinema's schedule
+    movies/<key>.json                      one movie's screenings (key = hash of normalized title)
+    movies/index.json                      [[title, key], ...]
+    manifest.json                          path -> sha256 of the uncompressed body
+Each file holds {"columns": [...], "rows": [[...], ...]} and is stored with
+gzip (and brotli when installed) precompressed variants. Files whose hash is
+unchanged since the previous manifest are not rewritten.
+
+(provider, play_date) pairs not crawled in this run, and theaters a revisit run
+(crawlers/revisit.py) skipped, keep their rows: they are
+read back from the previous run's cinema files, so a single-chain run or a
+tiered-horizon run (crawlers/horizon.py) does not drop other chains or far dates
+from the date and movie files.
+"""
+import abc
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from crawlers.titles import normalize_for_match
+
+try:
+    import brotli
+except ImportError:  # gzip-only output
+    brotli = None
+
+SNAPSHOT_COLUMNS = (
+    "provider",
+    "cinema_code",
+    "cinema_name",
+    "screen_name",
+    "movie_title",
+    "movie_title_en",
+    "play_date",
+    "start_dt",
+    "end_dt",
+    "url",
+    "remain_seat_cnt",
+    "total_seat_cnt",
+    "is_core_art_screen",
+)
+MANIFEST_PATH = "manifest.json"
+
+
+def movie_snapshot_key(title: str) -> str:
+    return hashlib.sha1(normalize_for_match(title).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_snapshot(rows: list[tuple]) -> bytes:
+    body = {"columns": SNAPSHOT_COLUMNS, "rows": rows}
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_snapshot(body: bytes) -> list[dict[str, Any]]:
+    data = json.loads(body)
+    return [dict(zip(data["columns"], row)) for row in data["rows"]]
+
+
+def build_snapshots(rows: Iterable[dict[str, Any]]) -> dict[str, bytes]:
+    """Snapshot path -> uncompressed JSON body."""
+    by_date: dict[str, list[tuple]] = {}
+    by_cinema: dict[tuple[str, str], list[tuple]] = {}
+    by_movie: dict[str, list[tuple]] = {}
+    movie_titles: dict[str, str] = {}
+    for row in rows:
+        values = tuple(row.get(c) for c in SNAPSHOT_COLUMNS)
+        by_date.setdefault(row["play_date"], []).append(values)
+        by_cinema.setdefault((row["provider"], row["cinema_code"]), []).append(values)
+        key = movie_snapshot_key(row["movie_title"])
+        by_movie.setdefault(key, []).append(values)
+        movie_titles.setdefault(key, row["movie_title"])
+
+    # (play_date, start_dt, provider, cinema_code, screen_name); "25:10" sorts after "23:50".
+    def order(values: tuple) -> tuple:
+        return (values[6], values[7], values[0], values[1], values[3])
+
+    files: dict[str, bytes] = {}
+    for play_date, values in by_date.items():
+        files[f"dates/{play_date}.json"] = encode_snapshot(sorted(values, key=order))
+    for (provider, cinema_code), values in by_cinema.items():
+        files[f"cinemas/{provider}/{cinema_code}.json"] = encode_snapshot(sorted(values, key=order))
+    for key, values in by_movie.items():
+        files[f"movies/{key}.json"] = encode_snapshot(sorted(values, key=order))
+    files["movies/index.json"] = json.dumps(
+        sorted([title, key] for key, title in movie_titles.items()),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return files
+
+
+class SnapshotStore(abc.ABC):
+    @abc.abstractmethod
+    def read(self, path: str) -> Optional[bytes]:
+        """Uncompressed body, or None if missing."""
+
+    @abc.abstractmethod
+    def put(self, path: str, body: bytes, encodings: dict[str, bytes], sha256: str) -> None:
+        """Store the body and its precompressed variants ({"gzip": ..., "br": ...})."""
+
+    @abc.abstractmethod
+    def delete(self, path: str) -> None:
+        ...
+
+
+class LocalSnapshotStore(SnapshotStore):
+    """`<root>/<path>` plus `<path>.gz` / `<path>.br` next to it."""
+
+    _suffixes = {"gzip": ".gz", "br": ".br"}
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def read(self, path: str) -> Optional[bytes]:
+        target = self.root / path
+        return target.read_bytes() if target.exists() else None
+
+    def put(self, path: str, body: bytes, encodings: dict[str, bytes], sha256: str) -> None:
+        target = self.root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for name, data in ((path, body), *((path + self._suffixes[e], d) for e, d in encodings.items())):
+            tmp = self.root / f"{name}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.root / name)
+
+    def delete(self, path: str) -> None:
+        for suffix in ("", *self._suffixes.values()):
+            (self.root / (path + suffix)).unlink(missing_ok=True)
+
+
+class ObjectStoreSnapshotStore(SnapshotStore):
+    """
+    S3-style store: one object per encoding (`<path>`, `<path>.gz`, `<path>.br`)
+    with Content-Encoding set so a CDN can serve the precompressed variant.
+    `client` is a boto3 S3 client or anything with the same get/put/delete_object
+    calls, e.g. LocalObjectClient.
+    """
+
+    _suffixes = {"gzip": ".gz", "br": ".br"}
+
+    def __init__(self, bucket: str, prefix: str = "", client=None):
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3")
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def read(self, path: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + path)["Body"].read()
+        except Exception as exc:
+            if type(exc).__name__ in {"NoSuchKey", "FileNotFoundError"} or "NoSuchKey" in str(exc):
+                return None
+            raise
+
+    def put(self, path: str, body: bytes, encodings: dict[str, bytes], sha256: str) -> None:
+        common = {
+            "Bucket": self.bucket,
+            "ContentType": "application/json; charset=utf-8",
+            "CacheControl": "public, max-age=60",
+            "Metadata": {"sha256": sha256},
+        }
+        self.client.put_object(Key=self.prefix + path, Body=body, **common)
+        for encoding, data in encodings.items():
+            self.client.put_object(
+                Key=self.prefix + path + self._suffixes[encoding], Body=data, ContentEncoding=encoding, **common
+            )
+
+    def delete(self, path: str) -> None:
+        for suffix in ("", *self._suffixes.values()):
+            self.client.delete_object(Bucket=self.bucket, Key=self.prefix + path + suffix)
+
+
+class LocalObjectClient:
+    """Directory-backed stand-in for the boto3 S3 calls ObjectStoreSnapshotStore makes."""
+
+    class _Body:
+        def __init__(self, data: bytes):
+            self._data = data
+
+        def read(self) -> bytes:
+            return self._data
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        target = self._path(Bucket, Key)
+        if not target.exists():
+            raise FileNotFoundError(f"NoSuchKey: {Bucket}/{Key}")
+        meta = target.with_name(target.name + ".meta.json")
+        return {
+            "Body": self._Body(target.read_bytes()),
+            **(json.loads(meta.read_text()) if meta.exists() else {}),
+        }
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **params) -> dict:
+        target = self._path(Bucket, Key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(Body)
+        target.with_name(target.name + ".meta.json").write_text(json.dumps(params))
+        return {}
+
+    def delete_object(self, Bucket: str, Key: str) -> dict:
+        target = self._path(Bucket, Key)
+        target.unlink(missing_ok=True)
+        target.with_name(target.name + ".meta.json").unlink(missing_ok=True)
+        return {}
+
+
+def _compress(body: bytes) -> dict[str, bytes]:
+    # mtime=0 keeps the gzip bytes identical for identical bodies.
+    encodings = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(body, quality=11)
+    return encodings
+
+
+def publish_snapshots(
+    rows: Iterable[dict[str, Any]],
+    store: SnapshotStore,
+    crawled_cinemas: Optional[dict[str, set[str]]] = None,
+) -> dict[str, int]:
+    """
+    Build snapshots for this run's rows (plus carried-over ones) and write
+    the ones whose content hash changed. Returns counts and byte totals.
+    `crawled_cinemas` (provider -> cinema codes) limits what counts as
+    re-crawled for providers that only revisited some theaters.
+    """
+    rows = list(rows)
+    previous_manifest = store.read(MANIFEST_PATH)
+    previous: dict[str, str] = json.loads(previous_manifest) if previous_manifest else {}
+
+    crawled = {(row["provider"], row["play_date"]) for row in rows}
+    crawled_cinemas = crawled_cinemas or {}
+
+    def recrawled(row: dict[str, Any]) -> bool:
+        if (row["provider"], row["play_date"]) not in crawled:
+            return False
+        codes = crawled_cinemas.get(row["provider"])
+        return codes is None or row["cinema_code"] in codes
+
+    first_date = min((row["play_date"] for row in rows), default="")
+    for path in previous:
+        parts = path.split("/")
+        if parts[0] == "cinemas" and len(parts) == 3:
+            body = store.read(path)
+            if body is not None:
+                # Past dates age out for carried-over rows too.
+                rows.extend(
+                    r for r in decode_snapshot(body)
+                    if r["play_date"] >= first_date and not recrawled(r)
+                )
+
+    files = build_snapshots(rows)
+    manifest: dict[str, str] = {}
+    stats = {"written": 0, "unchanged": 0, "deleted": 0, "bytes_raw": 0, "bytes_gzip": 0, "bytes_br": 0}
+    for path, body in sorted(files.items()):
+        digest = hashlib.sha256(body).hexdigest()
+        manifest[path] = digest
+        if previous.get(path) == digest:
+            stats["unchanged"] += 1
+            continue
+        encodings = _compress(body)
+        store.put(path, body, encodings, digest)
+        stats["written"] += 1
+        stats["bytes_raw"] += len(body)
+        stats["bytes_gzip"] += len(encodings["gzip"])
+        stats["bytes_br"] += len(encodings.get("br", b""))
+
+    for path in previous.keys() - manifest.keys():
+        store.delete(path)
+        stats["deleted"] += 1
+
+    manifest_body = json.dumps(manifest, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    store.put(MANIFEST_PATH, manifest_body, _compress(manifest_body), hashlib.sha256(manifest_body).hexdigest())
+    return stats
+
+
+def get_snapshot_store(*, directory: str | None = None, bucket: str | None = None, prefix: str = "") -> SnapshotStore | None:
+    """Local directory wins over an object-store bucket; None when neither is configured."""
+    if directory:
+        return LocalSnapshotStore(directory)
+    if bucket:
+        return ObjectStoreSnapshotStore(bucket, prefix)
+    return None
@@ -0,0 +1,111 @@
+import gzip
+import json
+
+import pytest
+
+from crawlers.snapshots import (
+    LocalObjectClient,
+    LocalSnapshotStore,
+    ObjectStoreSnapshotStore,
+    decode_snapshot,
+    movie_snapshot_key,
+    publish_snapshots,
+)
+
+
+@pytest.fixture(params=["object", "local"])
+def store(request, tmp_path):
+    if request.param == "object":
+        return ObjectStoreSnapshotStore("schedules", prefix="v1", client=LocalObjectClient(tmp_path))
+    return LocalSnapshotStore(tmp_path)
+
+
+def _row(provider, cinema_code, play_date, start_dt="10:00", title="기생충"):
+    return {
+        "provider": provider,
+        "cinema_code": cinema_code,
+        "cinema_name": f"{provider} {cinema_code}",
+        "screen_name": "1관",
+        "movie_title": title,
+        "play_date": play_date,
+        "start_dt": start_dt,
+        "end_dt": "12:00",
+    }
+
+
+def _date_rows(store, play_date):
+    return [(r["provider"], r["cinema_code"], r["start_dt"]) for r in decode_snapshot(store.read(f"dates/{play_date}.json"))]
+
+
+def test_files_are_sorted_and_precompressed(store):
+    publish_snapshots([_row("CGV", "0013", "2026-10-19", "25:10"), _row("CGV", "0013", "2026-10-19", "09:00")], store)
+
+    assert _date_rows(store, "2026-10-19") == [("CGV", "0013", "09:00"), ("CGV", "0013", "25:10")]
+    manifest = json.loads(store.read("manifest.json"))
+    assert "cinemas/CGV/0013.json" in manifest
+    assert f"movies/{movie_snapshot_key('기생충')}.json" in manifest
+
+
+def test_precompressed_variant_carries_content_encoding(tmp_path):
+    client = LocalObjectClient(tmp_path)
+    store = ObjectStoreSnapshotStore("schedules", client=client)
+    publish_snapshots([_row("CGV", "0013", "2026-10-19")], store)
+
+    gz = client.get_object(Bucket="schedules", Key="dates/2026-10-19.json.gz")
+    assert gz["ContentEncoding"] == "gzip"
+    assert gzip.decompress(gz["Body"].read()) == store.read("dates/2026-10-19.json")
+
+
+def test_unchanged_files_are_not_rewritten(store):
+    rows = [_row("CGV", "0013", "2026-10-19"), _row("Lotte", "1016", "2026-10-19")]
+    first = publish_snapshots(rows, store)
+    again = publish_snapshots(rows, store)
+
+    assert first["written"] > 0 and first["unchanged"] == 0
+    assert (again["written"], again["deleted"], again["unchanged"]) == (0, 0, first["written"])
+
+    changed = publish_snapshots([_row("CGV", "0013", "2026-10-19", "11:00"), rows[1]], store)
+    # The date, CGV cinema and movie files change; the Lotte cinema file does not.
+    assert changed["written"] == 3
+    assert changed["unchanged"] == first["written"] - 3
+
+
+def test_stale_paths_are_deleted(store):
+    publish_snapshots([_row("CGV", "0013", "2026-10-19", title="기생충")], store)
+    stats = publish_snapshots([_row("CGV", "0013", "2026-10-19", title="헤어질 결심")], store)
+
+    assert stats["deleted"] == 1
+    assert store.read(f"movies/{movie_snapshot_key('기생충')}.json") is None
+    assert store.read(f"movies/{movie_snapshot_key('헤어질 결심')}.json") is not None
+
+
+def test_rows_of_uncrawled_providers_and_dates_are_carried_over(store):
+    publish_snapshots(
+        [
+            _row("CGV", "0013", "2026-10-19"),
+            _row("CGV", "0013", "2026-10-20"),
+            _row("Lotte", "1016", "2026-10-19"),
+        ],
+        store,
+    )
+    # A CGV-only run for the first date, e.g. a tiered-horizon segment.
+    publish_snapshots([_row("CGV", "0013", "2026-10-19", "11:00")], store)
+
+    assert _date_rows(store, "2026-10-19") == [("Lotte", "1016", "10:00"), ("CGV", "0013", "11:00")]
+    assert _date_rows(store, "2026-10-20") == [("CGV", "0013", "10:00")]
+
+
+def test_theaters_a_revisit_run_skipped_are_carried_over(store):
+    publish_snapshots([_row("CGV", "0013", "2026-10-19"), _row("CGV", "0056", "2026-10-19")], store)
+    publish_snapshots([_row("CGV", "0013", "2026-10-19", "11:00")], store, crawled_cinemas={"CGV": {"0013"}})
+
+    assert _date_rows(store, "2026-10-19") == [("CGV", "0056", "10:00"), ("CGV", "0013", "11:00")]
+
+
+def test_a_crawled_theater_with_no_rows_is_emptied(store):
+    publish_snapshots([_row("CGV", "0013", "2026-10-19"), _row("CGV", "0056", "2026-10-19")], store)
+    stats = publish_snapshots([_row("CGV", "0013", "2026-10-19")], store, crawled_cinemas={"CGV": {"0013", "0056"}})
+
+    assert stats["deleted"] == 1
+    assert store.read("cinemas/CGV/0056.json") is None
+    assert _date_rows(store, "2026-10-19") == [("CGV", "0013", "10:00")]
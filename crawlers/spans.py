@@ -0,0 +1,131 @@
+"""
+Step-level timing spans for crawler phases.
+
+    with spans.span("goto", theater="0013") as span:
+        ...
+        span["retries"] = 1
+
+Each span records its duration plus whatever counters the code sets on it
+(responses captured, bytes, retries, ...) and is emitted as one JSON object
+per line: to `CRAWL_SPANS_PATH` (JSON Lines) and/or stdout when
+`CRAWL_SPANS_LOG=1` (CloudWatch Logs Insights parses JSON log lines).
+`summary` aggregates the run into per-phase percentiles.
+"""
+import datetime as dt
+import json
+import math
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+SUMMED_FIELDS = ("responses", "bytes", "retries", "rows")
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[max(0, math.ceil(q * len(sorted_samples)) - 1)]
+
+
+class SpanRecorder:
+    def __init__(self, chain: str, path: str | Path | None = None, log: bool = False):
+        self.chain = chain
+        self.run_id = uuid.uuid4().hex[:12]
+        self.log = log
+        self.path = Path(path) if path else None
+        self._fp = None
+        self.spans: list[dict[str, Any]] = []
+
+    @classmethod
+    def from_env(cls, chain: str) -> "SpanRecorder":
+        return cls(
+            chain,
+            path=os.getenv("CRAWL_SPANS_PATH"),
+            log=os.getenv("CRAWL_SPANS_LOG", "0").lower() in {"1", "true", "yes", "on"},
+        )
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        span: dict[str, Any] = {"span": name, **attrs}
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as exc:
+            span["error"] = type(exc).__name__
+            raise
+        finally:
+            span["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            self.record(span)
+
+    def record(self, span: dict[str, Any]) -> None:
+        self.spans.append(span)
+        if not self.log and self.path is None:
+            return
+        line = json.dumps(
+            {"run_id": self.run_id, "chain": self.chain, "ts": dt.datetime.utcnow().isoformat(), **span},
+            ensure_ascii=False,
+        )
+        if self.log:
+            print(line)
+        if self.path is not None:
+            if self._fp is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fp = open(self.path, "a", encoding="utf-8")
+            self._fp.write(line + "\n")
+            self._fp.flush()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """span name -> count, duration percentiles (ms) and summed counters."""
+        by_name: dict[str, list[dict[str, Any]]] = {}
+        for span in self.spans:
+            by_name.setdefault(span["span"], []).append(span)
+        summary = {}
+        for name, spans in by_name.items():
+            durations = sorted(span["duration_ms"] for span in spans)
+            stats: dict[str, Any] = {
+                "count": len(spans),
+                "p50_ms": percentile(durations, 0.5),
+                "p90_ms": percentile(durations, 0.9),
+                "p99_ms": percentile(durations, 0.99),
+                "max_ms": durations[-1],
+                "total_ms": round(sum(durations), 1),
+                "errors": sum(1 for span in spans if "error" in span),
+            }
+            for field in SUMMED_FIELDS:
+                if any(field in span for span in spans):
+                    stats[field] = sum(span.get(field, 0) for span in spans)
+            summary[name] = stats
+        return summary
+
+    def print_summary(self) -> None:
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"  {self.chain} phase timings (run {self.run_id}):")
+        for name, stats in sorted(summary.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+            counters = " ".join(f"{field}={stats[field]}" for field in SUMMED_FIELDS if field in stats)
+            if stats["errors"]:
+                counters += f" errors={stats['errors']}"
+            print(
+                f"    {name:24s} n={stats['count']:4d} p50={stats['p50_ms']:8.1f}ms p90={stats['p90_ms']:8.1f}ms "
+                f"p99={stats['p99_ms']:8.1f}ms total={stats['total_ms'] / 1000:7.1f}s {counters}".rstrip()
+            )
+        if self.log or self.path is not None:
+            self.record_summary(summary)
+
+    def record_summary(self, summary: dict[str, dict[str, Any]]) -> None:
+        line = json.dumps({"run_id": self.run_id, "chain": self.chain, "span_summary": summary}, ensure_ascii=False)
+        if self.log:
+            print(line)
+        if self.path is not None and self._fp is not None:
+            self._fp.write(line + "\n")
+            self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
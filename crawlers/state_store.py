@@ -0,0 +1,69 @@
+"""
+Small JSON state documents persisted between crawler invocations.
+
+The tiered horizon (run counter and last-crawled times), the revisit
+scheduler (per-theater fingerprints and change rates) and the failure ledger
+(failed work units) each keep one document, loaded at the start of a run and
+saved at the end:
+- `LocalStateStore`: a JSON file, for local runs and tests
+- `SupabaseStateStore`: one jsonb row per `name` in `crawl_horizon_state`
+  (the table is named after its first user; rows "default", "revisit" and
+  "failed_units" live side by side)
+"""
+import abc
+import json
+from pathlib import Path
+from typing import Any
+
+
+class StateStore(abc.ABC):
+    @abc.abstractmethod
+    def load(self) -> dict[str, Any]:
+        """The stored document, or {} when nothing was saved yet."""
+
+    @abc.abstractmethod
+    def save(self, state: dict[str, Any]) -> None:
+        ...
+
+
+class LocalStateStore(StateStore):
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def load(self) -> dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text(encoding="utf-8"))
+
+    def save(self, state: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+class SupabaseStateStore(StateStore):
+    """One jsonb row in `crawl_horizon_state`, keyed by `name`."""
+
+    table = "crawl_horizon_state"
+
+    def __init__(self, supabase, name: str = "default"):
+        self.supabase = supabase
+        self.name = name
+
+    def load(self) -> dict[str, Any]:
+        response = (
+            self.supabase.client.table(self.table)
+            .select("state")
+            .eq("name", self.name)
+            .limit(1)
+            .execute()
+        )
+        return (response.data or [{}])[0].get("state") or {}
+
+    def save(self, state: dict[str, Any]) -> None:
+        (
+            self.supabase.client.table(self.table)
+            .upsert({"name": self.name, "state": state}, on_conflict="name")
+            .execute()
+        )
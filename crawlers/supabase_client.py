@@ -1,9 +1,10 @@
 from supabase import create_client, Client
 import os
-from typing import TYPE_CHECKING, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 if TYPE_CHECKING:
-    from models import Screening
+    from models import Screening, ScreeningBatch, SeatCount
 
 
 class SupabaseClient:
@@ -14,29 +15,175 @@ class SupabaseClient:
         if not url or not key:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
         self.client: Client = create_client(url, key)
+        # (table, preferred columns) -> columns that actually exist, learned once per client.
+        self._column_fallbacks: dict[tuple[str, str], str] = {}
 
-    def insert_screenings(self, data: list["Screening"]):
-        """Insert screenings into Supabase."""
-        unique_map = {}
-        for s in data:
-            key = (s.provider, s.cinema_code, s.play_date, s.start_dt, s.screen_name)
-            unique_map[key] = s  # Last one wins
+    def insert_screenings(self, data: "list[Screening] | ScreeningBatch") -> int:
+        """
+        Insert screenings (a list or a columnar ScreeningBatch) into Supabase.
+        Returns the number of rows sent after deduplicating on the conflict key.
+        """
+        from models import ScreeningBatch, dump_screenings
 
-        payload = [s.model_dump(exclude_none=True) for s in unique_map.values()]
+        if isinstance(data, ScreeningBatch):
+            payload = data.to_payload()
+        else:
+            unique_map = {}
+            for s in data:
+                key = (s.provider, s.cinema_code, s.play_date, s.start_dt, s.screen_name)
+                unique_map[key] = s  # Last one wins
+
+            payload = dump_screenings(unique_map.values())
 
         (
             self.client.table("screenings")
             .upsert(payload, on_conflict="provider,cinema_code,play_date,start_dt,screen_name")
             .execute()
         )
+        return len(payload)
+
+    def _fetch_page(
+        self,
+        table: str,
+        columns: str,
+        filters: Callable | None,
+        order_by: tuple[str, ...],
+        offset: int,
+        page_size: int,
+    ) -> list[dict[str, Any]]:
+        query = self.client.table(table).select(columns)
+        if filters:
+            query = filters(query)
+        for column in order_by:
+            query = query.order(column)
+        response = query.range(offset, offset + page_size - 1).execute()
+        return response.data or []
+
+    def iter_rows(
+        self,
+        table: str,
+        columns: str = "*",
+        *,
+        filters: Callable | None = None,
+        order_by: str | tuple[str, ...] = "id",
+        page_size: int = 1000,
+        concurrency: int = 4,
+        fallback_columns: str | tuple[str, ...] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream rows from a table or view with offset pagination.
+
+        `filters` receives the query builder and returns it with filters applied.
+        `order_by` must give a stable order so pages do not overlap. Keep `page_size`
+        at or below PostgREST's max-rows setting: a short page marks the end.
+        After the first page, `concurrency` pages are fetched in parallel, and rows
+        are yielded page by page so memory stays bounded.
+        If the first page fails on a missing column, the reader switches to the first
+        of `fallback_columns` (one or several, most complete first) that drops it and
+        remembers that choice for later calls.
+        """
+        order_columns = (order_by,) if isinstance(order_by, str) else tuple(order_by)
+        fallback_key = (table, columns)
+        columns = self._column_fallbacks.get(fallback_key, columns)
+
+        def fetch(offset: int) -> list[dict[str, Any]]:
+            return self._fetch_page(table, columns, filters, order_columns, offset, page_size)
+
+        remaining_fallbacks = (
+            [fallback_columns] if isinstance(fallback_columns, str) else list(fallback_columns or ())
+        )
+        while True:
+            try:
+                page = fetch(0)
+                break
+            except Exception as exc:
+                # Drop to the next fallback that no longer selects the missing column.
+                while remaining_fallbacks:
+                    candidate = remaining_fallbacks.pop(0)
+                    missing = set(columns.replace(" ", "").split(",")) - set(
+                        candidate.replace(" ", "").split(",")
+                    )
+                    if any(column in str(exc) for column in missing):
+                        break
+                else:
+                    raise
+                self._column_fallbacks[fallback_key] = candidate
+                columns = candidate
+
+        yield from page
+        if len(page) < page_size:
+            return
+
+        offset = page_size
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            while True:
+                offsets = [offset + i * page_size for i in range(max(1, concurrency))]
+                for page in pool.map(fetch, offsets):
+                    yield from page
+                    if len(page) < page_size:
+                        return
+                offset = offsets[-1] + page_size
+
+    def insert_screenings_compact(self, data: "list[Screening] | ScreeningBatch") -> int:
+        """
+        Upsert screenings through the `upsert_screenings_compact` RPC, which expands
+        dictionary-encoded batches server-side. Falls back to `insert_screenings`
+        when the RPC is not deployed. Returns the number of deduplicated rows sent.
+        """
+        from models import ScreeningBatch
+
+        batch = data if isinstance(data, ScreeningBatch) else ScreeningBatch.from_screenings(data)
+        sent = 0
+        try:
+            for payload in batch.to_compact_payloads():
+                self.client.rpc("upsert_screenings_compact", {"batch": payload}).execute()
+                sent += len(payload["rows"])
+        except Exception as exc:
+            print(f"⚠ Compact upsert failed ({exc}); falling back to row upsert.")
+            return self.insert_screenings(batch)
+        return sent
+
+    def update_seat_counts(self, seats: "list[SeatCount]") -> int:
+        """
+        Narrow update of remain/total seat counts keyed by the screening conflict key,
+        one `update_screening_seats` RPC per provider. Never inserts rows. Falls back
+        to per-row updates when the RPC is not deployed. Returns rows sent.
+        """
+        latest: dict[tuple, "SeatCount"] = {}
+        for seat in seats:
+            latest[seat[:5]] = seat  # last one wins, like insert_screenings
+        by_provider: dict[str, list[list]] = {}
+        for seat in latest.values():
+            by_provider.setdefault(seat.provider, []).append(
+                [seat.cinema_code, seat.play_date, seat.start_dt, seat.screen_name,
+                 seat.remain_seat_cnt, seat.total_seat_cnt]
+            )
+        for provider, rows in by_provider.items():
+            try:
+                self.client.rpc(
+                    "update_screening_seats", {"batch": {"provider": provider, "rows": rows}}
+                ).execute()
+            except Exception as exc:
+                print(f"⚠ Seat RPC failed for {provider} ({exc}); falling back to per-row updates.")
+                for cinema_code, play_date, start_dt, screen_name, remain, total in rows:
+                    (
+                        self.client.table("screenings")
+                        .update({"remain_seat_cnt": remain, "total_seat_cnt": total})
+                        .eq("provider", provider)
+                        .eq("cinema_code", cinema_code)
+                        .eq("play_date", play_date)
+                        .eq("start_dt", start_dt)
+                        .eq("screen_name", screen_name)
+                        .execute()
+                    )
+        return len(latest)
 
     def fetch_cinemas(self, chain: str | None = None) -> list[dict[str, Any]]:
         """Fetch cinemas from Supabase, optionally filtered by chain."""
-        query = self.client.table("cinemas").select("*")
-        if chain:
-            query = query.eq("chain", chain)
-        response = query.execute()
-        return response.data
+        filters = (lambda query: query.eq("chain", chain)) if chain else None
+        return list(
+            self.iter_rows("cinemas", filters=filters, order_by=("chain", "cinema_code"))
+        )
 
     def insert_cinemas(self, cinemas: list[dict[str, Any]]) -> None:
         """Insert cinemas into Supabase."""
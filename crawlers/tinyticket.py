@@ -2,17 +2,21 @@
 
 import re
 import datetime
+import time
 from typing import Generator
 
 from playwright.async_api import async_playwright
 
+from crawlers.asset_cache import AssetCache, new_asset_stats, track_network_bytes
 from crawlers.base import BaseCrawler
 from models import Screening, Chain
 
 
 class TinyTicketCrawler(BaseCrawler):
     chain: Chain = "TinyTicket"
+    date_addressable = False
     base_url = "https://www.tinyticket.net/event-manager"
+    probe_url = base_url
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -70,14 +74,29 @@ class TinyTicketCrawler(BaseCrawler):
             })
             await page.add_init_script("Object.defineProperty(navigator, 'language', {get: () => 'ko-KR'})")
             await page.add_init_script("Object.defineProperty(navigator, 'languages', {get: () => ['ko-KR', 'ko']})")
+            asset_cache = AssetCache.from_env()
+            asset_stats = new_asset_stats()
+            track_network_bytes(page, asset_stats)
+            if asset_cache is not None:
+                async def serve_assets(route):
+                    if not await asset_cache.handle(route, asset_stats):
+                        await route.continue_()
+                await page.route("**/*", serve_assets)
 
             for theater in self.theaters:
                 url = f"{self.base_url}/{theater.cinema_code}"
                 print(f"Processing TinyTicket theater: {theater.name}")
                 
                 try:
+                    before = dict(asset_stats)
+                    started = time.perf_counter()
                     await page.goto(url)
                     await page.wait_for_selector(".dateLabel", timeout=10000)
+                    print(
+                        f"  Page ready in {time.perf_counter() - started:.2f}s; "
+                        f"fetched {(asset_stats['bytes_fetched'] - before['bytes_fetched']) / 1024:.0f} KB, "
+                        f"{(asset_stats['bytes_from_cache'] - before['bytes_from_cache']) / 1024:.0f} KB from asset cache"
+                    )
 
                     date_elements = await page.locator(".dateLabel").all()
                     for date_element in date_elements:
@@ -159,6 +178,7 @@ class TinyTicketCrawler(BaseCrawler):
                                 
                 except Exception as e:
                     print(f"Error processing theater {theater.name}: {e}")
+                    self.record_failure(theater.cinema_code, e)
                     continue
 
             await browser.close()
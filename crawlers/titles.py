@@ -0,0 +1,105 @@
+"""
+Title normalization shared by the TMDB updater and crawl-side title handling.
+"""
+import re
+import unicodedata
+
+EDITION_SUFFIX_PATTERN = r"(?:특별판|무삭제판|극장판|감독판|디렉터스\s*컷|director['’]s\s*cut)"
+FORMAT_SUFFIX_PATTERN = r"(?:2d|3d|4k|8k|35mm|70mm|16mm|imax|dolby|atmos|자막|더빙|리마스터링|디지털복원|배리어프리(?:\s*버전)?|영문자막|한글자막)"
+EVENT_REGEX_FRAGMENTS = (
+    r"g\s*[.]?\s*v\s*[.]?",
+    r"시네토크",
+    r"씨네토크",
+    r"인디토크",
+    r"무대인사",
+    r"영화소개",
+    r"관객과의\s*대화",
+    r"q\s*&\s*a",
+    r"q\s*n\s*a",
+    r"qna",
+    r"강연",
+    r"강의",
+    r"대담",
+    r"좌담",
+    r"스페셜\s*토크",
+    r"토크",
+    r"포럼",
+    r"라이브\s*스크리닝",
+    r"시사회",
+    r"상영\s*후",
+    r"섹션\s*\d+",
+)
+EVENT_MARKER_PATTERN = r"(?:%s)" % "|".join(EVENT_REGEX_FRAGMENTS)
+PLUS_EVENT_SUFFIX_RE = re.compile(
+    r"\s*\+\s*%s.*$" % EVENT_MARKER_PATTERN,
+    flags=re.IGNORECASE,
+)
+TRAILING_EVENT_PAREN_RE = re.compile(
+    r"\s*\((?=[^)]*%s)[^)]*\)\s*$" % EVENT_MARKER_PATTERN,
+    flags=re.IGNORECASE,
+)
+EDITION_SUFFIX_RE = re.compile(
+    r"\s*%s\s*$" % EDITION_SUFFIX_PATTERN,
+    flags=re.IGNORECASE,
+)
+FORMAT_SUFFIX_RE = re.compile(
+    r"\s*(?:%s\s*)+$" % FORMAT_SUFFIX_PATTERN,
+    flags=re.IGNORECASE,
+)
+YEAR_PAREN_RE = re.compile(r"\(\s*((?:19|20)\d{2})\s*\)")
+ANY_PAREN_RE = re.compile(r"\([^)]*\)")
+ANY_BRACKET_RE = re.compile(r"\[[^]]*\]")
+
+
+def normalize_for_match(value: str) -> str:
+    # NFKC folds full-width forms and composes accents so they survive as letters.
+    value = clean_title_core(unicodedata.normalize("NFKC", value or ""))
+    # Letters and digits of any script (Hangul, accented Latin, kana, ...) are kept.
+    value = re.sub(r"[\W_]", " ", value)
+    value = re.sub(r"\s+", " ", value)
+    return value.strip()
+
+
+def contains_event_keyword(value: str) -> bool:
+    return bool(re.search(EVENT_MARKER_PATTERN, value, flags=re.IGNORECASE))
+
+
+def strip_plus_event_suffix(value: str) -> str:
+    return PLUS_EVENT_SUFFIX_RE.sub("", value).strip()
+
+
+def trim_edition_suffix(value: str) -> str:
+    return EDITION_SUFFIX_RE.sub("", value).strip()
+
+
+def trim_format_suffix(value: str) -> str:
+    return FORMAT_SUFFIX_RE.sub("", value).strip()
+
+
+def strip_parentheses_and_brackets(value: str) -> str:
+    # Keep year-only tags like "(1980)" as plain "1980", then drop all other (...) and [...].
+    cleaned = YEAR_PAREN_RE.sub(r" \1 ", value)
+    cleaned = ANY_PAREN_RE.sub(" ", cleaned)
+    cleaned = ANY_BRACKET_RE.sub(" ", cleaned)
+    return cleaned.strip()
+
+
+def clean_title_core(value: str, *, lower: bool = True) -> str:
+    cleaned = (value or "").strip()
+    if lower:
+        cleaned = cleaned.lower()
+    cleaned = strip_plus_event_suffix(cleaned)
+    cleaned = TRAILING_EVENT_PAREN_RE.sub("", cleaned).strip()
+    cleaned = strip_parentheses_and_brackets(cleaned)
+    cleaned = trim_edition_suffix(cleaned)
+    cleaned = trim_format_suffix(cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    return cleaned
+
+
+def char_ngrams(value: str, n: int = 3) -> set[str]:
+    """Character n-grams of a normalized title, ignoring spaces."""
+    compact = value.replace(" ", "")
+    if len(compact) <= n:
+        return {compact} if compact else set()
+    return {compact[i: i + n] for i in range(len(compact) - n + 1)}
@@ -0,0 +1,144 @@
+"""
+Offline TMDB title index built from a TMDB daily ID export.
+
+TMDB publishes `movie_ids_MM_DD_YYYY.json.gz` under http://files.tmdb.org/p/exports/,
+one JSON object per line:
+    {"adult": false, "id": 3924, "original_title": "Blondie", "popularity": 2.4, "video": false}
+
+The index keeps a normalized-title -> rows map for exact hits and a character
+n-gram inverted index for fuzzy shortlists, so the updater only needs the API to
+confirm a shortlisted id instead of running every `search/movie` variant.
+
+Local check:
+    python -m crawlers.tmdb_index movie_ids.json.gz "헤어질 결심" "Decision to Leave"
+"""
+import gzip
+import json
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+
+try:
+    from titles import char_ngrams, normalize_for_match
+except ModuleNotFoundError:
+    from crawlers.titles import char_ngrams, normalize_for_match
+
+
+class TMDBTitleIndex:
+    def __init__(self, ngram_size: int = 3):
+        self.ngram_size = ngram_size
+        self._ids = array("l")
+        self._popularity = array("f")
+        self._ngram_counts = array("H")
+        self._titles: list[str] = []
+        self._by_title: dict[str, array] = {}
+        self._by_ngram: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @classmethod
+    def from_export(
+        cls,
+        path: str | Path,
+        *,
+        min_popularity: float = 0.0,
+        include_adult: bool = False,
+        ngram_size: int = 3,
+    ) -> "TMDBTitleIndex":
+        """Build an index from a (optionally gzipped) TMDB movie id export."""
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        index = cls(ngram_size=ngram_size)
+        with opener(path, "rt", encoding="utf-8") as fp:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if row.get("adult") and not include_adult:
+                    continue
+                if row.get("video"):
+                    continue
+                popularity = float(row.get("popularity") or 0.0)
+                if popularity < min_popularity:
+                    continue
+                index.add(row.get("id"), row.get("original_title") or "", popularity)
+        return index
+
+    def add(self, tmdb_id: int | None, title: str, popularity: float = 0.0) -> None:
+        normalized = normalize_for_match(title)
+        if tmdb_id is None or not normalized:
+            return
+        row = len(self._ids)
+        grams = char_ngrams(normalized, self.ngram_size)
+        self._ids.append(int(tmdb_id))
+        self._popularity.append(popularity)
+        self._ngram_counts.append(min(len(grams), 0xFFFF))
+        self._titles.append(title)
+        self._by_title.setdefault(normalized, array("I")).append(row)
+        for gram in grams:
+            self._by_ngram.setdefault(gram, array("I")).append(row)
+
+    def _hit(self, row: int, similarity: float) -> dict:
+        return {
+            "id": self._ids[row],
+            "original_title": self._titles[row],
+            "popularity": round(float(self._popularity[row]), 3),
+            "similarity": similarity,
+        }
+
+    def lookup(
+        self,
+        title: str,
+        *,
+        limit: int = 3,
+        min_similarity: float = 0.6,
+        max_posting: int = 50_000,
+    ) -> list[dict]:
+        """
+        Shortlist TMDB ids for a title, best first.
+        Exact normalized-title hits win; otherwise rows are ranked by Dice similarity
+        of character n-grams. N-grams with postings longer than `max_posting` are
+        skipped so very common fragments cannot blow up the scan.
+        """
+        normalized = normalize_for_match(title)
+        if not normalized:
+            return []
+
+        exact_rows = self._by_title.get(normalized)
+        if exact_rows:
+            rows = sorted(exact_rows, key=lambda r: self._popularity[r], reverse=True)
+            return [self._hit(row, 1.0) for row in rows[:limit]]
+
+        grams = char_ngrams(normalized, self.ngram_size)
+        if not grams:
+            return []
+        shared: Counter = Counter()
+        for gram in grams:
+            posting = self._by_ngram.get(gram)
+            if posting is None or len(posting) > max_posting:
+                continue
+            shared.update(posting)
+
+        scored = []
+        for row, count in shared.items():
+            similarity = 2.0 * count / (len(grams) + self._ngram_counts[row])
+            if similarity >= min_similarity:
+                scored.append((similarity, self._popularity[row], row))
+        scored.sort(reverse=True)
+        return [self._hit(row, round(similarity, 3)) for similarity, _, row in scored[:limit]]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python -m crawlers.tmdb_index <export.json[.gz]> <title> [<title> ...]")
+        sys.exit(1)
+    built = TMDBTitleIndex.from_export(sys.argv[1])
+    print(f"Indexed {len(built)} titles")
+    for query in sys.argv[2:]:
+        print(query, "->", built.lookup(query))
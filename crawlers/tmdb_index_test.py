@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from crawlers.tmdb_index import TMDBTitleIndex
+
+FIXTURE = Path(__file__).parent / "fixtures" / "tmdb_movie_ids_sample.json"
+
+
+def test_from_export_skips_adult_video_blank_and_bad_lines():
+    index = TMDBTitleIndex.from_export(FIXTURE)
+    assert len(index) == 6
+    assert [hit["id"] for hit in index.lookup("기생충")] == [496243]
+
+
+def test_exact_title_hits_rank_by_popularity():
+    index = TMDBTitleIndex.from_export(FIXTURE)
+    assert index.lookup("John Wick : Chapter 4 (IMAX)") == [
+        {"id": 603692, "original_title": "John Wick: Chapter 4", "popularity": 95.0, "similarity": 1.0},
+        {"id": 999001, "original_title": "John Wick: Chapter 4", "popularity": 0.4, "similarity": 1.0},
+    ]
+
+
+def test_ngram_shortlist_for_variant_spelling():
+    index = TMDBTitleIndex.from_export(FIXTURE)
+    hits = index.lookup("헤어질 결심 2")
+    assert hits[0]["id"] == 705996
+    assert 0.6 <= hits[0]["similarity"] < 1.0
+    assert index.lookup("전혀 다른 영화") == []
+
+
+def test_non_hangul_letters_are_indexed():
+    index = TMDBTitleIndex.from_export(FIXTURE)
+    assert index.lookup("千と千尋の神隠し")[0]["id"] == 129
+    assert index.lookup("Le Fabuleux Destin d’Amélie Poulain")[0]["id"] == 194
+
+
+def test_min_popularity_drops_rows():
+    index = TMDBTitleIndex.from_export(FIXTURE, min_popularity=1.0)
+    assert [hit["id"] for hit in index.lookup("John Wick: Chapter 4")] == [603692]
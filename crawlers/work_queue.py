@@ -0,0 +1,523 @@
+"""
+Work-queue crawl: split a crawl into serializable units any number of workers
+can lease, crawl and complete.
+
+A WorkUnit is (chain, cinema_code, start_date, days). Date-addressable chains
+get one unit per theater and date; chains whose crawl always covers its full
+window (CGV, KOFA, TinyTicket) get one whole-window unit per theater, or a
+single unit with cinema_code None when they have no theater list.
+
+Queue semantics, shared by every backend:
+    publish   add units as pending; finished (done/dead) units are re-queued
+    lease     hand out up to `limit` pending or lease-expired units under a new
+              lease token, hidden from other workers for `visibility_timeout`
+    extend    push a held lease's expiry out (heartbeat)
+    complete  store the unit's result, keyed by unit id, if the token still holds
+    fail      make the unit visible again right away, or dead after max_attempts
+A worker whose lease expired cannot complete or fail the unit any more; the
+screenings it already wrote are upserts on the conflict key, so the re-crawl by
+the next lease holder is harmless.
+"""
+import abc
+import asyncio
+import contextlib
+import datetime as dt
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Type
+
+from crawlers.cinema_registry import CinemaRegistry
+from models import Cinema, ScreeningBatch
+
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+UNIT_STATES = ("pending", "leased", "done", "dead")
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    chain: str
+    cinema_code: Optional[str]  # None = the chain's whole window
+    start_date: str
+    days: int = 1
+
+    @property
+    def unit_id(self) -> str:
+        return f"{self.chain}:{self.cinema_code or '*'}:{self.start_date}:{self.days}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, payload: "str | dict[str, Any]") -> "WorkUnit":
+        data = json.loads(payload) if isinstance(payload, str) else payload
+        return cls(
+            chain=data["chain"],
+            cinema_code=data.get("cinema_code"),
+            start_date=data["start_date"],
+            days=int(data.get("days", 1)),
+        )
+
+
+@dataclass(frozen=True)
+class Lease:
+    unit: WorkUnit
+    token: str
+    attempts: int
+
+
+def plan_units(
+    chain: str,
+    theaters: list[Cinema],
+    date_addressable: bool,
+    start_date: dt.date,
+    days: int,
+) -> list[WorkUnit]:
+    if not date_addressable:
+        # The chain always crawls its whole window, so split by theater only.
+        if not theaters:
+            return [WorkUnit(chain, None, start_date.isoformat(), days)]
+        return [WorkUnit(chain, theater.cinema_code, start_date.isoformat(), days) for theater in theaters]
+    return [
+        WorkUnit(chain, theater.cinema_code, (start_date + dt.timedelta(days=offset)).isoformat(), 1)
+        for offset in range(days)
+        for theater in theaters
+    ]
+
+
+class WorkQueue(abc.ABC):
+    name: str
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+
+    @abc.abstractmethod
+    def publish(self, units: Iterable[WorkUnit]) -> int:
+        """Queue units. Returns how many became pending."""
+
+    @abc.abstractmethod
+    def lease(self, worker: str, limit: int = 1, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> list[Lease]:
+        ...
+
+    @abc.abstractmethod
+    def extend(self, lease: Lease, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def complete(self, lease: Lease, result: dict[str, Any]) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def fail(self, lease: Lease, error: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def counts(self) -> dict[str, int]:
+        """Units per state."""
+
+    @abc.abstractmethod
+    def results(self) -> dict[str, dict[str, Any]]:
+        """unit id -> result of the last completion."""
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryWorkQueue(WorkQueue):
+    """In-process queue for local runs and tests; workers are tasks or threads."""
+
+    name = "memory"
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        super().__init__(max_attempts)
+        self._units: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, units: Iterable[WorkUnit]) -> int:
+        queued = 0
+        with self._lock:
+            for unit in units:
+                record = self._units.get(unit.unit_id)
+                if record is not None and record["state"] in ("pending", "leased"):
+                    continue
+                self._units[unit.unit_id] = {
+                    "unit": unit, "state": "pending", "token": None, "lease_until": 0.0,
+                    "attempts": 0, "error": None, "result": record["result"] if record else None,
+                }
+                queued += 1
+        return queued
+
+    def lease(self, worker: str, limit: int = 1, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> list[Lease]:
+        now = time.time()
+        leases = []
+        with self._lock:
+            for record in self._units.values():
+                if len(leases) >= limit:
+                    break
+                if record["state"] == "pending" or (record["state"] == "leased" and record["lease_until"] <= now):
+                    if record["attempts"] >= self.max_attempts:
+                        record["state"] = "dead"
+                        record["error"] = record["error"] or "lease expired"
+                        continue
+                    record.update(
+                        state="leased", token=uuid.uuid4().hex, lease_until=now + visibility_timeout,
+                        attempts=record["attempts"] + 1, worker=worker,
+                    )
+                    leases.append(Lease(record["unit"], record["token"], record["attempts"]))
+        return leases
+
+    def _held(self, lease: Lease) -> Optional[dict[str, Any]]:
+        record = self._units.get(lease.unit.unit_id)
+        if record is None or record["state"] != "leased" or record["token"] != lease.token:
+            return None
+        return record
+
+    def extend(self, lease: Lease, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        with self._lock:
+            record = self._held(lease)
+            if record is None:
+                return False
+            record["lease_until"] = time.time() + visibility_timeout
+            return True
+
+    def complete(self, lease: Lease, result: dict[str, Any]) -> bool:
+        with self._lock:
+            record = self._held(lease)
+            if record is None:
+                return False
+            record.update(state="done", token=None, result=result, error=None)
+            return True
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        with self._lock:
+            record = self._held(lease)
+            if record is None:
+                return False
+            state = "dead" if record["attempts"] >= self.max_attempts else "pending"
+            record.update(state=state, token=None, lease_until=0.0, error=error)
+            return True
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            counts = Counter(record["state"] for record in self._units.values())
+        return {state: counts.get(state, 0) for state in UNIT_STATES}
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {uid: r["result"] for uid, r in self._units.items() if r["result"] is not None}
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    One SQLite file shared by worker processes on a host. Leasing runs in a
+    BEGIN IMMEDIATE transaction, so two workers never get the same unit.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str | Path = "crawl_work_units.sqlite3", max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        super().__init__(max_attempts)
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_units ("
+            "unit_id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL, "
+            "lease_token TEXT, lease_until REAL NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0, "
+            "worker TEXT, error TEXT, result TEXT, updated_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS work_units_state_idx ON work_units (state, lease_until)")
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def publish(self, units: Iterable[WorkUnit]) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO work_units (unit_id, payload, state, updated_at) VALUES (?, ?, 'pending', ?) "
+                "ON CONFLICT (unit_id) DO UPDATE SET state = 'pending', lease_token = NULL, lease_until = 0, "
+                "attempts = 0, error = NULL, updated_at = excluded.updated_at "
+                "WHERE work_units.state IN ('done', 'dead')",
+                [(unit.unit_id, unit.to_json(), now) for unit in units],
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker: str, limit: int = 1, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> list[Lease]:
+        now = time.time()
+        leases = []
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE work_units SET state = 'dead', error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE attempts >= ? AND (state = 'pending' OR (state = 'leased' AND lease_until <= ?))",
+                (now, self.max_attempts, now),
+            )
+            rows = conn.execute(
+                "SELECT unit_id, payload, attempts FROM work_units "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_until <= ?) ORDER BY rowid LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for unit_id, payload, attempts in rows:
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE work_units SET state = 'leased', lease_token = ?, lease_until = ?, "
+                    "attempts = attempts + 1, worker = ?, updated_at = ? WHERE unit_id = ?",
+                    (token, now + visibility_timeout, worker, now, unit_id),
+                )
+                leases.append(Lease(WorkUnit.from_json(payload), token, attempts + 1))
+        return leases
+
+    def _update_held(self, lease: Lease, assignments: str, params: tuple) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE work_units SET {assignments}, updated_at = ? "
+                "WHERE unit_id = ? AND state = 'leased' AND lease_token = ?",
+                (*params, time.time(), lease.unit.unit_id, lease.token),
+            )
+            return cursor.rowcount == 1
+
+    def extend(self, lease: Lease, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        return self._update_held(lease, "lease_until = ?", (time.time() + visibility_timeout,))
+
+    def complete(self, lease: Lease, result: dict[str, Any]) -> bool:
+        return self._update_held(
+            lease, "state = 'done', lease_token = NULL, error = NULL, result = ?", (json.dumps(result),)
+        )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        return self._update_held(
+            lease,
+            "state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+            "lease_token = NULL, lease_until = 0, error = ?",
+            (self.max_attempts, error),
+        )
+
+    def counts(self) -> dict[str, int]:
+        counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM work_units GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in UNIT_STATES}
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        rows = self.conn.execute("SELECT unit_id, result FROM work_units WHERE result IS NOT NULL").fetchall()
+        return {unit_id: json.loads(result) for unit_id, result in rows}
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class SupabaseWorkQueue(WorkQueue):
+    """
+    `crawl_work_units` table shared by concurrent Lambda workers. Publishing and
+    leasing go through the `publish_crawl_units` / `lease_crawl_units` RPCs
+    (FOR UPDATE SKIP LOCKED); lease-holder checks are conditional updates.
+    """
+
+    name = "supabase"
+    table = "crawl_work_units"
+
+    def __init__(self, supabase, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        super().__init__(max_attempts)
+        self.supabase = supabase
+
+    def publish(self, units: Iterable[WorkUnit]) -> int:
+        payload = [{"unit_id": unit.unit_id, "payload": asdict(unit)} for unit in units]
+        if not payload:
+            return 0
+        response = self.supabase.client.rpc("publish_crawl_units", {"units": payload}).execute()
+        return int(response.data or 0)
+
+    def lease(self, worker: str, limit: int = 1, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> list[Lease]:
+        response = self.supabase.client.rpc(
+            "lease_crawl_units",
+            {
+                "worker": worker,
+                "lease_limit": limit,
+                "visibility_seconds": visibility_timeout,
+                "max_attempts": self.max_attempts,
+            },
+        ).execute()
+        return [
+            Lease(WorkUnit.from_json(row["payload"]), row["lease_token"], row["attempts"])
+            for row in response.data or []
+        ]
+
+    def _update_held(self, lease: Lease, values: dict[str, Any]) -> bool:
+        response = (
+            self.supabase.client.table(self.table)
+            .update({**values, "updated_at": dt.datetime.utcnow().isoformat()})
+            .eq("unit_id", lease.unit.unit_id)
+            .eq("state", "leased")
+            .eq("lease_token", lease.token)
+            .execute()
+        )
+        return bool(response.data)
+
+    def extend(self, lease: Lease, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        until = dt.datetime.utcnow() + dt.timedelta(seconds=visibility_timeout)
+        return self._update_held(lease, {"lease_until": until.isoformat()})
+
+    def complete(self, lease: Lease, result: dict[str, Any]) -> bool:
+        return self._update_held(lease, {"state": "done", "lease_token": None, "error": None, "result": result})
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        state = "dead" if lease.attempts >= self.max_attempts else "pending"
+        return self._update_held(
+            lease, {"state": state, "lease_token": None, "lease_until": dt.datetime.utcnow().isoformat(), "error": error}
+        )
+
+    def counts(self) -> dict[str, int]:
+        counts = Counter(row["state"] for row in self.supabase.iter_rows(self.table, "state", order_by="unit_id"))
+        return {state: counts.get(state, 0) for state in UNIT_STATES}
+
+    def results(self) -> dict[str, dict[str, Any]]:
+        return {
+            row["unit_id"]: row["result"]
+            for row in self.supabase.iter_rows(self.table, "unit_id, result", order_by="unit_id")
+            if row["result"] is not None
+        }
+
+
+WORK_QUEUES: dict[str, Type[WorkQueue]] = {
+    InMemoryWorkQueue.name: InMemoryWorkQueue,
+    SQLiteWorkQueue.name: SQLiteWorkQueue,
+    SupabaseWorkQueue.name: SupabaseWorkQueue,
+}
+
+
+def get_work_queue(name: str, *, supabase=None, path: str | None = None) -> WorkQueue:
+    """Build a work queue by name. `path` applies to SQLite, `supabase` to the Supabase queue."""
+    queue_class = WORK_QUEUES.get(name)
+    if not queue_class:
+        raise ValueError(f"Unknown work queue: {name} (expected one of {sorted(WORK_QUEUES)})")
+    if queue_class is SupabaseWorkQueue:
+        if supabase is None:
+            raise ValueError("The supabase work queue needs a SupabaseClient")
+        return SupabaseWorkQueue(supabase)
+    if queue_class is SQLiteWorkQueue and path:
+        return SQLiteWorkQueue(path)
+    return queue_class()
+
+
+def group_units(units: Iterable[WorkUnit]) -> list[list[WorkUnit]]:
+    """
+    Units that can share one crawl: theater units of the same chain and date
+    range go together, whole-window units stay on their own.
+    """
+    groups: dict[tuple, list[WorkUnit]] = {}
+    for unit in units:
+        alone = unit.unit_id if unit.cinema_code is None else None
+        groups.setdefault((unit.chain, unit.start_date, unit.days, alone), []).append(unit)
+    return list(groups.values())
+
+
+def group_theaters(registry: CinemaRegistry, group: list[WorkUnit]) -> list[Cinema]:
+    """Theaters to crawl for one group from `group_units`."""
+    chain = group[0].chain
+    if group[0].cinema_code is None:
+        return registry.for_chain(chain)
+    theaters = (registry.get(chain, unit.cinema_code) for unit in group)
+    return [theater for theater in theaters if theater is not None]
+
+
+def unit_row_counts(unit: WorkUnit, batch: ScreeningBatch) -> int:
+    """Rows of `batch` belonging to `unit`."""
+    if unit.cinema_code is None:
+        return len(batch)
+    first = dt.date.fromisoformat(unit.start_date)
+    play_dates = {(first + dt.timedelta(days=offset)).isoformat() for offset in range(unit.days)}
+    return sum(
+        count
+        for (cinema_code, play_date), count in batch.distinct(("cinema_code", "play_date")).items()
+        if cinema_code == unit.cinema_code and play_date in play_dates
+    )
+
+
+async def run_worker(
+    queue: WorkQueue,
+    crawler_for: Callable[[str], Any],
+    sink,
+    *,
+    worker: Optional[str] = None,
+    supabase=None,
+    batch_size: int = 10,
+    visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+    deadline: Optional[float] = None,
+) -> dict[str, int]:
+    """
+    Lease units until the queue is drained or `deadline` (time.monotonic())
+    passes. Leased units of one chain and date range are crawled together,
+    written to `sink`, then completed with their row counts.
+    """
+    worker = worker or f"worker-{uuid.uuid4().hex[:8]}"
+    registry = CinemaRegistry.shared(supabase)
+    crawlers: dict[str, Any] = {}
+    stats = Counter()
+
+    async def heartbeat(leases: list[Lease]) -> None:
+        while True:
+            await asyncio.sleep(visibility_timeout / 3)
+            for lease in leases:
+                queue.extend(lease, visibility_timeout)
+
+    while deadline is None or time.monotonic() < deadline:
+        leases = queue.lease(worker, batch_size, visibility_timeout)
+        if not leases:
+            break
+        by_id = {lease.unit.unit_id: lease for lease in leases}
+        for units in group_units(lease.unit for lease in leases):
+            group = [by_id[unit.unit_id] for unit in units]
+            chain, start_date, days = units[0].chain, units[0].start_date, units[0].days
+            keepalive = asyncio.create_task(heartbeat(group))
+            try:
+                crawler = crawlers.get(chain)
+                if crawler is None:
+                    crawler = crawlers[chain] = crawler_for(chain)
+                crawler.theaters = group_theaters(registry, units)
+                crawler.take_failures()
+                batch = await crawler.run_batch(start_date=dt.date.fromisoformat(start_date), max_days=days)
+                sink.write(batch)
+            except Exception as e:
+                print(f"❌ {worker}: {chain} {start_date} ({len(group)} unit(s)) failed: {e}")
+                for lease in group:
+                    queue.fail(lease, str(e))
+                stats["failed"] += len(group)
+                continue
+            finally:
+                keepalive.cancel()
+
+            # Theaters the crawler gave up on inside the crawl fail their unit
+            # (or the whole-window unit they belong to) instead of completing empty.
+            errors: dict[str, str] = {}
+            for failed, error in crawler.take_failures():
+                if units[0].cinema_code is None:
+                    errors.setdefault(units[0].unit_id, error)
+                    continue
+                last = (dt.date.fromisoformat(failed.start_date) + dt.timedelta(days=failed.days - 1)).isoformat()
+                for unit in units:
+                    if unit.cinema_code == failed.cinema_code and failed.start_date <= unit.start_date <= last:
+                        errors.setdefault(unit.unit_id, error)
+            finished_at = dt.datetime.utcnow().isoformat()
+            for lease in group:
+                if lease.unit.unit_id in errors:
+                    queue.fail(lease, errors[lease.unit.unit_id])
+                    stats["failed"] += 1
+                    continue
+                rows = unit_row_counts(lease.unit, batch)
+                if queue.complete(lease, {"rows": rows, "worker": worker, "finished_at": finished_at}):
+                    stats["completed"] += 1
+                    stats["rows"] += rows
+                else:
+                    stats["lease_lost"] += 1
+    return dict(stats)
@@ -0,0 +1,180 @@
+import asyncio
+import datetime as dt
+
+import pytest
+
+from crawlers.cinema_registry import CinemaRegistry
+from crawlers.work_queue import InMemoryWorkQueue, SQLiteWorkQueue, WorkUnit, plan_units, run_worker
+from models import Screening, ScreeningBatch
+
+START = dt.date(2026, 10, 19)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_queue(request, tmp_path):
+    queues = []
+
+    def make(max_attempts=3):
+        if request.param == "memory":
+            queue = InMemoryWorkQueue(max_attempts=max_attempts)
+        else:
+            queue = SQLiteWorkQueue(tmp_path / f"queue{len(queues)}.sqlite3", max_attempts=max_attempts)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def _units(count):
+    return [WorkUnit("Dtryx", f"T{n}", START.isoformat()) for n in range(count)]
+
+
+def test_plan_units_per_theater_and_date_or_whole_window():
+    theaters = CinemaRegistry.shared().for_chain("Dtryx")[:2]
+    units = plan_units("Dtryx", theaters, True, START, 3)
+    assert len(units) == 6 and {unit.days for unit in units} == {1}
+    whole = plan_units("CGV", theaters, False, START, 3)
+    assert [(unit.cinema_code, unit.days) for unit in whole] == [(t.cinema_code, 3) for t in theaters]
+    assert plan_units("KOFA", [], False, START, 3) == [WorkUnit("KOFA", None, START.isoformat(), 3)]
+
+
+def test_publish_skips_queued_units_and_requeues_finished_ones(make_queue):
+    queue = make_queue()
+    assert queue.publish(_units(3)) == 3
+    assert queue.publish(_units(3)) == 0
+    lease = queue.lease("w1")[0]
+    assert queue.complete(lease, {"rows": 4})
+    assert queue.publish(_units(3)) == 1
+    assert queue.results() == {lease.unit.unit_id: {"rows": 4}}
+
+
+def test_leased_units_are_hidden_until_the_lease_expires(make_queue):
+    queue = make_queue()
+    queue.publish(_units(3))
+    first = queue.lease("w1", limit=2, visibility_timeout=60)
+    second = queue.lease("w2", limit=2, visibility_timeout=60)
+    assert len(first) == 2 and len(second) == 1
+    assert not {lease.unit for lease in first} & {lease.unit for lease in second}
+    assert queue.lease("w3") == []
+    assert queue.counts()["leased"] == 3
+
+
+def test_expired_lease_is_reclaimed_and_the_old_token_loses_the_unit(make_queue):
+    queue = make_queue()
+    queue.publish(_units(1))
+    stale = queue.lease("w1", visibility_timeout=0)[0]
+    fresh = queue.lease("w2", visibility_timeout=60)[0]
+    assert fresh.unit == stale.unit and fresh.attempts == 2
+    assert not queue.extend(stale)
+    assert not queue.complete(stale, {"rows": 1})
+    assert not queue.fail(stale, "late")
+    assert queue.complete(fresh, {"rows": 2})
+    assert queue.counts()["done"] == 1
+
+
+def test_extend_keeps_the_unit_hidden(make_queue):
+    queue = make_queue()
+    queue.publish(_units(1))
+    lease = queue.lease("w1", visibility_timeout=0)[0]
+    assert queue.extend(lease, visibility_timeout=60)
+    assert queue.lease("w2") == []
+    assert queue.complete(lease, {"rows": 0})
+
+
+def test_fail_requeues_until_max_attempts_then_dead(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.publish(_units(1))
+    assert queue.fail(queue.lease("w1")[0], "boom")
+    assert queue.counts()["pending"] == 1
+    assert queue.fail(queue.lease("w1")[0], "boom")
+    assert queue.counts()["dead"] == 1
+    assert queue.lease("w1") == []
+
+
+def test_expired_lease_at_max_attempts_goes_dead(make_queue):
+    queue = make_queue(max_attempts=1)
+    queue.publish(_units(1))
+    queue.lease("w1", visibility_timeout=0)
+    assert queue.lease("w2") == []
+    assert queue.counts()["dead"] == 1
+
+
+class FakeCrawler:
+    """Two screenings per theater and date; `fail_code` is recorded as failed, `crash` raises."""
+
+    def __init__(self, fail_code=None, crash=False):
+        self.theaters = []
+        self.failures = []
+        self.fail_code = fail_code
+        self.crash = crash
+
+    def take_failures(self):
+        failures, self.failures = self.failures, []
+        return failures
+
+    async def run_batch(self, start_date, max_days):
+        if self.crash:
+            raise RuntimeError("site down")
+        batch = ScreeningBatch()
+        for offset in range(max_days):
+            play_date = (start_date + dt.timedelta(days=offset)).isoformat()
+            for theater in self.theaters:
+                if theater.cinema_code == self.fail_code:
+                    self.failures.append(
+                        (WorkUnit(theater.chain, theater.cinema_code, play_date, 1), "timeout")
+                    )
+                    continue
+                for start in ("10:00", "13:00"):
+                    batch.append(
+                        Screening(
+                            provider=theater.chain,
+                            cinema_name=theater.name,
+                            cinema_code=theater.cinema_code,
+                            screen_name="1관",
+                            movie_title="기생충",
+                            play_date=play_date,
+                            start_dt=start,
+                            end_dt="12:00",
+                            crawl_ts="2026-10-19T09:00:00",
+                        )
+                    )
+        return batch
+
+
+class ListSink:
+    def __init__(self):
+        self.rows = 0
+
+    def write(self, data):
+        self.rows += len(data)
+        return len(data)
+
+
+def test_run_worker_completes_units_with_row_counts_and_fails_recorded_theaters(make_queue):
+    theaters = CinemaRegistry.shared().for_chain("Dtryx")[:3]
+    queue = make_queue(max_attempts=1)
+    queue.publish(plan_units("Dtryx", theaters, True, START, 2))
+    sink = ListSink()
+
+    stats = asyncio.run(
+        run_worker(queue, lambda chain: FakeCrawler(fail_code=theaters[0].cinema_code), sink, batch_size=10)
+    )
+
+    assert stats == {"completed": 4, "rows": 8, "failed": 2}
+    assert sink.rows == 8
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 4, "dead": 2}
+    assert {result["rows"] for result in queue.results().values()} == {2}
+
+
+def test_run_worker_fails_the_whole_group_when_the_crawl_raises(make_queue):
+    theaters = CinemaRegistry.shared().for_chain("Dtryx")[:2]
+    queue = make_queue(max_attempts=2)
+    queue.publish(plan_units("Dtryx", theaters, True, START, 1))
+
+    stats = asyncio.run(run_worker(queue, lambda chain: FakeCrawler(crash=True), ListSink(), batch_size=10))
+
+    # Each unit is leased again after its first failure, then goes dead.
+    assert stats == {"failed": 4}
+    assert queue.counts()["dead"] == 2
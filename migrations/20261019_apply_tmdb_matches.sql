@@ -0,0 +1,37 @@
+-- Batched TMDB write-back used by crawlers/poster_updater.py (apply_tmdb_updates).
+-- Applies each match with the same guards as the single-row update:
+--   * only rows whose tmdb_id is still null
+--   * never rows with tmdb_locked = true
+--   * unique-index conflicts on tmdb_id skip the row instead of failing the batch
+-- Returns the ids of rows that were actually updated.
+
+create or replace function apply_tmdb_matches(matches jsonb)
+returns setof bigint
+language plpgsql
+as $$
+declare
+  m jsonb;
+begin
+  for m in select * from jsonb_array_elements(matches) loop
+    begin
+      return query
+      update movies mv
+      set
+        tmdb_id          = (m->>'tmdb_id')::bigint,
+        poster_url       = coalesce(m->>'poster_url', mv.poster_url),
+        original_title   = coalesce(m->>'original_title', mv.original_title),
+        release_date     = coalesce(nullif(m->>'release_date', '')::date, mv.release_date),
+        tmdb_language    = coalesce(m->>'tmdb_language', mv.tmdb_language),
+        tmdb_match_score = coalesce((m->>'tmdb_match_score')::double precision, mv.tmdb_match_score),
+        updated_at       = coalesce((m->>'updated_at')::timestamptz, now())
+      where mv.id = (m->>'id')::bigint
+        and mv.tmdb_id is null
+        and coalesce(mv.tmdb_locked, false) = false
+      returning mv.id;
+    exception when unique_violation then
+      raise notice 'apply_tmdb_matches: tmdb_id % already linked, skipping movie id=%',
+        m->>'tmdb_id', m->>'id';
+    end;
+  end loop;
+end;
+$$;
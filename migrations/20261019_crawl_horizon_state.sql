@@ -0,0 +1,10 @@
+-- Persisted crawler state documents (crawlers/state_store.py SupabaseStateStore), one row per name:
+--   "default"      tiered horizon: {"runs": <invocation counter>, "last_crawled": {"<chain>:<first>-<last>": "<utc iso>"}}
+--   "revisit"      revisit scheduler: per-theater fingerprints and change counts (crawlers/revisit.py)
+--   "failed_units" failure ledger: {"units": [...]} (crawlers/failure_ledger.py)
+
+create table if not exists crawl_horizon_state (
+  name       text primary key,
+  state      jsonb not null default '{}'::jsonb,
+  updated_at timestamptz not null default now()
+);
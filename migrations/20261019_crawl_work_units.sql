@@ -0,0 +1,82 @@
+-- Work-queue crawl (crawlers/work_queue.py SupabaseWorkQueue, lambda "mode": "publish" / "worker").
+-- One row per work unit; unit_id = "<chain>:<cinema_code or *>:<start_date>:<days>".
+-- Results are keyed by unit_id, so a re-crawled unit overwrites its previous result.
+
+create table if not exists crawl_work_units (
+  unit_id     text primary key,
+  payload     jsonb not null,
+  state       text not null default 'pending' check (state in ('pending', 'leased', 'done', 'dead')),
+  lease_token text,
+  lease_until timestamptz not null default now(),
+  attempts    integer not null default 0,
+  worker      text,
+  error       text,
+  result      jsonb,
+  created_at  timestamptz not null default now(),
+  updated_at  timestamptz not null default now()
+);
+
+create index if not exists crawl_work_units_ready_idx
+  on crawl_work_units (state, lease_until)
+  where state in ('pending', 'leased');
+
+-- units = [{"unit_id": ..., "payload": {...}}]; finished units are re-queued,
+-- pending or leased ones are left alone. Returns the number queued.
+create or replace function publish_crawl_units(units jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  insert into crawl_work_units as w (unit_id, payload)
+  select u->>'unit_id', u->'payload'
+  from jsonb_array_elements(units) as u
+  on conflict (unit_id) do update
+    set state = 'pending', lease_token = null, lease_until = now(), attempts = 0,
+        error = null, updated_at = now()
+    where w.state in ('done', 'dead');
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
+
+-- Leases up to lease_limit pending or lease-expired units to one worker.
+-- SKIP LOCKED lets concurrent workers lease disjoint units.
+create or replace function lease_crawl_units(
+  worker text,
+  lease_limit integer,
+  visibility_seconds double precision,
+  max_attempts integer
+)
+returns table (unit_id text, payload jsonb, lease_token text, attempts integer)
+language plpgsql
+as $$
+begin
+  update crawl_work_units w
+  set state = 'dead', error = coalesce(w.error, 'lease expired'), updated_at = now()
+  where w.attempts >= max_attempts
+    and (w.state = 'pending' or (w.state = 'leased' and w.lease_until <= now()));
+
+  return query
+  with ready as (
+    select w.unit_id
+    from crawl_work_units w
+    where w.state = 'pending' or (w.state = 'leased' and w.lease_until <= now())
+    order by w.created_at, w.unit_id
+    limit lease_limit
+    for update skip locked
+  )
+  update crawl_work_units w
+  set state = 'leased',
+      lease_token = md5(random()::text || clock_timestamp()::text),
+      lease_until = now() + make_interval(secs => visibility_seconds),
+      attempts = w.attempts + 1,
+      worker = lease_crawl_units.worker,
+      updated_at = now()
+  from ready
+  where w.unit_id = ready.unit_id
+  returning w.unit_id, w.payload, w.lease_token, w.attempts;
+end;
+$$;
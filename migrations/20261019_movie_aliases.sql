@@ -0,0 +1,20 @@
+-- Crawled movie spellings resolved to existing movies rows at ingest
+-- (crawlers/movie_identity.py). Screenings keep their crawled movie_title;
+-- this table maps (provider, movie_title, source_movie_code) to a movie id.
+-- method is how the match was made: 'code' (source code + similar title),
+-- 'title' (normalized title) or 'ngram' (similarity); only 'code' is exact.
+-- The TMDB updater (crawlers/poster_updater.py merge_aliased_movies) merges
+-- unlinked movies rows whose title has a 'code' or 'title' alias to a movie
+-- that already has a tmdb_id, instead of searching TMDB for them again.
+
+create table if not exists movie_aliases (
+  provider          text not null,
+  movie_title       text not null,
+  source_movie_code text not null default '',
+  movie_id          bigint not null references movies (id) on delete cascade,
+  method            text not null check (method in ('code', 'title', 'ngram')),
+  resolved_at       timestamptz not null default now(),
+  primary key (provider, movie_title, source_movie_code)
+);
+
+create index if not exists movie_aliases_movie_id_idx on movie_aliases (movie_id);
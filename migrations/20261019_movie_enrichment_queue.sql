@@ -0,0 +1,17 @@
+-- Delta queue between the crawler and the TMDB updater (crawlers/enrichment_queue.py).
+-- One row per distinct (provider, normalized title, source code) ever crawled;
+-- rows with processed_at = null are pending enrichment.
+
+create table if not exists movie_enrichment_queue (
+  provider          text not null,
+  normalized_title  text not null,
+  source_movie_code text not null default '',
+  movie_title       text not null,
+  first_seen_at     timestamptz not null default now(),
+  processed_at      timestamptz,
+  primary key (provider, normalized_title, source_movie_code)
+);
+
+create index if not exists movie_enrichment_queue_pending_idx
+  on movie_enrichment_queue (first_seen_at)
+  where processed_at is null;
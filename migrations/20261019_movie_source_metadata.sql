@@ -0,0 +1,78 @@
+-- Carry crawler metadata (source_year, source_director, source_movie_code) from
+-- screenings onto movies so the TMDB updater can narrow searches by year and
+-- break ties by director (crawlers/poster_updater.py MOVIE_COLUMNS).
+
+alter table movies add column if not exists source_year integer;
+alter table movies add column if not exists source_director text;
+alter table movies add column if not exists source_movie_code text;
+
+-- Backfill from existing screenings.
+update movies m
+set
+  source_year       = coalesce(m.source_year, s.source_year),
+  source_director   = coalesce(m.source_director, s.source_director),
+  source_movie_code = coalesce(m.source_movie_code, s.source_movie_code)
+from (
+  select distinct on (movie_title)
+    movie_title, source_year, source_director, source_movie_code
+  from screenings
+  where source_year is not null
+     or source_director is not null
+     or source_movie_code is not null
+  order by movie_title, crawl_ts desc
+) s
+where m.title = s.movie_title
+  and (m.source_year is null or m.source_director is null or m.source_movie_code is null);
+
+-- Keep new rows filled as crawls arrive. Statement-level triggers read the
+-- upserted batch through a transition table and update movies once per
+-- distinct title, not once per screening row. Within a batch the latest year
+-- and director win and the most frequent source code wins, so the result does
+-- not depend on row order; only movies still missing a field are touched.
+-- (Transition tables cannot be combined with an UPDATE OF column list, hence
+-- one function body per event and no column filter.)
+create or replace function carry_screening_source_metadata()
+returns trigger
+language plpgsql
+as $$
+begin
+  update movies m
+  set
+    source_year       = coalesce(m.source_year, s.source_year),
+    source_director   = coalesce(m.source_director, s.source_director),
+    source_movie_code = coalesce(m.source_movie_code, s.source_movie_code)
+  from (
+    select
+      movie_title,
+      (array_agg(source_year order by crawl_ts desc) filter (where source_year is not null))[1] as source_year,
+      (array_agg(source_director order by crawl_ts desc) filter (where source_director is not null))[1] as source_director,
+      mode() within group (order by source_movie_code) as source_movie_code
+    from new_screenings
+    where source_year is not null
+       or source_director is not null
+       or source_movie_code is not null
+    group by movie_title
+  ) s
+  where m.title = s.movie_title
+    and (
+      (m.source_year is null and s.source_year is not null)
+      or (m.source_director is null and s.source_director is not null)
+      or (m.source_movie_code is null and s.source_movie_code is not null)
+    );
+  return null;
+end;
+$$;
+
+drop trigger if exists screenings_carry_source_metadata on screenings;
+drop trigger if exists screenings_carry_source_metadata_insert on screenings;
+drop trigger if exists screenings_carry_source_metadata_update on screenings;
+
+create trigger screenings_carry_source_metadata_insert
+after insert on screenings
+referencing new table as new_screenings
+for each statement execute function carry_screening_source_metadata();
+
+create trigger screenings_carry_source_metadata_update
+after update on screenings
+referencing new table as new_screenings
+for each statement execute function carry_screening_source_metadata();
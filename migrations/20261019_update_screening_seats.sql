@@ -0,0 +1,52 @@
+-- Seats-only refresh used by SupabaseClient.update_seat_counts (lambda "mode": "seats").
+--
+-- batch = {
+--   "provider": "Megabox",
+--   "rows": [[cinema_code, play_date, start_dt, screen_name, remain_seat_cnt, total_seat_cnt]]
+-- }
+-- Updates only the two seat columns of existing rows matched on the screening
+-- conflict key; unknown screenings are ignored (the full crawl inserts them).
+-- Rows go through jsonb_populate_recordset so key columns compare with their
+-- table types.
+
+create or replace function update_screening_seats(batch jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  with seats as (
+    select * from jsonb_populate_recordset(
+      null::screenings,
+      (
+        select coalesce(jsonb_agg(jsonb_build_object(
+          'provider',        batch->>'provider',
+          'cinema_code',     r->>0,
+          'play_date',       r->>1,
+          'start_dt',        r->>2,
+          'screen_name',     r->>3,
+          'remain_seat_cnt', r->4,
+          'total_seat_cnt',  r->5
+        )), '[]'::jsonb)
+        from jsonb_array_elements(batch->'rows') as r
+      )
+    )
+  )
+  update screenings s
+  set
+    remain_seat_cnt = coalesce(seats.remain_seat_cnt, s.remain_seat_cnt),
+    total_seat_cnt  = coalesce(seats.total_seat_cnt, s.total_seat_cnt)
+  from seats
+  where s.provider    = seats.provider
+    and s.cinema_code = seats.cinema_code
+    and s.play_date   = seats.play_date
+    and s.start_dt    = seats.start_dt
+    and s.screen_name = seats.screen_name
+    and (s.remain_seat_cnt is distinct from coalesce(seats.remain_seat_cnt, s.remain_seat_cnt)
+      or s.total_seat_cnt  is distinct from coalesce(seats.total_seat_cnt, s.total_seat_cnt));
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
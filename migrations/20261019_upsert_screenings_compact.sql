@@ -0,0 +1,77 @@
+-- Dictionary-encoded screenings upsert used by SupabaseClient.insert_screenings_compact
+-- (payload built by models.ScreeningBatch.to_compact_payloads).
+--
+-- batch = {
+--   "provider": "CGV", "crawl_ts": "...",
+--   "cinemas": [[cinema_code, cinema_name]],
+--   "movies": [[movie_title, movie_title_en, source_movie_code, source_year, source_director]],
+--   "screens": [screen_name], "dates": [play_date], "url_prefixes": [prefix],
+--   "rows": [[cinema, movie, screen, date, start_min, end_min, url_prefix, url_suffix,
+--             remain_seat_cnt, total_seat_cnt, is_core_art_screen]]
+-- }
+-- Rows are expanded into screenings-shaped records and upserted on the same
+-- conflict key as the row upsert. New rows get a generated id; existing rows keep theirs.
+-- Like the row upsert, every other column is overwritten (a null clears the stored value).
+
+create or replace function upsert_screenings_compact(batch jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+  affected integer;
+begin
+  with expanded as (
+    select jsonb_build_object(
+      'id',                 gen_random_uuid(),
+      'provider',           batch->>'provider',
+      'crawl_ts',           batch->>'crawl_ts',
+      'cinema_code',        batch->'cinemas'->((r->>0)::int)->>0,
+      'cinema_name',        batch->'cinemas'->((r->>0)::int)->>1,
+      'movie_title',        batch->'movies'->((r->>1)::int)->>0,
+      'movie_title_en',     batch->'movies'->((r->>1)::int)->>1,
+      'source_movie_code',  batch->'movies'->((r->>1)::int)->>2,
+      'source_year',        batch->'movies'->((r->>1)::int)->3,
+      'source_director',    batch->'movies'->((r->>1)::int)->>4,
+      'screen_name',        batch->'screens'->>((r->>2)::int),
+      'play_date',          batch->'dates'->>((r->>3)::int),
+      'start_dt',           lpad(((r->>4)::int / 60)::text, 2, '0') || ':' || lpad(((r->>4)::int % 60)::text, 2, '0'),
+      'end_dt',             lpad(((r->>5)::int / 60)::text, 2, '0') || ':' || lpad(((r->>5)::int % 60)::text, 2, '0'),
+      'url',                case when r->6 = 'null'::jsonb then null
+                                 else (batch->'url_prefixes'->>((r->>6)::int)) || coalesce(r->>7, '') end,
+      'remain_seat_cnt',    r->8,
+      'total_seat_cnt',     r->9,
+      'is_core_art_screen', (r->>10)::int = 1
+    ) as obj
+    from jsonb_array_elements(batch->'rows') as r
+  ),
+  records as (
+    select * from jsonb_populate_recordset(null::screenings, (select coalesce(jsonb_agg(obj), '[]'::jsonb) from expanded))
+  )
+  insert into screenings (
+    id, provider, cinema_name, cinema_code, screen_name, movie_title, movie_title_en,
+    source_movie_code, source_year, source_director, is_core_art_screen, play_date,
+    start_dt, end_dt, crawl_ts, url, remain_seat_cnt, total_seat_cnt
+  )
+  select
+    id, provider, cinema_name, cinema_code, screen_name, movie_title, movie_title_en,
+    source_movie_code, source_year, source_director, is_core_art_screen, play_date,
+    start_dt, end_dt, crawl_ts, url, remain_seat_cnt, total_seat_cnt
+  from records
+  on conflict (provider, cinema_code, play_date, start_dt, screen_name) do update set
+    cinema_name        = excluded.cinema_name,
+    movie_title        = excluded.movie_title,
+    movie_title_en     = excluded.movie_title_en,
+    source_movie_code  = excluded.source_movie_code,
+    source_year        = excluded.source_year,
+    source_director    = excluded.source_director,
+    is_core_art_screen = excluded.is_core_art_screen,
+    end_dt             = excluded.end_dt,
+    crawl_ts           = excluded.crawl_ts,
+    url                = excluded.url,
+    remain_seat_cnt    = excluded.remain_seat_cnt,
+    total_seat_cnt     = excluded.total_seat_cnt;
+
+  get diagnostics affected = row_count;
+  return affected;
+end;
+$$;
@@ -1,12 +1,26 @@
-from typing import Literal, Optional
-from pydantic import BaseModel, Field
-import uuid
+from array import array
+from typing import Any, Iterable, Iterator, Literal, NamedTuple, Optional
+from pydantic import BaseModel, Field, TypeAdapter
+import os
 
 Chain = Literal["CGV", "Megabox", "Lotte", "TinyTicket", "Dtryx", "Moviee", "KOFA"]
 
 
+def _format_id(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _new_id() -> str:
+    # Same format as str(uuid.uuid4()) at roughly a third of the cost.
+    raw = bytearray(os.urandom(16))
+    raw[6] = raw[6] & 0x0F | 0x40
+    raw[8] = raw[8] & 0x3F | 0x80
+    return _format_id(raw)
+
+
 class Screening(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier")
+    id: str = Field(default_factory=_new_id, description="Unique identifier")
     provider: Chain
     cinema_name: str
     cinema_code: str
@@ -26,6 +40,298 @@ class Screening(BaseModel):
     remain_seat_cnt: Optional[int] = None
     total_seat_cnt: Optional[int] = None
 
+
+class SeatCount(NamedTuple):
+    """Seat availability for one screening, keyed like SCREENING_CONFLICT_KEY. Not validated."""
+
+    provider: str
+    cinema_code: str
+    play_date: str
+    start_dt: str
+    screen_name: str
+    remain_seat_cnt: Optional[int]
+    total_seat_cnt: Optional[int]
+
+
+_screening_list = TypeAdapter(list[Screening])
+
+
+def validate_screenings(rows: list[dict[str, Any]]) -> list[Screening]:
+    """Validate a whole batch of raw dicts in one call."""
+    return _screening_list.validate_python(rows)
+
+
+def dump_screenings(screenings: Iterable[Screening]) -> list[dict[str, Any]]:
+    """Dump screenings to the upsert wire format (None fields dropped) in one pass."""
+    return _screening_list.dump_python(list(screenings), exclude_none=True)
+
+
+SCREENING_CONFLICT_KEY = ("provider", "cinema_code", "play_date", "start_dt", "screen_name")
+
+
+def hhmm_to_minutes(value: str) -> int:
+    return int(value[:2]) * 60 + int(value[3:5])
+
+
+def minutes_to_hhmm(value: int) -> str:
+    # Keeps post-midnight values such as 25:30 instead of wrapping to 01:30.
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+class ScreeningBatch:
+    """
+    Column-oriented container for a crawl's screenings.
+
+    Repeated strings (provider, cinema, screen, movie, dates, crawl_ts, booking URL
+    prefixes) are dictionary-encoded into one shared table and stored as integer
+    codes (0 = None). Times are minutes since midnight of `play_date` so 24:00-26:59
+    round-trip, seat counts and years live in typed arrays, and UUID ids are 16 raw
+    bytes (any other id string is kept as-is on the side).
+    """
+
+    _STRING_COLUMNS = (
+        "provider",
+        "cinema_name",
+        "cinema_code",
+        "screen_name",
+        "movie_title",
+        "movie_title_en",
+        "source_movie_code",
+        "source_director",
+        "play_date",
+        "crawl_ts",
+        "url_prefix",
+    )
+
+    def __init__(self):
+        self._strings: list[Optional[str]] = [None]
+        self._string_codes: dict[str, int] = {}
+        self._codes = {name: array("I") for name in self._STRING_COLUMNS}
+        self._ids = bytearray()
+        # Row index -> id for ids that do not round-trip through 16 bytes (not a lowercase UUID).
+        self._other_ids: dict[int, str] = {}
+        self._url_suffixes: list[Optional[str]] = []
+        self._start_min = array("H")
+        self._end_min = array("H")
+        self._source_year = array("H")  # 0 = None
+        self._remain_seat_cnt = array("i")  # -1 = None
+        self._total_seat_cnt = array("i")  # -1 = None
+        self._is_core_art_screen = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._start_min)
+
+    def _encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self._string_codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._string_codes[value] = code
+        return code
+
+    def append(self, screening: Screening) -> None:
+        url_prefix = url_suffix = None
+        if screening.url:
+            url_prefix, sep, url_suffix = screening.url.partition("?")
+            url_suffix = sep + url_suffix
+        values = {
+            name: getattr(screening, name)
+            for name in self._STRING_COLUMNS
+            if name != "url_prefix"
+        }
+        values["url_prefix"] = url_prefix
+        for name, value in values.items():
+            self._codes[name].append(self._encode(value))
+        self._ids += self._pack_id(len(self), screening.id)
+        self._url_suffixes.append(url_suffix)
+        self._start_min.append(hhmm_to_minutes(screening.start_dt))
+        self._end_min.append(hhmm_to_minutes(screening.end_dt))
+        self._source_year.append(screening.source_year or 0)
+        self._remain_seat_cnt.append(-1 if screening.remain_seat_cnt is None else screening.remain_seat_cnt)
+        self._total_seat_cnt.append(-1 if screening.total_seat_cnt is None else screening.total_seat_cnt)
+        self._is_core_art_screen.append(1 if screening.is_core_art_screen else 0)
+
+    def _pack_id(self, i: int, screening_id: str) -> bytes:
+        try:
+            raw = bytes.fromhex(screening_id.replace("-", ""))
+        except ValueError:
+            raw = b""
+        if len(raw) != 16 or _format_id(raw) != screening_id:
+            self._other_ids[i] = screening_id
+            return bytes(16)
+        return raw
+
+    def extend(self, screenings: Iterable[Screening]) -> None:
+        for screening in screenings:
+            self.append(screening)
+
+    @classmethod
+    def from_screenings(cls, screenings: Iterable[Screening]) -> "ScreeningBatch":
+        batch = cls()
+        batch.extend(screenings)
+        return batch
+
+    def row(self, i: int) -> dict[str, Any]:
+        """Row `i` as a dict in Screening field order."""
+        strings = self._strings
+        codes = self._codes
+        url_prefix = strings[codes["url_prefix"][i]]
+        remain = self._remain_seat_cnt[i]
+        total = self._total_seat_cnt[i]
+        return {
+            "id": self._other_ids[i] if i in self._other_ids else _format_id(self._ids[i * 16: i * 16 + 16]),
+            "provider": strings[codes["provider"][i]],
+            "cinema_name": strings[codes["cinema_name"][i]],
+            "cinema_code": strings[codes["cinema_code"][i]],
+            "screen_name": strings[codes["screen_name"][i]],
+            "movie_title": strings[codes["movie_title"][i]],
+            "movie_title_en": strings[codes["movie_title_en"][i]],
+            "source_movie_code": strings[codes["source_movie_code"][i]],
+            "source_year": self._source_year[i] or None,
+            "source_director": strings[codes["source_director"][i]],
+            "is_core_art_screen": bool(self._is_core_art_screen[i]),
+            "play_date": strings[codes["play_date"][i]],
+            "start_dt": minutes_to_hhmm(self._start_min[i]),
+            "end_dt": minutes_to_hhmm(self._end_min[i]),
+            "crawl_ts": strings[codes["crawl_ts"][i]],
+            "url": None if url_prefix is None else url_prefix + (self._url_suffixes[i] or ""),
+            "remain_seat_cnt": None if remain < 0 else remain,
+            "total_seat_cnt": None if total < 0 else total,
+        }
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def distinct(self, columns: tuple[str, ...]) -> dict[tuple, int]:
+        """
+        Row count per distinct value tuple of `columns` (string columns or
+        `source_year`), grouped on integer codes so rows are never decoded.
+        """
+        arrays = [self._source_year if c == "source_year" else self._codes[c] for c in columns]
+        counts: dict[tuple, int] = {}
+        for key in zip(*arrays):
+            counts[key] = counts.get(key, 0) + 1
+        strings = self._strings
+        return {
+            tuple(
+                (code or None) if c == "source_year" else strings[code]
+                for c, code in zip(columns, key)
+            ): count
+            for key, count in counts.items()
+        }
+
+    def to_screenings(self) -> list[Screening]:
+        return validate_screenings(list(self.rows()))
+
+    def __iter__(self) -> Iterator[Screening]:
+        for row in self.rows():
+            yield Screening(**row)
+
+    def to_payload(self) -> list[dict[str, Any]]:
+        """
+        Upsert payload equivalent to `SupabaseClient.insert_screenings`: deduplicated on
+        the conflict key (last row wins) with None fields dropped.
+        """
+        return [
+            {k: v for k, v in self.row(i).items() if v is not None}
+            for i in self._latest_rows()
+        ]
+
+    def _latest_rows(self) -> list[int]:
+        # Row indexes deduplicated on SCREENING_CONFLICT_KEY, last row wins.
+        codes = self._codes
+        latest: dict[tuple, int] = {}
+        for i in range(len(self)):
+            key = (
+                codes["provider"][i],
+                codes["cinema_code"][i],
+                codes["play_date"][i],
+                self._start_min[i],
+                codes["screen_name"][i],
+            )
+            latest[key] = i
+        return list(latest.values())
+
+    def to_compact_payloads(self) -> list[dict[str, Any]]:
+        """
+        Dictionary-encoded upsert payloads, one per provider, for the
+        `upsert_screenings_compact` RPC.
+
+        Each payload has a header (`provider`, `crawl_ts`), lookup tables for
+        cinemas, movies, screens, dates and booking-URL prefixes, and one compact
+        tuple per row:
+            [cinema, movie, screen, date, start_min, end_min, url_prefix, url_suffix,
+             remain_seat_cnt, total_seat_cnt, is_core_art_screen]
+        where the first four and `url_prefix` index the tables. Rows carry no id;
+        the database assigns ids to new rows. `crawl_ts` is the latest crawl_ts
+        among the provider's rows.
+        """
+        strings = self._strings
+        codes = self._codes
+        payloads: dict[int, dict[str, Any]] = {}
+        tables: dict[int, dict[str, dict]] = {}
+
+        def table_index(provider_code: int, table: str, key) -> int:
+            index = tables[provider_code][table]
+            if key not in index:
+                index[key] = len(index)
+            return index[key]
+
+        for i in self._latest_rows():
+            provider_code = codes["provider"][i]
+            if provider_code not in payloads:
+                payloads[provider_code] = {"provider": strings[provider_code], "crawl_ts": None, "rows": []}
+                tables[provider_code] = {name: {} for name in ("cinemas", "movies", "screens", "dates", "url_prefixes")}
+            payload = payloads[provider_code]
+            crawl_ts = strings[codes["crawl_ts"][i]]
+            if payload["crawl_ts"] is None or crawl_ts > payload["crawl_ts"]:
+                payload["crawl_ts"] = crawl_ts
+
+            url_prefix_code = codes["url_prefix"][i]
+            remain = self._remain_seat_cnt[i]
+            total = self._total_seat_cnt[i]
+            payload["rows"].append(
+                [
+                    table_index(provider_code, "cinemas", (codes["cinema_code"][i], codes["cinema_name"][i])),
+                    table_index(
+                        provider_code,
+                        "movies",
+                        (
+                            codes["movie_title"][i],
+                            codes["movie_title_en"][i],
+                            codes["source_movie_code"][i],
+                            self._source_year[i],
+                            codes["source_director"][i],
+                        ),
+                    ),
+                    table_index(provider_code, "screens", codes["screen_name"][i]),
+                    table_index(provider_code, "dates", codes["play_date"][i]),
+                    self._start_min[i],
+                    self._end_min[i],
+                    None if url_prefix_code == 0 else table_index(provider_code, "url_prefixes", url_prefix_code),
+                    self._url_suffixes[i] or None,
+                    None if remain < 0 else remain,
+                    None if total < 0 else total,
+                    1 if self._is_core_art_screen[i] else 0,
+                ]
+            )
+
+        for provider_code, payload in payloads.items():
+            t = tables[provider_code]
+            payload["cinemas"] = [[strings[code], strings[name]] for code, name in t["cinemas"]]
+            payload["movies"] = [
+                [strings[title], strings[title_en], strings[movie_code], year or None, strings[director]]
+                for title, title_en, movie_code, year, director in t["movies"]
+            ]
+            payload["screens"] = [strings[code] for code in t["screens"]]
+            payload["dates"] = [strings[code] for code in t["dates"]]
+            payload["url_prefixes"] = [strings[code] for code in t["url_prefixes"]]
+        return list(payloads.values())
+
+
 class Cinema(BaseModel):
     cinema_code: str = Field(..., description="Unique cinema code, e.g., '0013'")
     name: str = Field(..., description="Cinema name, e.g., 'CGV용산아이파크몰'")